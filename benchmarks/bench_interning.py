@@ -0,0 +1,80 @@
+"""
+Measure the memory held by many populated ElanFiles with and without the
+string interning that Collection.acquire_elans applies.
+
+The fixture EAFs in tests/ are copied a number of times to simulate a corpus,
+so that every copy is parsed into its own strings.
+
+usage: python benchmarks/bench_interning.py [copies]
+"""
+
+import gc
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# pylint: disable=wrong-import-position
+from eldpy.elan.elanfile import ElanFile
+from eldpy.elan.interning import intern_elanfile, intern_populated
+
+TESTDIR = os.path.join(os.path.dirname(__file__), "..", "tests")
+
+
+def load(paths, intern_strings):
+    """load and populate the files as Collection does, return the ElanFiles"""
+
+    elanfiles = []
+    for path in paths:
+        elanfile = ElanFile(path, "www", detach=True)
+        if intern_strings:
+            intern_elanfile(elanfile)
+        elanfile.populate_transcriptions()
+        elanfile.populate_translations()
+        elanfile.populate_glosses()
+        elanfile.release_xml()
+        if intern_strings:
+            intern_populated(elanfile)
+        elanfiles.append(elanfile)
+    return elanfiles
+
+
+def measure(paths, intern_strings):
+    """return the memory in bytes allocated by Python for the loaded files"""
+
+    gc.collect()
+    tracemalloc.start()
+    elanfiles = load(paths, intern_strings)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del elanfiles
+    return current
+
+
+def run(copies=20):
+    """compare the memory of a replicated fixture corpus with and without interning"""
+
+    fixtures = sorted(glob.glob(os.path.join(TESTDIR, "*.eaf")))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for i in range(copies):
+            for fixture in fixtures:
+                path = os.path.join(tmpdir, f"{i}_{os.path.basename(fixture)}")
+                shutil.copy(fixture, path)
+                paths.append(path)
+        # warm up the language detection and the interpreter's own caches
+        load(paths[: len(fixtures)], True)
+        before = measure(paths, False)
+        after = measure(paths, True)
+    print(f"{len(paths)} files ({copies} copies of {len(fixtures)} fixtures)")
+    print(f"without interning {before / 2**20:8.1f} MiB")
+    print(f"with interning    {after / 2**20:8.1f} MiB ({after * 100 / before:.1f}%)")
+
+
+if __name__ == "__main__":
+    run(*[int(x) for x in sys.argv[1:2]])
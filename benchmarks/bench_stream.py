@@ -0,0 +1,87 @@
+"""
+Compare the peak memory of reading the transcriptions, segment counts and
+durations of a large synthetic ELAN file with ElanFile.stream and with the
+whole tree in memory.
+
+usage: python benchmarks/bench_stream.py [sentences]
+"""
+
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# pylint: disable=wrong-import-position
+from eldpy.elan.elanfile import ElanFile
+from eldpy.elan.helpers import get_seconds_from_tier
+from eldpy.helpers import tier_to_wordlist
+from synthetic import write_synthetic_eaf
+
+
+def read_tree(path):
+    """collect the tier statistics from a fully parsed file"""
+
+    elanfile = ElanFile(path, "www")
+    result = {}
+    for tier in elanfile.root.iter("TIER"):
+        tier_id = tier.attrib["TIER_ID"]
+        result[tier_id] = (
+            len(tier_to_wordlist(tier)),
+            elanfile.segment_counts[tier_id],
+            get_seconds_from_tier(
+                elanfile.annotation_table, tier_id, engine=elanfile.duration_engine
+            ),
+        )
+    return result
+
+
+def read_stream(path):
+    """collect the tier statistics while streaming the file"""
+
+    stream = ElanFile.stream(path)
+    return {
+        tier.id_: (
+            len(tier.get_wordlist()),
+            tier.get_segment_counts(),
+            stream.get_seconds(tier),
+        )
+        for tier in stream
+    }
+
+
+def measure(function, path, queue):
+    """run a function and report its result, time and peak memory"""
+
+    start = time.perf_counter()
+    result = function(path)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((result, elapsed, peak))
+
+
+def run(sentences=20000):
+    """measure both modes in fresh processes"""
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "large.eaf")
+        count = write_synthetic_eaf(path, sentences=sentences, words=8, speakers=2)
+        size = os.path.getsize(path) / 2**20
+        print(f"{count} annotations, {size:.1f} MiB")
+        results = {}
+        for name, function in (("tree", read_tree), ("stream", read_stream)):
+            queue = context.Queue()
+            process = context.Process(target=measure, args=(function, path, queue))
+            process.start()
+            results[name], elapsed, peak = queue.get()
+            process.join()
+            print(f"{name:<7} {elapsed:7.2f}s peak RSS {peak / 1024:8.1f} MiB")
+        assert results["tree"] == results["stream"]
+
+
+if __name__ == "__main__":
+    run(*[int(x) for x in sys.argv[1:2]])
@@ -0,0 +1,61 @@
+"""
+Benchmark the resolution of time-aligned ancestors on ELAN files with very
+deep chains of REF_ANNOTATIONs.
+
+usage: python benchmarks/bench_timeslotted_parents.py [depth ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from eldpy.elan.elanfile import ElanFile  # pylint: disable=wrong-import-position
+from synthetic import write_synthetic_eaf  # pylint: disable=wrong-import-position
+
+
+def recursive_timeslotted_parents(elanfile):
+    """the recursive resolver which was used up to eldpy 0.0.12, for comparison"""
+
+    def get_timeslotted_parent(child_id, d):
+        parent_id = elanfile.ref_annotations[child_id]
+        if parent_id in elanfile.alignable_annotations:
+            return parent_id
+        if parent_id in d:
+            d[child_id] = d[parent_id]
+            return d[parent_id]
+        return get_timeslotted_parent(parent_id, d)
+
+    d = dict(elanfile.alignable_annotations)
+    return {ra: get_timeslotted_parent(ra, d) for ra in elanfile.ref_annotations}
+
+
+def run(depth, sentences=10):
+    """time both resolvers on a file with the given chain depth"""
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, f"chain_{depth}.eaf")
+        count = write_synthetic_eaf(path, sentences=sentences, chain_depth=depth)
+        elanfile = ElanFile(path, "www")
+        start = time.perf_counter()
+        iterative = elanfile.get_timeslotted_parents()
+        iterative_time = time.perf_counter() - start
+        start = time.perf_counter()
+        try:
+            recursive = recursive_timeslotted_parents(elanfile)
+            recursive_time = f"{time.perf_counter() - start:.4f}s"
+            assert recursive == iterative
+        except RecursionError:
+            recursive_time = "RecursionError"
+    print(
+        f"depth {depth:>6} annotations {count:>8} "
+        f"iterative {iterative_time:.4f}s recursive {recursive_time}"
+    )
+
+
+if __name__ == "__main__":
+    depths = [int(x) for x in sys.argv[1:]] or [10, 100, 500, 2000, 10000]
+    for d in depths:
+        run(d)
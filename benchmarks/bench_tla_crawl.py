@@ -0,0 +1,97 @@
+"""
+Compare the concurrent breadth-first crawl of TLACollection.get_bundles
+with the previous recursive crawl, offline.
+
+The node tree is read from benchmarks/fixtures/tla/, in which several
+corpora link to the same shared node. Every page is served with a fixed
+latency to simulate the network.
+
+usage: python benchmarks/bench_tla_crawl.py [latency in seconds] [concurrency]
+"""
+
+import collections
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# pylint: disable=wrong-import-position
+from eldpy import httpclient
+from eldpy.archives.tla_collection import TLACollection, parse_node_page
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "tla")
+ROOT = "https://archive.mpi.nl/tla/islandora/object/tla%3AROOT"
+
+
+class FixturePage:
+    """the part of a response used by the crawlers"""
+
+    def __init__(self, content):
+        self.content = content
+        self.status_code = 200
+
+
+class FixtureClient:
+    """serve the fixture pages like HttpClient, counting the requests"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.requests = collections.Counter()
+        self._lock = threading.Lock()
+
+    def get(self, url, kind=None):
+        """return the fixture page for a URL after the latency"""
+
+        with self._lock:
+            self.requests[url] += 1
+        time.sleep(self.latency)
+        filename = url.split("tla%3A")[-1] + ".html"
+        with open(os.path.join(FIXTURES, filename), "rb") as f:
+            return FixturePage(f.read())
+
+
+def get_bundles_recursively(client, url, bundles):
+    """the crawl as done before, one request at a time without a visited set"""
+
+    name, links = parse_node_page(client.get(url).content)
+    if links is None:
+        bundles.append((name, url))
+        return
+    for link in links:
+        get_bundles_recursively(client, link, bundles)
+
+
+def run(latency=0.02, concurrency=8):
+    """crawl the fixture tree in both ways and compare the results"""
+
+    client = FixtureClient(latency)
+    start = time.perf_counter()
+    recursive = []
+    get_bundles_recursively(client, ROOT, recursive)
+    elapsed = time.perf_counter() - start
+    print(
+        f"recursive          {elapsed:6.2f}s {sum(client.requests.values()):4} requests "
+        f"{len(recursive):4} bundles"
+    )
+    for workers in sorted({1, concurrency}):
+        client = FixtureClient(latency)
+        httpclient.set_client(client)
+        collection = TLACollection("fixture", ROOT)
+        start = time.perf_counter()
+        collection.get_bundles(ROOT, concurrency=workers)
+        elapsed = time.perf_counter() - start
+        print(
+            f"bfs concurrency {workers:2} {elapsed:6.2f}s {sum(client.requests.values()):4} requests "
+            f"{len(collection.bundles):4} bundles"
+        )
+        assert max(client.requests.values()) == 1
+        # the same bundles in the same order, without the repeated shared ones
+        expected = list(dict.fromkeys(recursive))
+        assert [(b.name, b.url) for b in collection.bundles] == expected
+    httpclient.set_client(None)
+
+
+if __name__ == "__main__":
+    run(*[float(x) for x in sys.argv[1:2]], *[int(x) for x in sys.argv[2:3]])
@@ -0,0 +1,128 @@
+"""
+Benchmark the precompiled XPath queries against the string-path findall/find
+calls they replaced, on the ELAN files in tests/.
+
+usage: python benchmarks/bench_xpath.py [repetitions]
+"""
+
+import glob
+import os
+import sys
+import time
+
+from lxml import etree
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# pylint: disable=wrong-import-position
+from eldpy.helpers import get_annotation_text_mapping, tier_to_id_wordlist
+from eldpy.elan.loader import get_annotation_records
+
+TESTDIR = os.path.join(os.path.dirname(__file__), "..", "tests")
+
+
+def findall_tier_to_id_wordlist(t):
+    """tier_to_id_wordlist as it was up to eldpy 0.0.12, for comparison"""
+
+    result = []
+    for ref_ann in t.findall(".//REF_ANNOTATION") + t.findall(
+        ".//ALIGNABLE_ANNOTATION"
+    ):
+        ref_ann_id = ref_ann.attrib["ANNOTATION_ID"]
+        try:
+            annotation_text = ref_ann.find(".//ANNOTATION_VALUE").text.strip()
+        except AttributeError:
+            annotation_text = ""
+        result.append((ref_ann_id, annotation_text))
+    return result
+
+
+def findall_annotation_text_mapping(root):
+    """get_annotation_text_mapping as it was up to eldpy 0.0.12"""
+
+    return {
+        ref_annotation.attrib.get("ANNOTATION_ID"): ref_annotation.find(
+            "./ANNOTATION_VALUE"
+        ).text
+        for ref_annotation in root.findall(".//REF_ANNOTATION")
+    }
+
+
+def findall_annotation_records(tree):
+    """get_annotation_records as it was up to eldpy 0.0.12"""
+
+    records = []
+    for tier in tree.findall(".//TIER"):
+        tier_id = tier.attrib["TIER_ID"]
+        for el in tier.findall("./ANNOTATION/*"):
+            text = el.findtext("ANNOTATION_VALUE") or None
+            if el.tag == "ALIGNABLE_ANNOTATION":
+                records.append([el.attrib["ANNOTATION_ID"], tier_id, text, None, None])
+            elif el.tag == "REF_ANNOTATION":
+                records.append(
+                    [
+                        el.attrib["ANNOTATION_ID"],
+                        tier_id,
+                        text,
+                        el.attrib["ANNOTATION_REF"],
+                        el.attrib.get("PREVIOUS_ANNOTATION"),
+                    ]
+                )
+    return records
+
+
+def wordlists(tier_function, root):
+    """apply a tier function to all tiers"""
+
+    return [tier_function(tier) for tier in root.iter("TIER")]
+
+
+CASES = [
+    (
+        "tier_to_id_wordlist",
+        lambda root: wordlists(findall_tier_to_id_wordlist, root),
+        lambda root: wordlists(tier_to_id_wordlist, root),
+    ),
+    (
+        "get_annotation_text_mapping",
+        findall_annotation_text_mapping,
+        get_annotation_text_mapping,
+    ),
+    (
+        "get_annotation_records",
+        findall_annotation_records,
+        get_annotation_records,
+    ),
+]
+
+
+def timed(function, roots, repetitions):
+    """return the results of a function on all roots and the best time"""
+
+    best = None
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        results = [function(root) for root in roots]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return results, best
+
+
+def run(repetitions=5):
+    """time the old and new implementation of every case on all fixtures"""
+
+    paths = sorted(glob.glob(os.path.join(TESTDIR, "*.eaf")))
+    roots = [etree.parse(path) for path in paths]
+    print(f"{len(paths)} files, best of {repetitions}")
+    for name, before, after in CASES:
+        before_results, before_time = timed(before, roots, repetitions)
+        after_results, after_time = timed(after, roots, repetitions)
+        assert before_results == after_results, name
+        print(
+            f"{name:<28} findall {before_time:.4f}s XPath {after_time:.4f}s "
+            f"speedup {before_time / after_time:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    run(*[int(x) for x in sys.argv[1:2]])
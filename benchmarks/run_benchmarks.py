@@ -0,0 +1,229 @@
+"""
+Benchmark the ELAN parsing hot path and write the results to JSON.
+
+Every benchmark is run on all fixture EAFs in tests/ together, and on
+synthetic EAFs with about 10^3 to 10^6 annotations. Each round gets fresh
+ElanFiles and an empty language detection cache from an untimed setup, so
+that cached results do not leak between rounds.
+
+usage: python benchmarks/run_benchmarks.py [--sizes 3 4 5 6] [--rounds N]
+           [--only NAME ...] [--json results.json] [--compare old.json]
+"""
+
+import argparse
+import gc
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# pylint: disable=wrong-import-position
+from eldpy.elan.elanfile import ElanFile
+from eldpy.langdetection import set_language_cache
+from synthetic import write_synthetic_eaf
+
+TESTDIR = os.path.join(os.path.dirname(__file__), "..", "tests")
+WORDS = 4
+SPEAKERS = 2
+
+
+def construct(paths):
+    """setup returning only the paths, for benchmarks of the constructor"""
+
+    set_language_cache(None)
+    return paths
+
+
+def constructed(paths):
+    """setup returning fresh ElanFiles"""
+
+    set_language_cache(None)
+    return [ElanFile(path, "www") for path in paths]
+
+
+def populated(paths):
+    """setup returning fresh ElanFiles with transcriptions, translations and glosses"""
+
+    elanfiles = constructed(paths)
+    for elanfile in elanfiles:
+        elanfile.populate_transcriptions()
+        elanfile.populate_translations()
+        elanfile.populate_glosses()
+    set_language_cache(None)
+    return elanfiles
+
+
+def get_cldfs(elanfiles):
+    """get_cldfs for all files which have glosses"""
+
+    for elanfile in elanfiles:
+        if elanfile.glossed_sentences:
+            elanfile.get_cldfs()
+
+
+def each(method, *args):
+    """return a function calling a method on all ElanFiles"""
+
+    def run(elanfiles):
+        for elanfile in elanfiles:
+            getattr(elanfile, method)(*args)
+
+    return run
+
+
+BENCHMARKS = [
+    ("ElanFile", construct, lambda paths: [ElanFile(path, "www") for path in paths]),
+    ("populate_transcriptions", constructed, each("populate_transcriptions")),
+    ("populate_translations", constructed, each("populate_translations")),
+    ("populate_glosses", constructed, each("populate_glosses")),
+    ("populate_comments", constructed, each("populate_comments")),
+    ("populate", constructed, each("populate")),
+    ("get_cldfs", populated, get_cldfs),
+    ("get_fingerprint", constructed, each("get_fingerprint")),
+    ("print_overview", populated, each("print_overview")),
+]
+
+
+def benchmark(setup, function, paths, rounds, max_time):
+    """
+    time a function in several rounds, each on the result of a fresh setup.
+    Stop early once max_time seconds have been spent, after at least one round.
+    """
+
+    times = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        argument = setup(paths)
+        gc.collect()
+        start = time.perf_counter()
+        function(argument)
+        times.append(time.perf_counter() - start)
+        del argument
+        if time.perf_counter() - started > max_time:
+            break
+    return {
+        "rounds": len(times),
+        "min": min(times),
+        "max": max(times),
+        "mean": statistics.mean(times),
+        "median": statistics.median(times),
+        "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def get_commit():
+    """return the current git commit, if any"""
+
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_datasets(tmpdir, sizes):
+    """return (name, annotation count, paths) tuples for fixtures and synthetic files"""
+
+    fixtures = sorted(glob.glob(os.path.join(TESTDIR, "*.eaf")))
+    datasets = [("fixtures", None, fixtures)]
+    per_sentence = (3 + 2 * WORDS) * SPEAKERS
+    for exponent in sizes:
+        path = os.path.join(tmpdir, f"synthetic_1e{exponent}.eaf")
+        sentences = max(1, round(10**exponent / per_sentence))
+        count = write_synthetic_eaf(
+            path, sentences=sentences, words=WORDS, speakers=SPEAKERS
+        )
+        datasets.append((f"synthetic_1e{exponent}", count, [path]))
+    return datasets
+
+
+def compare(results, old_path):
+    """print the ratio of the current median times to those of an older run"""
+
+    with open(old_path, encoding="utf8") as f:
+        old = {
+            (b["name"], b["dataset"]): b["stats"]["median"]
+            for b in json.load(f)["benchmarks"]
+        }
+    print(f"\ncompared to {old_path}")
+    for b in results["benchmarks"]:
+        previous = old.get((b["name"], b["dataset"]))
+        if previous:
+            ratio = b["stats"]["median"] / previous
+            flag = "  SLOWER" if ratio > 1.1 else ""
+            print(f"{b['name']:<24} {b['dataset']:<16} {ratio:6.2f}x{flag}")
+
+
+def main(argv=None):
+    """run the benchmarks given on the command line"""
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="*",
+        default=[3, 4, 5],
+        help="decimal exponents of the synthetic annotation counts (up to 6)",
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--max-time",
+        type=float,
+        default=10.0,
+        help="seconds after which no further rounds are started",
+    )
+    parser.add_argument("--only", nargs="*", help="names of benchmarks to run")
+    parser.add_argument("--json", default="benchmark_results.json")
+    parser.add_argument("--compare", help="JSON file of an earlier run")
+    args = parser.parse_args(argv)
+
+    results = {
+        "commit": get_commit(),
+        "datetime": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "machine_info": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+        },
+        "benchmarks": [],
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for dataset, count, paths in get_datasets(tmpdir, args.sizes):
+            for name, setup, function in BENCHMARKS:
+                if args.only and name not in args.only:
+                    continue
+                stats = benchmark(setup, function, paths, args.rounds, args.max_time)
+                results["benchmarks"].append(
+                    {
+                        "name": name,
+                        "dataset": dataset,
+                        "annotations": count,
+                        "files": len(paths),
+                        "stats": stats,
+                    }
+                )
+                print(
+                    f"{name:<24} {dataset:<16} median {stats['median']:9.4f}s "
+                    f"min {stats['min']:9.4f}s rounds {stats['rounds']}"
+                )
+    with open(args.json, "w", encoding="utf8") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {args.json}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Generate synthetic ELAN files for benchmarking
+"""
+
+import random
+from xml.sax.saxutils import escape
+
+ENGLISH = (
+    "the man went to the river and saw a big fish which he wanted to catch "
+    "for his family because they were very hungry after the long dry season"
+).split()
+SYLLABLES = "ka mo ri tu ne pa si lo gu we ha bi".split()
+GLOSSES = "3SG PL PST FUT NEG DEM go eat see house water tree".split()
+
+LINGUISTIC_TYPES = """    <LINGUISTIC_TYPE GRAPHIC_REFERENCES="false" LINGUISTIC_TYPE_ID="ref" TIME_ALIGNABLE="true"/>
+    <LINGUISTIC_TYPE CONSTRAINTS="Symbolic_Association" GRAPHIC_REFERENCES="false" LINGUISTIC_TYPE_ID="po" TIME_ALIGNABLE="false"/>
+    <LINGUISTIC_TYPE CONSTRAINTS="Symbolic_Subdivision" GRAPHIC_REFERENCES="false" LINGUISTIC_TYPE_ID="mb" TIME_ALIGNABLE="false"/>
+    <LINGUISTIC_TYPE CONSTRAINTS="Symbolic_Association" GRAPHIC_REFERENCES="false" LINGUISTIC_TYPE_ID="ge" TIME_ALIGNABLE="false"/>
+    <LINGUISTIC_TYPE CONSTRAINTS="Symbolic_Association" GRAPHIC_REFERENCES="false" LINGUISTIC_TYPE_ID="ft" TIME_ALIGNABLE="false"/>
+    <LINGUISTIC_TYPE CONSTRAINTS="Symbolic_Association" GRAPHIC_REFERENCES="false" LINGUISTIC_TYPE_ID="chain" TIME_ALIGNABLE="false"/>
+"""
+
+
+def _word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3)))
+
+
+def _tier(out, tier_id, linguistic_type, parent=None):
+    parent_ref = f' PARENT_REF="{parent}"' if parent else ""
+    out.write(
+        f'    <TIER LINGUISTIC_TYPE_REF="{linguistic_type}"{parent_ref} TIER_ID="{tier_id}">\n'
+    )
+
+
+def _ref_annotation(out, id_, ref, text, previous=None):
+    previous_attribute = f' PREVIOUS_ANNOTATION="{previous}"' if previous else ""
+    out.write(
+        f'        <ANNOTATION><REF_ANNOTATION ANNOTATION_ID="{id_}" ANNOTATION_REF="{ref}"{previous_attribute}>'
+        f"<ANNOTATION_VALUE>{escape(text)}</ANNOTATION_VALUE></REF_ANNOTATION></ANNOTATION>\n"
+    )
+
+
+def write_synthetic_eaf(
+    path, sentences=100, words=4, speakers=1, chain_depth=0, seed=0
+):
+    """
+    write an ELAN file with the given number of sentences per speaker.
+
+    Every speaker has a time-aligned ref tier, a transcription (po), word (mb),
+    gloss (ge) and translation (ft) tier, resulting in 3 + 2 * words annotations
+    per sentence. chain_depth adds that many Symbolic_Association tiers, each
+    depending on the previous one, starting from the transcription tier.
+    Speakers overlap partially in time.
+    Return the number of annotations written.
+    """
+
+    # pylint: disable=too-many-arguments, too-many-locals
+    rng = random.Random(seed)
+    count = 0
+    with open(path, "w", encoding="utf8") as out:
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write(
+            '<ANNOTATION_DOCUMENT AUTHOR="" DATE="2024-01-01T00:00:00+00:00" FORMAT="3.0" VERSION="3.0">\n'
+        )
+        out.write('    <HEADER MEDIA_FILE="" TIME_UNITS="milliseconds"/>\n')
+        out.write("    <TIME_ORDER>\n")
+        slots = {}
+        for speaker in range(speakers):
+            time = speaker * 700
+            for sentence in range(sentences):
+                duration = rng.randint(1000, 4000)
+                for offset, suffix in ((0, "a"), (duration, "b")):
+                    slot_id = f"ts{speaker}_{sentence}{suffix}"
+                    slots[speaker, sentence, suffix] = slot_id
+                    out.write(
+                        f'        <TIME_SLOT TIME_SLOT_ID="{slot_id}" TIME_VALUE="{time + offset}"/>\n'
+                    )
+                time += duration + rng.randint(0, 1500)
+        out.write("    </TIME_ORDER>\n")
+        for speaker in range(speakers):
+            s = f"S{speaker}"
+            _tier(out, f"ref@{s}", "ref")
+            for sentence in range(sentences):
+                out.write(
+                    f'        <ANNOTATION><ALIGNABLE_ANNOTATION ANNOTATION_ID="a{s}r{sentence}" '
+                    f'TIME_SLOT_REF1="{slots[speaker, sentence, "a"]}" TIME_SLOT_REF2="{slots[speaker, sentence, "b"]}">'
+                    f"<ANNOTATION_VALUE>{s}.{sentence:05d}</ANNOTATION_VALUE></ALIGNABLE_ANNOTATION></ANNOTATION>\n"
+                )
+            out.write("    </TIER>\n")
+            vernacular = [
+                [_word(rng) for _ in range(words)] for _ in range(sentences)
+            ]
+            _tier(out, f"tx@{s}", "po", f"ref@{s}")
+            for sentence in range(sentences):
+                _ref_annotation(
+                    out, f"a{s}t{sentence}", f"a{s}r{sentence}", " ".join(vernacular[sentence])
+                )
+            out.write("    </TIER>\n")
+            _tier(out, f"mb@{s}", "mb", f"tx@{s}")
+            for sentence in range(sentences):
+                previous = None
+                for w, word in enumerate(vernacular[sentence]):
+                    id_ = f"a{s}m{sentence}_{w}"
+                    _ref_annotation(out, id_, f"a{s}t{sentence}", word, previous)
+                    previous = id_
+            out.write("    </TIER>\n")
+            _tier(out, f"ge@{s}", "ge", f"mb@{s}")
+            for sentence in range(sentences):
+                for w in range(words):
+                    _ref_annotation(
+                        out, f"a{s}g{sentence}_{w}", f"a{s}m{sentence}_{w}", rng.choice(GLOSSES)
+                    )
+            out.write("    </TIER>\n")
+            _tier(out, f"ft@{s}", "ft", f"tx@{s}")
+            for sentence in range(sentences):
+                translation = " ".join(rng.choice(ENGLISH) for _ in range(words + 4))
+                _ref_annotation(out, f"a{s}f{sentence}", f"a{s}t{sentence}", translation)
+            out.write("    </TIER>\n")
+            count += sentences * (3 + 2 * words)
+            parent_tier = f"tx@{s}"
+            parent_prefix = f"a{s}t"
+            for level in range(chain_depth):
+                _tier(out, f"c{level}@{s}", "chain", parent_tier)
+                for sentence in range(sentences):
+                    _ref_annotation(
+                        out, f"a{s}c{level}_{sentence}", f"{parent_prefix}{sentence}", str(level)
+                    )
+                out.write("    </TIER>\n")
+                parent_tier = f"c{level}@{s}"
+                parent_prefix = f"a{s}c{level}_"
+                count += sentences
+        out.write(LINGUISTIC_TYPES)
+        out.write("</ANNOTATION_DOCUMENT>\n")
+    return count
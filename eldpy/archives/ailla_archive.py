@@ -11,11 +11,12 @@ import json
 # import pprint
 
 # import humanize
-import requests
 
 # from collections import Counter, defaultdict
 # from bs4 import BeautifulSoup
 
+from eldpy import httpclient
+from eldpy.httpcache import CATALOGUE
 from eldpy.archives.ailla_collection import AillaCollection
 from eldpy.archives.archive import Archive
 
@@ -38,10 +39,11 @@ class AillaArchive(Archive):
         """
 
         print("populating AILLA collections")
-        r = requests.get(
-            "https://ailla-backend-prod.gsc1-pub.lib.utexas.edu/collections/all",
-            timeout=120,
-        )
+        catalogpage = "https://ailla-backend-prod.gsc1-pub.lib.utexas.edu/collections/all"
+        r = httpclient.get(catalogpage, kind=CATALOGUE)
+        if r is None:
+            print(f"could not download {catalogpage}")
+            return
         collection_list = json.loads(r.content)[:limit]
         for collection in collection_list:
             id_ = collection["id"]
@@ -1,11 +1,11 @@
-import urllib
-import requests
 import json
 
 from bs4 import BeautifulSoup
 
 from eldpy.archives.ailla_file import  AillaFile
 from eldpy.archives.bundle import  Bundle
+from eldpy import httpclient
+from eldpy.httpcache import BUNDLE
 
 class AillaBundle(Bundle):
     def __init__(self, name, url):
@@ -18,7 +18,10 @@ class AillaBundle(Bundle):
 
     def populate_files(self, hardlimit=10000):
         print(f" populating files for {self.url}")
-        request_folder = requests.get(self.url)
+        request_folder = httpclient.get(self.url, kind=BUNDLE)
+        if request_folder is None:
+            print(f"  could not download {self.url}")
+            return
         soup = BeautifulSoup(request_folder.content, 'html.parser')
         j = json.loads(soup.find('script',type="application/json").text)
         try:
@@ -39,7 +42,10 @@ class AillaBundle(Bundle):
 
     def get_file_links(self, set_url):
         print(f"  file set url is {set_url}. Retrieving information")
-        request_set = requests.get(set_url)
+        request_set = httpclient.get(set_url, kind=BUNDLE)
+        if request_set is None:
+            print(f"  could not download {set_url}")
+            return []
         soup = BeautifulSoup(request_set.content, 'html.parser')
         j = json.loads(soup.find('script',type="application/json").text)
         files = []
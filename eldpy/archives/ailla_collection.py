@@ -1,8 +1,8 @@
 from eldpy.archives.collection import Collection
-import urllib
 from bs4 import BeautifulSoup
 from eldpy.archives.ailla_bundle import  AillaBundle
-import requests
+from eldpy import httpclient
+from eldpy.httpcache import COLLECTION
 import json
 
 class AillaCollection(Collection):
@@ -14,7 +14,11 @@ class AillaCollection(Collection):
 
     def populate_bundles(self, limit=10000):
         print(f"fetching bundles for {self.name}, {self.url}")
-        request_collection = requests.get(self.url)
+        request_collection = httpclient.get(self.url, kind=COLLECTION)
+        if request_collection is None:
+            print(f" could not download {self.url}")
+            self.bundles = []
+            return
         soup = BeautifulSoup(request_collection.content, 'html.parser')
         j = json.loads(soup.find('script',type="application/json").text)
         try:
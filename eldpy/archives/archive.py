@@ -16,7 +16,10 @@ from matplotlib import cm
 # import squarify
 # from rdflib import Namespace, Graph, Literal, RDF, RDFS  # , URIRef, BNode
 
+from eldpy import httpclient
 from eldpy.archives.collection import Collection
+from eldpy.crawljournal import CrawlJournal, BUNDLE, COLLECTION
+from eldpy.helpers import type2megatype
 
 # from . import lod
 # import lod
@@ -54,12 +57,23 @@ class Archive:
         self.files = []
         self.statistics = {}
         self.fingerprints = {}
+        self.journal = None
 
     def populate_collections(self, limit=LIMIT):
         """
         get all bundles for the collections
         """
 
+    def open_journal(self, database):
+        """
+        open the crawl journal in the holdings database. Collections and
+        bundles which it records as done are skipped by later crawls.
+        """
+
+        if self.journal is None:
+            self.journal = CrawlJournal(database, self.name)
+        return self.journal
+
     def populate_bundles(self, limit=LIMIT, offset=0):
         """
         get all bundles for the collections
@@ -68,6 +82,8 @@ class Archive:
         print("populating bundles")
         number_of_collections = len(self.collections)
         for i, collection in enumerate(self.collections[:limit]):
+            if self.journal and self.journal.is_done(collection.url):
+                continue
             print(f"c{i+1}/{number_of_collections}", end=" ")
             if collection.bundles == []:
                 collection.populate_bundles(limit=limit)
@@ -75,38 +91,63 @@ class Archive:
 
     def populate_files(self, limit=LIMIT, database=None):
         """
-        get all bundles for the collections
+        get all files for the bundles. With a database, the files are added
+        to it, and the progress is recorded in its crawl journal, so that an
+        interrupted crawl continues with the first collection or bundle
+        which is not done.
         """
 
         print("populating files")
-        if database:
-            connection = sqlite3.connect(database)
-            cursor = connection.cursor()
+        journal = self.open_journal(database) if database else None
         number_of_collections = len(self.collections)
         for i, collection in enumerate(self.collections):
+            if journal and journal.is_done(collection.url):
+                continue
             print(f"c{i+1}/{number_of_collections}")
             number_of_bundles = len(collection.bundles)
+            # no bundles can also mean that the collection page could not be
+            # downloaded, so such collections are listed again by the next crawl
+            complete = 0 < number_of_bundles <= limit
+            if journal:
+                journal.add([bundle.url for bundle in collection.bundles], BUNDLE)
             for j, bundle in enumerate(collection.bundles[:limit]):
+                if journal and journal.is_done(bundle.url):
+                    continue
                 print(f" b{j+1}/{number_of_bundles}", end=" ")
+                failures = httpclient.get_client().failures
+                number_of_failures = len(failures)
                 bundle.populate_files()
-                if database:
-                    for file_ in bundle.files():
-                        file_data = [
-                            file_.url,
-                            self.name,
-                            collection.ID,
-                            bundle.url,
-                            file2megatype(file_.type_),
-                            file_.type_,
-                            file_.size,
-                            0
-                        ]
-                        cursor.execute("INSERT INTO files VALUES (?,?,?,?,?,?,?,?)", file_data)
-                        for lg in tla_file.langauges:
-                            cursor.execute("INSERT INTO languagesfiles VALUES (?,?,?)", [tla_file.url,self.name,lg])
-            if database:
+                if not journal:
+                    continue
+                if len(failures) > number_of_failures:
+                    journal.mark_failed(bundle.url, BUNDLE, failures[-1].error)
+                    complete = False
+                    continue
+                self.insert_files(journal.connection.cursor(), collection, bundle)
+                journal.mark_done(bundle.url, BUNDLE)
+            if journal:
+                if complete:
+                    journal.mark_done(collection.url, COLLECTION)
                 print(f"committing files for {collection.name}")
-                connection.commit()
+                journal.commit()
+
+    def insert_files(self, cursor, collection, bundle):
+        """add the files of a bundle and their languages to the database"""
+
+        for file_ in bundle.files:
+            file_data = [
+                file_.url,
+                self.name,
+                collection.name,
+                bundle.url,
+                type2megatype(file_.type_),
+                file_.type_,
+                file_.size,
+                0
+            ]
+            cursor.execute("INSERT INTO files VALUES (?,?,?,?,?,?,?,?)", file_data)
+            for lg in file_.languages:
+                cursor.execute("INSERT INTO languagesfiles VALUES (?,?,?)", [file_.url,self.name,lg])
 
     def get_languages(self, s):
         """dummy method for subclasses to instantiate"""
@@ -249,8 +290,13 @@ class Archive:
         self.statistics.update(d)
 
     def populate(self, limit=LIMIT, database=None):
-        """add all collections, bundles, and files"""
+        """
+        add all collections, bundles, and files. With a database, a crawl
+        which has been interrupted continues where it stopped.
+        """
 
+        if database:
+            self.open_journal(database)
         self.populate_collections(limit=limit)
         self.populate_bundles(limit=limit)
         self.populate_files(limit=limit, database=database)
@@ -0,0 +1,20 @@
+"""
+A bundle, i.e. a session or item, with files in an archive
+"""
+
+
+class Bundle:
+    """
+    A bundle of files in an archive. Subclasses retrieve the files and
+    languages of the bundle from its page in populate_files.
+    """
+
+    def __init__(self, name, url):
+        self.name = name
+        self.url = url
+        self.id_ = url.split("/")[-1]
+        self.files = []
+        self.languages = []
+
+    def populate_files(self):
+        """dummy method for subclasses to instantiate"""
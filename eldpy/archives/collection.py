@@ -11,6 +11,8 @@ from lxml.etree import XMLSyntaxError
 from lxml.html.soupparser import fromstring
 import requests
 from eldpy.elan.elanfile import ElanFile
+from eldpy.elan.eafcache import load_elanfile
+from eldpy.elan.interning import intern_elanfile, intern_populated
 # from . import lod
 
 logger = logging.getLogger("eldpy")
@@ -58,9 +60,22 @@ class Collection:
         self.glosswords = 0
         self.glossmorphemes = 0
         self.fingerprints = []
+        # share repeated strings between the ElanFiles of the collection
+        self.intern_strings = True
 
-    def acquire_elans(self, cache=True):
+    def acquire_elans(
+        self,
+        cache=True,
+        structure_only=False,
+        eafcache_dir=None,
+        detach=False,
+        intern_strings=True,
+    ):
         #print(self.ID)
+        if eafcache_dir and structure_only:
+            # the cache holds fully populated files
+            raise ValueError("structure_only cannot be combined with eafcache_dir")
+        self.intern_strings = intern_strings
         pprint.pprint(self.elanpaths)
         collectionpathpart = self.ID
         for bundle in self.elanpaths:
@@ -75,7 +90,25 @@ class Collection:
                 #print(".")
                 if os.path.isfile(localpath):
                     try:
-                        self.elanfiles.append(ElanFile(localpath, eaf_url))
+                        if eafcache_dir:
+                            elanfile = load_elanfile(
+                                localpath, eaf_url, eafcache_dir, detach=detach
+                            )
+                        else:
+                            elanfile = ElanFile(
+                                localpath,
+                                eaf_url,
+                                structure_only=structure_only,
+                                detach=detach,
+                            )
+                            if detach and not structure_only:
+                                # populate everything in one go, so that only
+                                # one tree is held at a time and none is parsed again
+                                elanfile.populate()
+                                elanfile.populated = True
+                        if intern_strings:
+                            intern_elanfile(elanfile)
+                        self.elanfiles.append(elanfile)
                     except XMLSyntaxError:
                         logger.warning("malformed XML in %s" % localpath)
                 else:
@@ -88,6 +121,8 @@ class Collection:
         else:
             for eaf in self.elanfiles:
                 eaf.populate_translations()
+                if self.intern_strings:
+                    intern_populated(eaf)
                 translations = eaf.get_translations()
                 counts = [len(t) for t in translations]
                 if translations:
@@ -104,6 +139,8 @@ class Collection:
             for eaf in self.elanfiles:
                 print("transcriptions for", eaf.path)
                 eaf.populate_transcriptions()
+                if self.intern_strings:
+                    intern_populated(eaf)
                 transcriptions = eaf.get_transcriptions()
                 counts = [len(t) for t in transcriptions]
                 print(
@@ -128,6 +165,8 @@ class Collection:
             morphemecount = 0
             for eaf in self.elanfiles:
                 eaf.populate_glosses()
+                if self.intern_strings:
+                    intern_populated(eaf)
                 glossed_sentences = eaf.glossed_sentences
                 if glossed_sentences == []:
                     continue
@@ -200,7 +239,7 @@ class Collection:
 
     def get_fingerprints(self):
         #print("getting fingerprints for %i elans" % len(self.elanfiles))
-        self.fingerprints = [eaf.fingerprint() for eaf in self.elanfiles]
+        self.fingerprints = [eaf.get_fingerprint() for eaf in self.elanfiles]
 
     def paradisec_eaf_download(self, filename):
         # compute urls to use
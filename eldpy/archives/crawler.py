@@ -0,0 +1,83 @@
+"""
+Crawl archive pages concurrently with asyncio
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from eldpy.httpclient import FetchFailure, get_client
+
+
+class AsyncCrawler:
+    """
+    Fetch pages concurrently and parse them in a pool of worker processes.
+
+    Pages are fetched with an HttpClient, by default the shared one, in
+    threads which are scheduled by an asyncio event loop, with at most
+    `concurrency` requests to the same host in flight. Parse functions are
+    run in the worker pool and must therefore be module-level functions
+    taking and returning picklable data. With workers=1, pages are parsed in the current process.
+    """
+
+    def __init__(self, concurrency=8, workers=None, client=None):
+        self.concurrency = concurrency
+        self.workers = workers
+        self.client = client or get_client()
+        self._semaphores = {}
+        self._threads = None
+        self._processes = None
+
+    def run(self, coroutine):
+        """run a coroutine using this crawler to completion and return its result"""
+
+        self._threads = ThreadPoolExecutor(max_workers=self.concurrency)
+        if self.workers != 1:
+            self._processes = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            return asyncio.run(coroutine)
+        finally:
+            self._threads.shutdown()
+            if self._processes:
+                self._processes.shutdown()
+            self._semaphores = {}
+
+    def _get_semaphore(self, url):
+        # semaphores are created lazily, as they have to belong to the running loop
+        host = urlsplit(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.concurrency)
+        return self._semaphores[host]
+
+    def _get(self, url, kind):
+        response = self.client.get(url, kind=kind)
+        if response is None:
+            return None
+        return response.content
+
+    async def fetch(self, url, kind=None):
+        """
+        return the content of a page of the given kind (see httpcache),
+        or None if it could not be downloaded
+        """
+
+        loop = asyncio.get_running_loop()
+        async with self._get_semaphore(url):
+            return await loop.run_in_executor(self._threads, self._get, url, kind)
+
+    def record_failure(self, url, exc):
+        """
+        record an exception raised while a page was crawled as a
+        FetchFailure of the client, so that one malformed page does not stop
+        the crawl
+        """
+
+        self.client.record_failure(FetchFailure(url, None, repr(exc), 1))
+
+    async def parse(self, function, *args):
+        """return the result of a parse function run in the worker pool"""
+
+        if self._processes is None:
+            return function(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._processes, function, *args)
@@ -17,7 +17,6 @@ import sqlite3
 from bs4 import BeautifulSoup
 
 # import humanize
-import requests
 from dotenv import load_dotenv
 
 from pyPreservica.common import ReferenceNotFoundException
@@ -29,6 +28,9 @@ from eldpy.archives.elar_collection import  ElarCollection
 
 from eldpy.archives.elar_file import ElarFile
 
+from eldpy import httpclient
+from eldpy.crawljournal import CrawlJournal, COLLECTION
+from eldpy.httpcache import CATALOGUE
 from eldpy.helpers import get_seconds, type2megatype
 from eldpy.language_metadata import language_dictionary
 
@@ -58,6 +60,8 @@ class ElarArchive(Archive):
         """add all bundles"""
         print("populating bundles")
         for i, collection in enumerate(self.collections[:LIMIT]):
+            if self.journal and self.journal.is_done(collection.url):
+                continue
             print(i, collection.name)
             if collection.bundles == []:
                 collection.populate_bundles(limit=limit, languages=languages)
@@ -85,7 +89,10 @@ class ElarArchive(Archive):
             catalogpage = f'https://www.elararchive.org/uncategorized/SO_5f038640-311d-4296-a3e9-502e8a18f5b7/?pg={i}'
             print(f"reading {catalogpage}")
             # try:
-            r = requests.get(catalogpage, timeout=120)
+            r = httpclient.get(catalogpage, kind=CATALOGUE)
+            if r is None:
+                print(f"could not download {catalogpage}")
+                continue
             content = r.text
             new_collection_links = self.get_elar_collection_links_(content)
             print(f" found {len(new_collection_links)} collections")
@@ -139,8 +146,14 @@ class ElarArchive(Archive):
 
 
     def retrieve_collections(self, connection, offset=0, limit=99999, fussy=True):
-        """retrieve collection medata from ELAR and add it to the db"""
+        """
+        retrieve collection medata from ELAR and add it to the db.
+        Collections are recorded in the crawl journal of the db together with
+        their files, so that a run skips the collections added by earlier
+        runs. Collections which failed are tried again.
+        """
         cursor = connection.cursor()
+        journal = CrawlJournal(connection, self.name)
         load_dotenv()
         load_dotenv(dotenv_path=os.environ["ENV_PATH"])
 
@@ -164,41 +177,37 @@ class ElarArchive(Archive):
         hits = [x for x in raw_hits]
         print(f"({len(hits)} hits)")
         limit = min(limit, len(hits))
-        i = offset
-        try:
-            for current_hit in hits[offset:]:
-                i += 1
-                if i > limit:
-                    break
-                print(f"{i}/{limit}:", end=" ")
-                current_collection_folder = client.entity_client.folder(
-                    current_hit["xip.reference"]
-                )
+        journal.add([hit["xip.reference"] for hit in hits[offset:limit]], COLLECTION)
+        journal.commit()
+        for i, current_hit in enumerate(hits[offset:limit], start=offset + 1):
+            reference = current_hit["xip.reference"]
+            if journal.is_done(reference):
+                continue
+            print(f"{i}/{limit}:", end=" ")
+            current_collection_folder = None
+            try:
+                current_collection_folder = client.entity_client.folder(reference)
                 collection_folder = self.process_collection(current_hit, current_collection_folder, client, cursor, fussy=fussy)
+            except RuntimeError as e:
+                error, message = e, "Server connection dropped"
+            except sqlite3.IntegrityError as e:
+                error, message = e, "Database problem"
+            except ReferenceNotFoundException as e:
+                error, message = e, "Archive problem"
+            else:
+                journal.mark_done(reference, COLLECTION)
+                journal.commit()
                 if collection_folder:
                     self.ingested_collections.append(collection_folder)
-                    connection.commit()
                     print("Added to database")
-        except RuntimeError as e:
-            self.collections_with_errors.append((i,current_collection_folder))
-            print()
-            print(e)
-            print("Server connection dropped. Proceeding to next collection")
-            self.retrieve_collections(connection,offset=i,fussy=fussy)
-        except sqlite3.IntegrityError as e:
-            connection.rollback()
-            self.collections_with_errors.append((i,current_collection_folder))
-            print()
-            print(e)
-            print("Database problem. Proceeding to next collection")
-            self.retrieve_collections(connection,offset=i,fussy=fussy)
-        except ReferenceNotFoundException as e:
+                continue
             connection.rollback()
+            journal.mark_failed(reference, COLLECTION, error)
+            journal.commit()
             self.collections_with_errors.append((i,current_collection_folder))
             print()
-            print(e)
-            print("Archive problem. Proceeding to next collection")
-            self.retrieve_collections(connection,offset=i,fussy=fussy)
+            print(error)
+            print(f"{message}. Proceeding to next collection")
 
 
 
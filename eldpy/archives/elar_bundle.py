@@ -1,14 +1,14 @@
-import urllib
 from bs4 import BeautifulSoup
 from eldpy.archives.elar_file import  ElarFile
 from eldpy.archives.bundle import  Bundle
-import requests
+from eldpy import httpclient
+from eldpy.httpcache import BUNDLE
 
 class ElarBundle(Bundle):
-    def __init__(self, name, id_):
+    def __init__(self, name, url):
         self.name = name
         self.url = url
-        self.id_ = =url.split('/')[-1]
+        self.id_ = url.split('/')[-1]
         # self.url = f"https://www.elararchive.org/uncategorized/{id_}"
         self.files = []
         self.languages = []
@@ -18,7 +18,10 @@ class ElarBundle(Bundle):
 
     def get_bundle_files(self, hardlimit=10000):
         limit = 1
+        url = self.url
         soup = self.get_soup()
+        if soup is None:
+            return []
         try:
             limit = int(soup.find('div',class_='pagination').find_all('a')[-2].text)
         except (IndexError, AttributeError):
@@ -29,15 +32,14 @@ class ElarBundle(Bundle):
         while current <= limit and current <= hardlimit:
             current_url =  url + f"?pg={current}"
             print(f" pg={current}", end="", flush=True)
-            try:
-                with urllib.request.urlopen(current_url) as current_file_reader:
-                    current_content = current_file_reader.read()
-                    current_soup = BeautifulSoup(current_content, 'html.parser')
-                    new_files = self.get_files_on_page_(current_soup)
-                    print(f" adding {len(files)} files")
-                    files += new_files
-            except urllib.error.HTTPError:
+            r = httpclient.get(current_url, kind=BUNDLE)
+            if r is None:
                 print(f" could not download {current_url}")
+            else:
+                current_soup = BeautifulSoup(r.content, 'html.parser')
+                new_files = self.get_files_on_page_(current_soup)
+                print(f" adding {len(files)} files")
+                files += new_files
             current += 1
         print(f"finished. [{len(files)} files]")
         return files
@@ -47,18 +49,18 @@ class ElarBundle(Bundle):
         self.files = self.get_bundle_files(hardlimit=hardlimit)
 
     def get_soup(self):
-        url = self.url
-        try:
-            with urllib.request.urlopen(url) as bundle_reader:
-                content = bundle_reader.read()
-        except urllib.error.HTTPError:
-            print (f"{url} could not be opened")
-            return []
-        soup = BeautifulSoup(content, 'html.parser')
+        r = httpclient.get(self.url, kind=BUNDLE)
+        if r is None:
+            print (f"{self.url} could not be opened")
+            return None
+        return BeautifulSoup(r.content, 'html.parser')
 
     def populate_languages(self):
-        content = requests.get(self.url).content
-        soup = BeautifulSoup(content, 'html.parser')
+        r = httpclient.get(self.url, kind=BUNDLE)
+        if r is None:
+            print(f"no languages found for {self.url}")
+            return
+        soup = BeautifulSoup(r.content, 'html.parser')
         try:
             metadata_spans = soup.find_all('h5', class_='metadata-title')
             language_spans = [x for x in metadata_spans if x.text.strip()=="Language"]
@@ -1,8 +1,8 @@
 from eldpy.archives.collection import Collection
-import urllib
-import requests
 from bs4 import BeautifulSoup
 from eldpy.archives.elar_bundle import  ElarBundle
+from eldpy import httpclient
+from eldpy.httpcache import COLLECTION
 
 class ElarCollection(Collection):
     def __init__(self, name, url):
@@ -20,35 +20,32 @@ class ElarCollection(Collection):
         url = self.url
         limit = 1
         bundles = []
-        try:
-            r = requests.get(url)
-            content = r.text
-            soup = BeautifulSoup(content, "html.parser")
-            try:
-                limit = int(
-                    soup.find("div", class_="pagination").find_all("a")[-2].text
-                )
-            except (IndexError, AttributeError):
-                limit = 1
-            print(" ", url.split("uncategorized/")[-1], f"[{limit} pages]")
-            bundles = self.get_bundles_on_page(soup)
-        except urllib.error.HTTPError:
-            bundles = []
-            print(f"  could not download{url}")
+        r = httpclient.get(url, kind=COLLECTION)
+        if r is None:
+            print(f"  could not download {url}")
             return bundles
+        content = r.text
+        soup = BeautifulSoup(content, "html.parser")
+        try:
+            limit = int(
+                soup.find("div", class_="pagination").find_all("a")[-2].text
+            )
+        except (IndexError, AttributeError):
+            limit = 1
+        print(" ", url.split("uncategorized/")[-1], f"[{limit} pages]")
+        bundles = self.get_bundles_on_page(soup)
         current = 2
         while current <= limit and current <= hardlimit:
             current_url = url + f"?pg={current}"
             print(f"  pg={current}", end="", flush=True)
-            try:
-                r = requests.get(current_url)
-                current_content = r.text
-                current_soup = BeautifulSoup(current_content, "html.parser")
+            r = httpclient.get(current_url, kind=COLLECTION)
+            if r is None:
+                print(f"\n  could not download {current_url}")
+            else:
+                current_soup = BeautifulSoup(r.text, "html.parser")
                 new_bundles = self.get_bundles_on_page(current_soup)
                 # print(f"  adding {len(new_bundles)} bundles")
                 bundles += new_bundles
-            except urllib.error.HTTPError:
-                print(f"\n  could not download{current_url}")
             current += 1
         if limit > 1:
             print()
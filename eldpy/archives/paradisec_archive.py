@@ -6,16 +6,20 @@ instances of Pacific and Regional Archive for Digital Sources in Endangered Cult
 # import pprint
 # import sqlite3
 # from collections import Counter, defaultdict
+import asyncio
 import json
 from bs4 import BeautifulSoup
-import requests
 # import humanize
 
 from eldpy.archives.paradisec_collection import ParadisecCollection
+from eldpy import httpclient
+from eldpy.httpcache import CATALOGUE
 from eldpy.helpers import type2megatype
 # from paradisec_bundle import ParadisecBundle
 # from paradisec_file import ParadisecFile
 from eldpy.archives.archive import Archive, LIMIT
+from eldpy.archives.crawler import AsyncCrawler
+from eldpy.crawljournal import BUNDLE, COLLECTION
 
 class ParadisecArchive(Archive):
     """
@@ -29,10 +33,11 @@ class ParadisecArchive(Archive):
         """
         get all PARADISEC collections
         """
-        r = requests.get(
-            f"https://catalog.paradisec.org.au/collections/search?page=1&per_page={limit}",
-            timeout=120
-        )
+        catalogpage = f"https://catalog.paradisec.org.au/collections/search?page=1&per_page={limit}"
+        r = httpclient.get(catalogpage, kind=CATALOGUE)
+        if r is None:
+            print(f"could not download {catalogpage}")
+            return
         content = r.content
         soup = BeautifulSoup(content, "html.parser")
         table = soup.find_all("table")[-1]
@@ -54,15 +59,22 @@ class ParadisecArchive(Archive):
         """
         print("populating bundles")
         for i, collection in enumerate(self.collections):
+            if self.journal and self.journal.is_done(collection.url):
+                continue
             print(f"{i}/{len(self.collections)} {collection.name}")
             if collection.bundles == []:
                 collection.populate_bundles()
             self.bundles += collection.bundles
 
-    def populate_files(self, limit=LIMIT):
+    def populate_files(self, limit=LIMIT, database=None):
         """
-        get all files for the bundles
+        get all files for the bundles. With a database, the files are added
+        to it and the progress is recorded in its crawl journal, as in
+        Archive.populate_files.
         """
+        if database:
+            super().populate_files(limit=limit, database=database)
+            return
         print(f"populating files from {len(self.collections)} collections")
         for i, collection in enumerate(self.collections):
             print(f"{i+1}/{len(self.collections)}")
@@ -90,6 +102,83 @@ class ParadisecArchive(Archive):
             #     with open(f"out/paradisecjson/{filename}.json", "w", encoding='utf8') as jsonout:
             #         jsonout.write(json.dumps(collection_dict, indent=4, sort_keys=True))
 
+    def populate(self, limit=LIMIT, database=None, concurrency=1, workers=None):
+        """
+        add all collections, bundles, and files. With a database, a crawl
+        which has been interrupted continues where it stopped.
+
+        With concurrency > 1, bundles and files are crawled asynchronously with
+        at most that many requests to the catalogue at a time, and the pages are
+        parsed in a pool of worker processes (see AsyncCrawler). The results
+        are the same as with the sequential crawl.
+        """
+
+        if database:
+            self.open_journal(database)
+        self.populate_collections(limit=limit)
+        if concurrency == 1:
+            self.populate_bundles(limit=limit)
+            self.populate_files(limit=limit, database=database)
+            return
+        collections = [
+            collection
+            for collection in self.collections
+            if not (self.journal and self.journal.is_done(collection.url))
+        ]
+        print(f"crawling {len(collections)} collections, concurrency is {concurrency}")
+        crawler = AsyncCrawler(concurrency=concurrency, workers=workers)
+        number_of_failures = len(crawler.client.failures)
+        crawler.run(self.crawl(crawler, collections))
+        failed = {
+            failure.url: failure.error
+            for failure in crawler.client.failures[number_of_failures:]
+        }
+        for collection in collections:
+            self.bundles += collection.bundles
+            for bundle in collection.bundles:
+                self.files += bundle.files
+            if self.journal:
+                self.journal_collection(collection, failed)
+        if self.journal:
+            self.journal.commit()
+
+    def journal_collection(self, collection, failed):
+        """
+        add the files of a crawled collection to the database and record
+        its progress in the crawl journal, given the errors of the pages
+        which could not be fetched, keyed by URL
+        """
+
+        journal = self.journal
+        journal.add([bundle.url for bundle in collection.bundles], BUNDLE)
+        complete = collection.bundles != [] and collection.url not in failed
+        for bundle in collection.bundles:
+            if journal.is_done(bundle.url):
+                continue
+            if bundle.url in failed:
+                journal.mark_failed(bundle.url, BUNDLE, failed[bundle.url])
+                complete = False
+                continue
+            self.insert_files(journal.connection.cursor(), collection, bundle)
+            journal.mark_done(bundle.url, BUNDLE)
+        if complete:
+            journal.mark_done(collection.url, COLLECTION)
+        elif collection.url in failed:
+            journal.mark_failed(collection.url, COLLECTION, failed[collection.url])
+
+    async def crawl(self, crawler, collections=None):
+        """
+        populate the bundles and files of the given collections, by default
+        all, with an AsyncCrawler. Bundles which the crawl journal records as
+        done are not fetched again.
+        """
+
+        if collections is None:
+            collections = self.collections
+        await asyncio.gather(
+            *[collection.crawl(crawler, journal=self.journal) for collection in collections]
+        )
+
     # def run(self):
     #     self.populate_collections()
     #     # self.write_json(add='_c')
@@ -185,6 +274,6 @@ class ParadisecArchive(Archive):
 
 if __name__ == "__main__":
     pa = ParadisecArchive()
-    pa.populate()
+    pa.populate(concurrency=8)
     pa.write_json()
     # pa.insert_into_database("paradisec_copy_f.json")
@@ -2,9 +2,38 @@ import urllib
 from bs4 import BeautifulSoup
 from eldpy.archives.paradisec_file import  ParadisecFile
 from eldpy.archives.bundle import  Bundle
-import requests
+from eldpy import httpclient
+from eldpy.httpcache import BUNDLE
 import time
 
+
+def parse_item_page(content, url):
+    """
+    return the subject languages of an item page and the
+    (name, type, size, duration) of its files
+    """
+
+    soup = BeautifulSoup(content, 'html.parser')
+    languages = []
+    try:
+        table = soup.find_all('table')[0]
+        languagelinks = [x.next.next.next.find_all('a') for x in table.find_all('th') if x.text=='Subject language(s)']
+        languages = [a['href'].split('/')[-1] for l in languagelinks for a in l]
+    except IndexError:
+        print(f"languages could not be retrieved for {url}")
+    try:
+        table = soup.find_all('table')[1]
+    except IndexError:
+        return languages, []
+    files = []
+    for tr in table.find_all('tr'):
+        tds = tr.find_all('td')
+        if len(tds) < 4:
+            continue
+        files.append((tds[0].text, tds[1].text, tds[2].text, tds[3].text))
+    return languages, files
+
+
 class ParadisecBundle(Bundle):
     def __init__(self, name, url, languages):
         self.name = name
@@ -18,35 +47,32 @@ class ParadisecBundle(Bundle):
         if self.url == '':
             return
         time.sleep(.1)
-        try:
-            r = requests.get(self.url)
-        except requests.exceptions.ConnectionError:
+        r = httpclient.get(self.url, kind=BUNDLE)
+        if r is None:
             print(f"{self.url} connection dropped while populating files")
-            time.sleep(5)
             return
-        content = r.content
-        soup = BeautifulSoup(content, 'html.parser')
-        isocodes = []
-        try:
-            table = soup.find_all('table')[0]
-            languagelinks = [x.next.next.next.find_all('a') for x in table.find_all('th') if x.text=='Subject language(s)']
-            isocodes = [a['href'].split('/')[-1] for l in languagelinks for a in l]
-            self.languages = isocodes
-            # print(isocodes)
-        except IndexError:
-            print(f"languages could not be retrieved for {self.url}")
+        self.add_files(*parse_item_page(r.content, self.url))
+
+    def add_files(self, languages, files):
+        # pages without subject languages leave the languages unchanged
+        if languages:
+            self.languages = languages
+        for name, type_, size, duration in files:
+            url = None
+            self.files.append(ParadisecFile(name,url,type_,size,duration,self.languages))
+
+    async def crawl(self, crawler):
+        """populate the files with an AsyncCrawler"""
+
+        if self.url == '':
+            return
         try:
-            table = soup.find_all('table')[1]
-        except IndexError:
+            content = await crawler.fetch(self.url, kind=BUNDLE)
+            if content is None:
+                print(f"{self.url} connection dropped while populating files")
+                return
+            parsed = await crawler.parse(parse_item_page, content, self.url)
+        except Exception as exc:  # pylint: disable=broad-except
+            crawler.record_failure(self.url, exc)
             return
-        for tr in table.find_all('tr'):
-            try:
-                tds = tr.find_all('td')
-                name = tds[0].text
-                type_ = tds[1].text
-                size = tds[2].text
-                duration = tds[3].text
-                url = None
-                self.files.append(ParadisecFile(name,url,type_,size,duration,self.languages))
-            except IndexError:
-                continue
+        self.add_files(*parsed)
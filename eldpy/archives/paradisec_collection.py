@@ -1,11 +1,39 @@
 from eldpy.archives.collection import Collection
 import urllib
-import requests
 import json
 import re
+import asyncio
 from bs4 import BeautifulSoup
 from eldpy.archives.paradisec_bundle import  ParadisecBundle
 from eldpy.archives.archive import LIMIT
+from eldpy import httpclient
+from eldpy.httpcache import COLLECTION
+
+
+def parse_collection_page(content, collection_name, limit=LIMIT):
+    """
+    return the languages of a collection page and the (name, url) pairs
+    of its bundles
+    """
+
+    soup = BeautifulSoup(content, "html.parser")
+    tables = soup.find_all('table')
+    trs = tables[0].find_all('tr')
+    languagelinks = trs[8].find_all('a')
+    languages = [l['href'].split('/')[-1] for l in languagelinks]
+    # j = json.loads(content)
+    bundles = []
+    for bundle in tables[2].find_all('tr')[1:][:limit]:
+        tds = bundle.find_all('td')
+        bundle_name = tds[1].text
+        try:
+            bundle_url = 'https://catalog.paradisec.org.au' + tds[2].find('a')['href']
+        except TypeError:
+            print(f'no URL for {bundle_name} in {collection_name}')
+            bundle_url = ''
+        bundles.append((bundle_name, bundle_url))
+    return languages, bundles
+
 
 class ParadisecCollection(Collection):
     def __init__(self, name, url):
@@ -15,30 +43,38 @@ class ParadisecCollection(Collection):
         self.files = []
 
     def populate_bundles(self, limit=LIMIT):
-        try:
-            r = requests.get(self.url)
-        except requests.exceptions.ConnectionError:
-            time.sleep(5)
+        r = httpclient.get(self.url, kind=COLLECTION)
+        if r is None:
+            print(f"could not download bundles for {self.url}")
+            return
+        self.add_bundles(*parse_collection_page(r.content, self.name, limit=limit))
+
+    def add_bundles(self, languages, bundles):
+        for bundle_name, bundle_url in bundles:
+            self.bundles.append(ParadisecBundle(bundle_name,bundle_url,languages))
+
+    async def crawl(self, crawler, limit=LIMIT, journal=None):
+        """
+        populate the bundles and their files with an AsyncCrawler.
+        Bundles and files which are already present, or which a CrawlJournal
+        records as done, are not fetched again.
+        """
+
+        if self.bundles == []:
             try:
-                r = requests.get(self.url)
-            except requests.exceptions.ConnectionError:
+                content = await crawler.fetch(self.url, kind=COLLECTION)
+                if content is None:
                     print(f"could not download bundles for {self.url}")
                     return
-        content = r.content
-        # print(content)
-        soup = BeautifulSoup(content, "html.parser")
-        tables = soup.find_all('table')
-        trs = tables[0].find_all('tr')
-        languagelinks = trs[8].find_all('a')
-        languages = [l['href'].split('/')[-1] for l in languagelinks]
-        # j = json.loads(content)
-        bundles = tables[2].find_all('tr')[1:]
-        for bundle in bundles[:limit]:
-            tds = bundle.find_all('td')
-            bundle_name = tds[1].text
-            try:
-                bundle_url = 'https://catalog.paradisec.org.au' + tds[2].find('a')['href']
-            except TypeError:
-                print(f'no URL for {bundle_name} in {self.name}')
-                bundle_url = ''
-            self.bundles.append(ParadisecBundle(bundle_name,bundle_url,languages))
+                parsed = await crawler.parse(parse_collection_page, content, self.name, limit)
+            except Exception as exc:  # pylint: disable=broad-except
+                crawler.record_failure(self.url, exc)
+                return
+            self.add_bundles(*parsed)
+        await asyncio.gather(
+            *[
+                bundle.crawl(crawler)
+                for bundle in self.bundles
+                if bundle.files == [] and not (journal and journal.is_done(bundle.url))
+            ]
+        )
@@ -9,11 +9,12 @@ import json
 
 # import humanize
 # import sqlite3
-import requests
 
 # from collections import Counter, defaultdict
 from bs4 import BeautifulSoup
 
+from eldpy import httpclient
+from eldpy.httpcache import CATALOGUE
 from eldpy.archives.tla_collection import TLACollection
 
 # from tla_bundle import  TLABundle
@@ -44,7 +45,10 @@ class TLAArchive(Archive):
         for i in range(pagelimit):
             catalogpage = f"https://archive.mpi.nl/tla/islandora/object/tla%253A1839_00_0000_0000_0001_305B_C?page={i+1}"
             print(f"reading {catalogpage}")
-            r = requests.get(catalogpage, timeout=120)
+            r = httpclient.get(catalogpage, kind=CATALOGUE)
+            if r is None:
+                print(f"could not download {catalogpage}")
+                continue
             content = r.content
             soup = BeautifulSoup(content, "html.parser")
             links = soup.find_all("a")
@@ -66,6 +70,8 @@ class TLAArchive(Archive):
         """
         print(f"populating bundles. Offset is {offset}")
         for i, collection in enumerate(self.collections[offset:]):
+            if self.journal and self.journal.is_done(collection.url):
+                continue
             print(i+offset, collection.name)
             if collection.bundles == []:
                 collection.populate_bundles()
@@ -165,14 +171,6 @@ class TLAArchive(Archive):
         return result
 
 
-    def populate(self, limit=LIMIT, bundle_offset=0, database=None):
-        self.populate_collections(limit=limit)
-        self.populate_bundles(offset=bundle_offset)
-        self.populate_files(database=database)
-
-
-
-
 
 if __name__ == "__main__":
     ta = TLAArchive()
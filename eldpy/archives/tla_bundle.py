@@ -2,10 +2,11 @@ import urllib
 from bs4 import BeautifulSoup
 from eldpy.archives.tla_file import  TLAFile
 from eldpy.archives.bundle import  Bundle
-import requests
+from eldpy import httpclient
+from eldpy.httpcache import BUNDLE
 
 class TLABundle(Bundle):
-    def __init__(self, name, id_):
+    def __init__(self, name, url):
         self.name = name
         self.url = url
         self.id_ = url.split('/')[-1]
@@ -15,7 +16,10 @@ class TLABundle(Bundle):
 
 
     def populate_files(self):
-        r = requests.get(self.url)
+        r = httpclient.get(self.url, kind=BUNDLE)
+        if r is None:
+            print(f"could not download files for {self.url}")
+            return
         content = r.content
         soup = BeautifulSoup(content, 'html.parser')
         dts_lg = [dt for dt in soup.find_all('dt') if dt.text.strip() == "Language"]
@@ -1,8 +1,28 @@
 from eldpy.archives.collection import Collection
+import asyncio
 import urllib
-import requests
 from bs4 import BeautifulSoup
 from eldpy.archives.tla_bundle import  TLABundle
+from eldpy.archives.crawler import AsyncCrawler
+from eldpy.httpcache import COLLECTION
+
+
+def parse_node_page(content):
+    """
+    return the name of a terminal node and None, or None and the URLs of
+    the subnodes of a non-terminal node
+    """
+
+    soup = BeautifulSoup(content, 'html.parser')
+    has_more_bundles = soup.find("h2", class_="block-title")
+    if not has_more_bundles:
+        h1 = soup.find('h1')
+        return (h1.text if h1 else ''), None
+    div = soup.find('div', class_="view-content")
+    links = div.find_all('a') if div else []
+    new_links = [f"https://archive.mpi.nl{l['href']}" for l in links if l.get('title') and '305B_C' not in l['href'] and l.get('href','').startswith("/tla/isl")]
+    return None, new_links
+
 
 class TLACollection(Collection):
     def __init__(self, name, url):
@@ -11,34 +31,74 @@ class TLACollection(Collection):
         self.bundles = []
         self.files = []
 
-    def populate_bundles(self):
-        self.get_bundles(self.url)
+    def populate_bundles(self, concurrency=8):
+        self.get_bundles(self.url, concurrency=concurrency)
 
-    def get_bundles(self, url):
+    def get_bundles(self, url, concurrency=8):
         """
         Accumulate all 'terminal nodes', from where files are linked
-        Non-terminal nodes have a <h2 class="block-title">. For non-terminal
-        nodes, recursively descend into all subnodes to find the terminal nodes
+        Non-terminal nodes have a <h2 class="block-title">. The tree of nodes
+        below url is crawled breadth-first, with up to `concurrency` nodes
+        fetched at a time, and every node is fetched only once. The terminal
+        nodes are added in depth-first order, following the order in which
+        subnodes are listed.
         """
-        r = requests.get(url)
-        content = r.content
-        soup = BeautifulSoup(content, 'html.parser')
-        has_more_bundles = soup.find("h2", class_="block-title")
-        if not has_more_bundles:
-            # This is a terminal node
-            # print(f"{url} is a terminal node")
-            name = soup.find('h1').text
-            self.bundles.append(TLABundle(name, url))
-        else:
-            # This node has subnodes
-            # print(f"{url} is a non-terminal node")
-            div = soup.find('div', class_="view-content")
-            links = div.find_all('a')
-            new_links = [f"https://archive.mpi.nl{l['href']}" for l in links if l.get('title') and '305B_C' not in l['href'] and l.get('href','').startswith("/tla/isl")]
-            # print(f" found {len(new_links)} subnodes")
-            for new_link in new_links:
-                self.get_bundles(new_link)
 
+        crawler = AsyncCrawler(concurrency=concurrency, workers=1)
+        names, subnodes = crawler.run(self.crawl_nodes(crawler, url, concurrency))
+        stack = [url]
+        added = set()
+        while stack:
+            node = stack.pop()
+            if node in added:
+                continue
+            added.add(node)
+            if node in names:
+                self.bundles.append(TLABundle(names[node], node))
+            stack.extend(reversed(subnodes.get(node, [])))
+
+    async def crawl_nodes(self, crawler, url, workers):
+        """
+        return the names of all terminal nodes below url, and the subnodes of
+        all non-terminal nodes, both keyed by URL
+
+        Nodes which fail to be fetched or parsed are recorded as FetchFailures
+        of the crawler's client and skipped.
+        """
 
+        names = {}
+        subnodes = {}
+        visited = {url}
+        frontier = asyncio.Queue()
+        frontier.put_nowait(url)
 
+        async def work():
+            while True:
+                node = await frontier.get()
+                try:
+                    content = await crawler.fetch(node, kind=COLLECTION)
+                    if content is None:
+                        print(f"could not download {node}")
+                        continue
+                    name, links = await crawler.parse(parse_node_page, content)
+                    if links is None:
+                        names[node] = name
+                        continue
+                    subnodes[node] = links
+                    for link in links:
+                        if link not in visited:
+                            visited.add(link)
+                            frontier.put_nowait(link)
+                except Exception as exc:  # pylint: disable=broad-except
+                    # a node which cannot be crawled must not stop its worker,
+                    # or the nodes left in the frontier are never done
+                    crawler.record_failure(node, exc)
+                finally:
+                    frontier.task_done()
 
+        tasks = [asyncio.ensure_future(work()) for _ in range(workers)]
+        await frontier.join()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return names, subnodes
@@ -2,7 +2,7 @@ import json
 from archive import Archive
 from delaman import archives
 
-def bulk_populate(archives_to_populate=archives, cache=True, exclude=[]):
+def bulk_populate(archives_to_populate=archives, cache=True, exclude=[], eafcache_dir=None, detach=False):
     def load_cache(type_):
         return json.loads(open("cache/%s/%s.json" % (type_, archivename)).read())
 
@@ -20,7 +20,7 @@ def bulk_populate(archives_to_populate=archives, cache=True, exclude=[]):
             entitieschache = load_cache('entities')
         for c in archive.collections:
             print(c)
-            archive.collections[c].acquire_elans(cache=cache)
+            archive.collections[c].acquire_elans(cache=cache, eafcache_dir=eafcache_dir, detach=detach)
             if 'transcriptions'  in exclude:
                 print('transcriptions excluded')
             else:
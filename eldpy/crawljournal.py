@@ -0,0 +1,144 @@
+"""
+A journal of the progress of archive crawls, stored in SQLite
+"""
+
+import sqlite3
+import time
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+COLLECTION = "collection"
+BUNDLE = "bundle"
+FILE = "file"
+
+DOWNLOAD_JOURNAL_PATH = "download_journal.sqlite"
+
+
+class CrawlJournal:
+    """
+    Record the collection, bundle and file pages of an archive as pending,
+    done, failed or skipped, so that an interrupted crawl can skip the work
+    it has already done. Failed pages are retried by the next crawl, skipped
+    pages, which have nothing the crawl can retrieve, are not.
+
+    The journal is kept in the table crawl_journal of a database, given as
+    a path or as an open connection. When it shares the connection of the
+    holdings database, a call of commit() stores the holdings and the
+    progress made on them in one transaction, so that they cannot get out of
+    step if the crawl is interrupted. Nothing is committed before commit()
+    is called.
+    """
+
+    def __init__(self, database, archive):
+        if isinstance(database, sqlite3.Connection):
+            self.connection = database
+        else:
+            self.connection = sqlite3.connect(database)
+        self.archive = archive
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS crawl_journal (
+                archive TEXT,
+                url TEXT,
+                kind TEXT,
+                status TEXT,
+                error TEXT,
+                updated REAL,
+                PRIMARY KEY (archive, url)
+            )"""
+        )
+        self.connection.commit()
+
+    def add(self, urls, kind):
+        """record pages as pending, unless they are already in the journal"""
+
+        now = time.time()
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO crawl_journal VALUES (?,?,?,?,?,?)",
+            [(self.archive, url, kind, PENDING, None, now) for url in urls],
+        )
+
+    def _set_status(self, url, kind, status, error=None):
+        now = time.time()
+        # update in place, so that pages keep their position in the journal
+        cursor = self.connection.execute(
+            "UPDATE crawl_journal SET kind = ?, status = ?, error = ?, updated = ? "
+            "WHERE archive = ? AND url = ?",
+            (kind, status, error, now, self.archive, url),
+        )
+        if cursor.rowcount == 0:
+            self.connection.execute(
+                "INSERT INTO crawl_journal VALUES (?,?,?,?,?,?)",
+                (self.archive, url, kind, status, error, now),
+            )
+
+    def mark_done(self, url, kind):
+        """record that a page and everything below it has been processed"""
+
+        self._set_status(url, kind, DONE)
+
+    def mark_failed(self, url, kind, error):
+        """record that a page could not be processed. It is retried on the next crawl"""
+
+        self._set_status(url, kind, FAILED, str(error))
+
+    def mark_skipped(self, url, kind, reason):
+        """record that a page has nothing to retrieve, e.g. because it is restricted"""
+
+        self._set_status(url, kind, SKIPPED, str(reason))
+
+    def get_status(self, url):
+        """return the status of a page, or None if it is not in the journal"""
+
+        row = self.connection.execute(
+            "SELECT status FROM crawl_journal WHERE archive = ? AND url = ?",
+            (self.archive, url),
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def is_done(self, url):
+        """return whether a page has been processed or skipped in an earlier crawl"""
+
+        return self.get_status(url) in (DONE, SKIPPED)
+
+    def get_urls(self, status, kind=None):
+        """return the pages with a given status, in the order they were recorded"""
+
+        query = "SELECT url FROM crawl_journal WHERE archive = ? AND status = ?"
+        parameters = [self.archive, status]
+        if kind:
+            query += " AND kind = ?"
+            parameters.append(kind)
+        rows = self.connection.execute(query + " ORDER BY rowid", parameters)
+        return [row[0] for row in rows]
+
+    def get_counts(self):
+        """return the number of pages for each status"""
+
+        rows = self.connection.execute(
+            "SELECT status, COUNT(*) FROM crawl_journal WHERE archive = ? GROUP BY status",
+            (self.archive,),
+        )
+        return dict(rows.fetchall())
+
+    def reset(self):
+        """forget all progress for the archive, so that the next crawl starts afresh"""
+
+        self.connection.execute(
+            "DELETE FROM crawl_journal WHERE archive = ?", (self.archive,)
+        )
+        self.connection.commit()
+
+    def commit(self):
+        """store the progress recorded since the last commit"""
+
+        self.connection.commit()
+
+    def close(self):
+        """close the database"""
+
+        self.connection.close()
@@ -9,6 +9,7 @@ from tqdm import tqdm
 import requests
 import glob
 import json
+from eldpy.crawljournal import CrawlJournal, DOWNLOAD_JOURNAL_PATH, BUNDLE, COLLECTION, FILE, DONE, FAILED, SKIPPED
 
 class DownloadProgressBar(tqdm):
     """Container for the download bar
@@ -31,30 +32,89 @@ def download_file(url, filename):
                             ) as t:
         urllib.request.urlretrieve(url, filename=filename, reporthook=t.update_to)
 
+def get_error_status(status_code):
+    """Return the journal status for a download which failed with an HTTP
+    status: FAILED if it is worth retrying, SKIPPED if it is not, e.g. for
+    restricted files.
+    """
+
+    if status_code in (408, 429) or status_code >= 500:
+        return FAILED
+    return SKIPPED
+
+
 def save_file(s, filepath, download_url, cookie):
     """Retrieve a file from an url with a given cookie.
-    Store the file locally at filepath
+    Store the file locally at filepath and return the journal status of the
+    download: DONE, FAILED for errors worth retrying, or SKIPPED otherwise.
+    Nothing is stored for error responses, and partial downloads are removed.
     """
 
-    with open(filepath, "wb") as f:
+    try:
         response = s.get(download_url, cookies=cookie, stream=True)
-        total = response.headers.get("content-length")
-        if total is None:
-            f.write(response.content)
-        else:
-            downloaded = 0
-            total = int(total)
-            for data in response.iter_content(chunk_size=max(int(total / 1000),
-                                                             1024 * 1024)
-                                             ):
-                downloaded += len(data)
-                f.write(data)
-                done = int(50 * downloaded / total)
-                sys.stdout.write(
-                    "\r[{}{}]".format("█" * done, "." * (50 - done))
-                )
-                sys.stdout.flush()
-        sys.stdout.write("\n")
+        if not 200 <= response.status_code < 300:
+            print("  could not download %s: status %i" % (download_url, response.status_code))
+            return get_error_status(response.status_code)
+        with open(filepath, "wb") as f:
+            total = response.headers.get("content-length")
+            if total is None:
+                f.write(response.content)
+            else:
+                downloaded = 0
+                total = int(total)
+                for data in response.iter_content(chunk_size=max(int(total / 1000),
+                                                                 1024 * 1024)
+                                                 ):
+                    downloaded += len(data)
+                    f.write(data)
+                    done = int(50 * downloaded / total)
+                    sys.stdout.write(
+                        "\r[{}{}]".format("█" * done, "." * (50 - done))
+                    )
+                    sys.stdout.flush()
+            sys.stdout.write("\n")
+    except requests.exceptions.RequestException as exc:
+        print("  could not download %s: %s" % (download_url, exc))
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        return FAILED
+    return DONE
+
+
+def download_files(s, journal, downloads, cookie):
+    """Download (download_url, filepath) pairs with save_file, skipping the
+    files which the journal records as done or skipped. Files which could not
+    be downloaded because of errors worth retrying are recorded as failed, so
+    that the next run retries them, and other files as skipped.
+    Return FAILED if a file has failed, and DONE otherwise.
+    """
+
+    status = DONE
+    for download_url, filepath in downloads:
+        if journal.is_done(download_url):
+            continue
+        print("  downloading %s as %s:" % (download_url, filepath))
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        file_status = save_file(s, filepath, download_url, cookie)
+        record_page(journal, download_url, FILE, file_status)
+        if file_status == FAILED:
+            status = FAILED
+    return status
+
+
+def record_page(journal, url, kind, status):
+    """Record a page with a journal status. Pages are skipped if they
+    have nothing which can be downloaded, and failed pages are visited again
+    by the next run.
+    """
+
+    if status == DONE:
+        journal.mark_done(url, kind)
+    elif status == SKIPPED:
+        journal.mark_skipped(url, kind, "not accessible")
+    else:
+        journal.mark_failed(url, kind, "not all files could be downloaded")
+    journal.commit()
 
 def url2root(s, url, cookies=None):
     "retrieve a given URL and return parsed XML as etree root"
@@ -64,21 +124,32 @@ def url2root(s, url, cookies=None):
     return root
 
 def elar_download(bundle_id, phpsessid, extension):
-    """download files from an ELAR session/bundle, using a given extension"""
+    """download files from an ELAR session/bundle, using a given extension.
+    Return the journal status of the bundle: SKIPPED if it has no accessible
+    files, FAILED if a page or file could not be retrieved because of an
+    error worth retrying, and DONE otherwise.
+    """
 
     # check for validity of ID
     try:
         soasID = bundle_id.split("oai:soas.ac.uk:")[1]
     except IndexError:  # bundle_id does not start with oai:soas.ac.uk:, so we are not interested
-        print("not a SOAS file", soasID)
-        return
+        print("not a SOAS file", bundle_id)
+        return SKIPPED
     # prepare request
     url = "https://elar.soas.ac.uk/Record/%s" % soasID
     cookies = {"PHPSESSID": phpsessid}
     print("checking", url)
     # retrieve catalog page
     with requests.Session() as s:
-        r = s.post(url, cookies=cookies)
+        try:
+            r = s.post(url, cookies=cookies)
+        except requests.exceptions.RequestException as exc:
+            print("could not retrieve", url, exc)
+            return FAILED
+        if not 200 <= r.status_code < 300:
+            print("could not retrieve", url, r.status_code)
+            return get_error_status(r.status_code)
         html = r.text
         # extract links to ELAN files
         try:
@@ -88,11 +159,12 @@ def elar_download(bundle_id, phpsessid, extension):
             }
         except AttributeError:  # not an ELAN file
             print("files are not accessible")
-            return
+            return SKIPPED
         # dowload identified files
-        if locations == []:
+        if not locations:
             print("files are not accessible")
-            return
+            return SKIPPED
+        status = DONE
         for location in locations:
             download_url = location
             bs = location.split("/")[-1].split('-b-')
@@ -107,7 +179,9 @@ def elar_download(bundle_id, phpsessid, extension):
                 filepath = os.path.join('elar', collectionname, "%s.%s" % (hash(basename[:-4]),extension))
             print("  downloading %s as %s:" % (location, filepath))
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            save_file(s, filepath, download_url, cookies)
+            if save_file(s, filepath, download_url, cookies) == FAILED:
+                status = FAILED
+        return status
 
 
 def retrieve_elar(extension, username=None, password=None, mimetype=None, offset=0):
@@ -174,9 +248,15 @@ def retrieve_elar(extension, username=None, password=None, mimetype=None, offset
     session.post(login_url, data=values)
     phpsessid = session.cookies.get_dict().get("PHPSESSID")
 
+    # bundles downloaded by an earlier run are skipped
+    journal = CrawlJournal(DOWNLOAD_JOURNAL_PATH, "ELAR %s" % extension)
+    journal.add(subset, BUNDLE)
+    journal.commit()
     for globalidentifier in subset:
-        print("offset is", offset)
-        elar_download(globalidentifier, phpsessid, extension)
+        if journal.is_done(globalidentifier):
+            continue
+        status = elar_download(globalidentifier, phpsessid, extension)
+        record_page(journal, globalidentifier, BUNDLE, status)
 
 
 def retrieve_tla(extension, username=None, password=None, pagelimit=999999):
@@ -231,13 +311,17 @@ def retrieve_tla(extension, username=None, password=None, pagelimit=999999):
             collection_urls += new_collection_urls
         collection_length = len(collection_urls)
         print(len(collection_urls), "collections")
-        OFFSET = 0
-        #OFFSET = 3390
+        # collections and files downloaded by an earlier run are skipped
+        journal = CrawlJournal(DOWNLOAD_JOURNAL_PATH, "TLA %s" % extension)
+        journal.add(collection_urls, COLLECTION)
+        journal.commit()
         #retrieve file links from collections
-        for i, c_url in enumerate(collection_urls[OFFSET:]):
+        for i, c_url in enumerate(collection_urls):
+            if journal.is_done(c_url):
+                continue
             #print("collection ", c_url)
             collection_id = c_url.split("%3A")[-1]
-            print(collection_id, "%i(+%i)/%i"%(i+1, OFFSET, collection_length))
+            print(collection_id, "%i/%i"%(i+1, collection_length))
             #c_request = s.get(c_url)
             #c_html = c_request.text
             #c_root = fromstring(c_html)
@@ -252,6 +336,7 @@ def retrieve_tla(extension, username=None, password=None, pagelimit=999999):
                 and a.text.endswith(extension)
                 ]
             #download files
+            downloads = []
             for file_tuple in file_tuples:
                 # print("  f: ", file_tuple)
                 f_url, filename, access = file_tuple
@@ -262,9 +347,9 @@ def retrieve_tla(extension, username=None, password=None, pagelimit=999999):
                 else:
                     download_url = "https://archive.mpi.nl/%s/datastream/OBJ/download" % f_url
                     filepath = os.path.join('tla', collection_id, local_basename)
-                    print("  downloading %s as %s:" % (download_url, filepath))
-                    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-                    save_file(s, filepath, download_url, {"SESSd8112b76bc7d4802dc104c36df341519": session_id})
+                    downloads.append((download_url, filepath))
+            status = download_files(s, journal, downloads, {"SESSd8112b76bc7d4802dc104c36df341519": session_id})
+            record_page(journal, c_url, COLLECTION, status)
 
 
 
@@ -302,7 +387,13 @@ def retrieve_ailla(extension, username=None, password=None, offset=0):
             "https://ailla.utexas.org/%s" % a.attrib["href"] for a in collection_links
         ]
         collections_length = len(collection_urls)
+        # collections, sessions and files downloaded by an earlier run are skipped
+        journal = CrawlJournal(DOWNLOAD_JOURNAL_PATH, "AILLA %s" % extension)
+        journal.add(collection_urls, COLLECTION)
+        journal.commit()
         for i, c_url in enumerate(collection_urls[offset:]):
+            if journal.is_done(c_url):
+                continue
             print("collection ", c_url)
             collection_id = c_url.split("%3A")[-1]
             #c_request = s.get(c_url)
@@ -314,7 +405,10 @@ def retrieve_ailla(extension, username=None, password=None, offset=0):
                 "https://ailla.utexas.org/%s" % a.attrib["href"] for a in session_links
             ]
             sessions_length = len(session_urls)
+            collection_status = DONE
             for j, s_url in enumerate(session_urls):
+                if journal.is_done(s_url):
+                    continue
                 print(
                     " session %s (c :%i(+%i)/%i; s:%i/%i)"
                     % (s_url[51:], i + 1, offset, collections_length, j + 1, sessions_length,)
@@ -329,14 +423,18 @@ def retrieve_ailla(extension, username=None, password=None, offset=0):
                     for a in file_links
                     if a.text is not None and a.text.endswith(extension)
                 ]
+                downloads = []
                 for file_tuple in file_tuples:
                     # print("  f: ", file_tuple)
                     f_url, filename = file_tuple
                     download_url = "%s/datastream/OBJ/download" % f_url
                     filepath = os.path.join('ailla', collection_id, filename)
-                    print("  downloading %s as %s:" % (download_url, filepath))
-                    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-                    save_file(s, filepath, download_url, {"SSESS64f35ecaf4903fe271ed0b0c15ee2bce": session_id})
+                    downloads.append((download_url, filepath))
+                status = download_files(s, journal, downloads, {"SSESS64f35ecaf4903fe271ed0b0c15ee2bce": session_id})
+                record_page(journal, s_url, BUNDLE, status)
+                if status == FAILED:
+                    collection_status = FAILED
+            record_page(journal, c_url, COLLECTION, collection_status)
 
 
 def retrieve_paradisec(extension, sessionkey=None):
@@ -380,9 +478,13 @@ def retrieve_paradisec(extension, sessionkey=None):
         ]
         collections_length = len(collection_urls)
         print(collections_length, "collections found")
-        OFFSET = 0
-        print("OFFSET is", OFFSET)
-        for i, c_url in enumerate(collection_urls[OFFSET:]):
+        # collections, items and files downloaded by an earlier run are skipped
+        journal = CrawlJournal(DOWNLOAD_JOURNAL_PATH, "PARADISEC %s" % extension)
+        journal.add(collection_urls, COLLECTION)
+        journal.commit()
+        for i, c_url in enumerate(collection_urls):
+            if journal.is_done(c_url):
+                continue
             print("collection ", c_url)
             collection_id = c_url.split("/")[-1]
             #c_request = s.get(c_url)
@@ -393,16 +495,21 @@ def retrieve_paradisec(extension, sessionkey=None):
                 c_root = url2root(s, c_url)
             except ValueError:
                 print("invalid XML", c_url)
+                journal.mark_failed(c_url, COLLECTION, "invalid XML")
+                journal.commit()
                 continue
             item_links = c_root.findall(".//div/div/div/fieldset/table//tr/td/a")
             item_urls = [
                 "https://catalog.paradisec.org.au%s?files_per_page=1000" % a.attrib["href"] for a in item_links if "items" in a.attrib["href"]
             ]
             items_length = len(item_urls)
+            collection_status = DONE
             for j, i_url in enumerate(item_urls):
+                if journal.is_done(i_url):
+                    continue
                 print(
-                    " session %s (c (+%i):%s/%s; s:%s/%s)"
-                    % (i_url[33:-20], OFFSET, i + 1, collections_length, j + 1, items_length)
+                    " session %s (c:%s/%s; s:%s/%s)"
+                    % (i_url[33:-20], i + 1, collections_length, j + 1, items_length)
                 )
                 #i_request = s.get(i_url, cookies=cookies)
                 #i_html = i_request.text
@@ -428,15 +535,18 @@ def retrieve_paradisec(extension, sessionkey=None):
                     f_tuples.append((f_url, collection_id, rawname))
                 print("  ", len(f_tuples), "relevant file(s) found")
                 #print(f_tuples)
+                downloads = []
                 for f_tuple in f_tuples:
                     f_url, collection_id, basename = f_tuple
                     #filename = basename
                     #print("  f: ", file_tuple)
-                    download_url = f_url
                     filepath = os.path.join('paradisec', collection_id, basename)
-                    print("  downloading %s as %s:" % (download_url, filepath))
-                    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-                    save_file(s, filepath, download_url, cookies)
+                    downloads.append((f_url, filepath))
+                status = download_files(s, journal, downloads, cookies)
+                record_page(journal, i_url, BUNDLE, status)
+                if status == FAILED:
+                    collection_status = FAILED
+            record_page(journal, c_url, COLLECTION, collection_status)
 
 
 def bulk_download(archive=None, filetype=None, username=None, password=None, pagelimit=9999999, sessionkey=None, limit=9999999, offset=0):
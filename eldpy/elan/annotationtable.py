@@ -0,0 +1,160 @@
+"""
+A columnar store for all annotations of an ELAN file
+"""
+
+import sys
+from array import array
+from collections import defaultdict
+
+from eldpy.elan.annotation import Annotation
+
+
+def get_times(id_, parent_id, timeslots, ref_annotations, alignable_annotations):
+    """
+    return start and end in ms of an annotation with the given parent ID,
+    or 0, 0 if it has no valid times
+    """
+
+    if parent_id is None:
+        slots = alignable_annotations.get(id_)
+    else:
+        # the timing of a REF_ANNOTATION is taken from its grandparent
+        slots = alignable_annotations.get(ref_annotations.get(parent_id))
+    if slots:
+        try:
+            return int(timeslots[slots[0]]), int(timeslots[slots[1]])
+        except (KeyError, ValueError):
+            pass
+    return 0, 0
+
+
+class AnnotationTable:
+    """
+    Store the annotations of an ELAN file as parallel arrays.
+
+    Every annotation is a row. IDs are interned strings, times are int32
+    offsets in ms and references to other annotations are row indexes.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self):
+        self.ids = []
+        self.texts = []
+        self.tier_ids = []  # one entry per TIER element with annotations
+        self.tiers = array("i")  # index into tier_ids
+        self.starts = array("i")
+        self.ends = array("i")
+        self.parents = array("i")  # -1 for time-aligned annotations
+        self.previous = array("i")  # -1 if there is no previous annotation
+        self.rows = {}  # annotation ID -> row
+        self.tier_rows = defaultdict(list)  # tier ID -> list of row ranges
+        # tier ID -> [number of annotations without text, number of annotations]
+        self.segment_counts = {}
+        # references to annotations which are not in the file
+        self.unresolved_parents = {}
+        self.unresolved_previous = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_records(cls, records, timeslots, ref_annotations, alignable_annotations):
+        """
+        build the table from (annotation_id, tier_id, text, parent_id,
+        previous_annotation_id) records given in document order
+        """
+
+        # pylint: disable=too-many-locals
+        table = cls()
+        ids = table.ids
+        rows = table.rows
+        current_tier_id = None
+        tier_start = 0
+        for row, (id_, tier_id, text, parent_id, previous_id) in enumerate(records):
+            id_ = sys.intern(id_)
+            ids.append(id_)
+            rows[id_] = row
+            table.texts.append(text)
+            if tier_id != current_tier_id or row == 0:
+                if row > 0:
+                    table.tier_rows[current_tier_id].append(range(tier_start, row))
+                table.tier_ids.append(sys.intern(tier_id))
+                current_tier_id = tier_id
+                tier_start = row
+            table.tiers.append(len(table.tier_ids) - 1)
+            counts = table.segment_counts.setdefault(tier_id, [0, 0])
+            counts[1] += 1
+            if not text or not text.strip():
+                counts[0] += 1
+            start, end = get_times(
+                id_, parent_id, timeslots, ref_annotations, alignable_annotations
+            )
+            table.starts.append(start)
+            table.ends.append(end)
+        if ids:
+            table.tier_rows[current_tier_id].append(range(tier_start, len(ids)))
+        # resolve references once all rows are known
+        for row, (_, _, _, parent_id, previous_id) in enumerate(records):
+            table.parents.append(table._resolve(row, parent_id, table.unresolved_parents))
+            table.previous.append(
+                table._resolve(row, previous_id, table.unresolved_previous)
+            )
+        return table
+
+    def _resolve(self, row, id_, unresolved):
+        if id_ is None:
+            return -1
+        try:
+            return self.rows[id_]
+        except KeyError:
+            unresolved[row] = id_
+            return -1
+
+    def get_segment_counts(self):
+        """return the number of annotations without text and of all annotations"""
+
+        empty_segment_count = 0
+        segment_count = 0
+        for empty, total in self.segment_counts.values():
+            empty_segment_count += empty
+            segment_count += total
+        return empty_segment_count, segment_count
+
+    def get_parent_id(self, row):
+        """return the ID of the annotation referenced by this row"""
+
+        parent = self.parents[row]
+        if parent == -1:
+            return self.unresolved_parents.get(row)
+        return self.ids[parent]
+
+    def get_previous_id(self, row):
+        """return the ID of the previous annotation in a subdivision"""
+
+        previous = self.previous[row]
+        if previous == -1:
+            return self.unresolved_previous.get(row)
+        return self.ids[previous]
+
+    def is_time_aligned(self, row):
+        """check whether this row is an ALIGNABLE_ANNOTATION"""
+
+        return self.parents[row] == -1 and row not in self.unresolved_parents
+
+    def get_rows(self, tier_id):
+        """return all rows of a tier in document order"""
+
+        return [row for rows in self.tier_rows.get(tier_id, []) for row in rows]
+
+    def get_annotation(self, id_):
+        """return a view onto the annotation with the given ID"""
+
+        return Annotation(self, self.rows[id_])
+
+    def get_annotations(self, tier_id=None):
+        """return views onto all annotations, or onto those of one tier"""
+
+        if tier_id is None:
+            return [Annotation(self, row) for row in range(len(self.ids))]
+        return [Annotation(self, row) for row in self.get_rows(tier_id)]
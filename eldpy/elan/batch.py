@@ -0,0 +1,84 @@
+"""
+Process many ELAN files in parallel
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from eldpy.elan.elanfile import ElanFile
+from eldpy.elan.eafcache import load_elanfile
+from eldpy.elan.eldpyerror import EldpyError
+
+logger = logging.getLogger("eldpy")
+
+OVERVIEW_COLUMNS = [
+    "filename",
+    "duration_timeslots",
+    "tiertype",
+    "#sentences",
+    "#words",
+    "#chars",
+    "words/stc",
+    "chars/word",
+    "duration",
+    "%sec translated",
+    "tiertype",
+    "#sentences",
+    "#words",
+    "#chars",
+    "words/stc",
+    "chars/words",
+    "duration",
+    "%sec transcribed",
+    "tiertype",
+    "#sentences",
+    "#items",
+    "distinct",
+    "repetition",
+    "zipf1",
+    "zipf2",
+    "empty_segments",
+    "total_segments",
+    "%empty",
+    "overlap_seconds",
+    "overlapping_tiers",
+    "max_concurrency",
+    "error",
+]
+
+
+def overview_row(path, cache_dir=None):
+    """
+    return the overview of one ELAN file, followed by an error column.
+    If the file cannot be analyzed, all other columns except the filename are empty.
+    """
+
+    try:
+        if cache_dir:
+            # load_elanfile returns the file populated
+            elanfile = load_elanfile(path, "www", cache_dir)
+        else:
+            elanfile = ElanFile(path, "www")
+            elanfile.populate_transcriptions()
+            elanfile.populate_translations()
+            elanfile.populate_glosses()
+        return elanfile.print_overview() + [""]
+    except EldpyError as exc:
+        filename = path.split("/")[-1]
+        return [filename] + [""] * (len(OVERVIEW_COLUMNS) - 2) + [exc.message]
+
+
+def overview_many(paths, workers=None, chunksize=8, cache_dir=None):
+    """
+    return the overviews of many ELAN files in the order of the paths given
+
+    The files are distributed in chunks over a pool of worker processes.
+    With workers=1, everything is done in the current process.
+    """
+
+    row_function = partial(overview_row, cache_dir=cache_dir)
+    if workers == 1:
+        return [row_function(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(row_function, paths, chunksize=chunksize))
@@ -0,0 +1,119 @@
+"""
+A binary cache for populated ELAN files
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+
+from eldpy.elan.elanfile import ElanFile
+
+logger = logging.getLogger("eldpy")
+
+# increment whenever the attributes of ElanFile change
+CACHE_FORMAT_VERSION = 6
+PICKLE_PROTOCOL = min(5, pickle.HIGHEST_PROTOCOL)
+
+# attributes which refer to the XML tree and are rebuilt on demand
+NOT_CACHED = (
+    "_root",
+    "_tiers_by_type",
+    "_annotationdic",
+    "_ref_annotation_texts",
+    "_annotation_records",
+    "_duration_engine",
+    "_interval_index",
+)
+
+
+def get_content_hash(path):
+    """return the SHA1 hash of the content of a file"""
+
+    hasher = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def get_cache_path(path, cache_dir, populate_kwargs):
+    """return the location of the cache file for an ELAN file"""
+
+    key = f"{CACHE_FORMAT_VERSION}:{os.path.abspath(path)}:{sorted(populate_kwargs.items())}"
+    return os.path.join(cache_dir, hashlib.sha1(key.encode("utf8")).hexdigest() + ".pickle")
+
+
+def get_signature(path):
+    """
+    return the values which must be unchanged for a cache file to be valid
+    """
+
+    stat = os.stat(path)
+    return (CACHE_FORMAT_VERSION, stat.st_size, stat.st_mtime_ns, get_content_hash(path))
+
+
+def read_cache(cache_path, signature):
+    """return the cached state if it matches the signature, None otherwise"""
+
+    try:
+        with open(cache_path, "rb") as f:
+            cached_signature, state = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        return None
+    if cached_signature != signature:
+        return None
+    return state
+
+
+def write_cache(cache_path, signature, elanfile):
+    """store the state of a populated ElanFile"""
+
+    # make sure the annotations are in the table before they are stored
+    elanfile.annotation_table  # pylint: disable=pointless-statement
+    elanfile.timeslotted_reversedic  # pylint: disable=pointless-statement
+    state = {k: v for k, v in elanfile.__dict__.items() if k not in NOT_CACHED}
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump((signature, state), f, protocol=PICKLE_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+
+
+def load_elanfile(path, url, cache_dir, namespace=None, detach=False, **populate_kwargs):
+    """
+    return a populated ElanFile, read from the cache in cache_dir
+    if the file has not changed since it was cached
+
+    The keyword arguments are passed on to ElanFile.populate. The ElanFile
+    is marked as populated, so that further calls of populate and the
+    populate_* methods keep the results. With detach, the XML tree of a file
+    which was not cached is released once it has been populated.
+    """
+
+    # pylint: disable=too-many-arguments
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = get_cache_path(path, cache_dir, populate_kwargs)
+    signature = get_signature(path)
+    state = read_cache(cache_path, signature)
+    if state is not None:
+        elanfile = ElanFile.__new__(ElanFile)
+        elanfile.__dict__.update(state)
+        for attribute in NOT_CACHED:
+            setattr(elanfile, attribute, None)
+        elanfile._xml_released = True  # pylint: disable=protected-access
+        elanfile.url = url
+        elanfile.namespace = namespace
+        elanfile.detach = detach
+        elanfile.loaded_from_cache = True
+        elanfile.populated = True
+        logger.info(f"read {path} from cache")
+        return elanfile
+    elanfile = ElanFile(path, url, namespace=namespace)
+    elanfile.populate(**populate_kwargs)
+    elanfile.get_fingerprint()
+    elanfile.populated = True
+    write_cache(cache_path, signature, elanfile)
+    elanfile.detach = detach
+    if detach:
+        elanfile.release_xml()
+    return elanfile
@@ -2,8 +2,6 @@
 A representation of an ELAN file
 """
 
-import copy
-
 # import json
 import logging
 
@@ -14,16 +12,16 @@ import logging
 import csv
 import io
 from collections import defaultdict
+from functools import partial
 from lxml import etree
 
 from eldpy.elan import annotation
 from eldpy.elan import constants
+from eldpy.elan import tierroles
 from eldpy.elan.eldpyerror import EldpyError
 from eldpy.helpers import (
     is_major_language,
-    is_id_tier,
     tier_to_annotation_id_list,
-    tier_to_wordlist,
     tier_to_id_wordlist,
     # get_alignable_annotations,
     readable_duration,
@@ -31,7 +29,6 @@ from eldpy.helpers import (
     get_words_from_transcription_tiers,
     get_words_from_translation_tiers,
     get_gloss_metadata,
-    get_annotation_text_mapping,
     get_glosstier_to_retain,
     get_line,
     get_transcription_id_dict,
@@ -41,14 +38,19 @@ from eldpy.helpers import (
 )
 
 from eldpy.elan.helpers import (
-    has_minimal_translation_length,
     sanitize,
     get_seconds_from_tier,
     create_parent_tier_dic,
-    get_segment_counts,
     get_tier_hierarchy,
     get_timeslots,
 )
+from eldpy.elan.loader import load_eaf, get_annotation_records
+from eldpy.elan.annotationtable import AnnotationTable
+from eldpy.elan.durations import DurationEngine
+from eldpy.elan.intervalindex import IntervalIndex
+from eldpy.elan.overlap import get_overlap_statistics
+from eldpy.elan.stream import EafStream
+from eldpy.elan.xpaths import ALIGNABLE_ANNOTATIONS, REF_ANNOTATIONS
 
 logging.basicConfig(filename="eldpy.log", level=logging.WARNING)
 logger = logging.getLogger("eldpy")
@@ -58,7 +60,16 @@ logger.disabled = True
 class ElanFile:
     """A representation of an ELAN file"""
 
-    def __init__(self, path, url, namespace=None):
+    def __init__(
+        self,
+        path,
+        url,
+        namespace=None,
+        single_pass=True,
+        structure_only=False,
+        detach=False,
+    ):
+        # pylint: disable=too-many-arguments
         self.path = path
         logger.info(f"starting init {self.path}")
         self.id_ = sanitize(self.path.split("/")[-1])
@@ -79,35 +90,47 @@ class ElanFile:
         self.fingerprint = None
         self.secondstranscribed = 0
         self.secondstranslated = 0
-        self.root = self.xml()
-        self.tier_hierarchy = get_tier_hierarchy(self.root, self.path)
+        self._annotation_records = None
+        self._annotation_table = None
+        self._duration_engine = None
+        self._interval_index = None
+        self._annotationdic = None
+        self._ref_annotation_texts = None
+        self._timeslottedancestors = None
+        self._timeslotted_reversedic = None
+        self._tiers_by_type = None
+        # whether the populated results were read by eafcache.load_elanfile
+        self.loaded_from_cache = False
+        # complete results, e.g. from eafcache.load_elanfile, are not populated again
+        self.populated = False
+        # with detach, the XML tree is released once populate() is done.
+        # After populate_* calls, release_xml() has to be called explicitly
+        self.detach = detach
+        self._root = None
+        self._xml_released = False
+        # (tier ID, major languages) -> whether the tier is in a major language
+        self._language_decisions = {}
+        if single_pass or structure_only:
+            self.load(structure_only=structure_only)
+        else:
+            self.root = self.xml()
+            self.tier_hierarchy = get_tier_hierarchy(self.root, self.path)
+            try:
+                self.timeslots = get_timeslots(self.root, self.path)
+            except KeyError:
+                self.timeslots = {}
+            self.alignable_annotations = {
+                el.attrib["ANNOTATION_ID"]: (
+                    el.attrib["TIME_SLOT_REF1"],
+                    el.attrib["TIME_SLOT_REF2"],
+                )
+                for el in ALIGNABLE_ANNOTATIONS(self.root)
+            }
+            self.ref_annotations = {
+                el.attrib["ANNOTATION_ID"]: el.attrib["ANNOTATION_REF"]
+                for el in REF_ANNOTATIONS(self.root)
+            }
         self.child_parent_dic = create_parent_tier_dic(self.tier_hierarchy)
-        try:
-            self.timeslots = get_timeslots(self.root, self.path)
-        except KeyError:
-            self.timeslots = {}
-        self.alignable_annotations = {
-            el.attrib["ANNOTATION_ID"]: (
-                el.attrib["TIME_SLOT_REF1"],
-                el.attrib["TIME_SLOT_REF2"],
-            )
-            for el in self.root.findall(".//ALIGNABLE_ANNOTATION")
-        }
-        self.ref_annotations = {
-            el.attrib["ANNOTATION_ID"]: el.attrib["ANNOTATION_REF"]
-            for el in self.root.findall(".//REF_ANNOTATION")
-        }
-        self.timeslottedancestors = self.get_timeslotted_parents()
-        self.timeslotted_reversedic = defaultdict(list)
-        for k in self.timeslottedancestors:
-            v = self.timeslottedancestors[k]
-            self.timeslotted_reversedic[v].append(k)
-        self.annotationdic = {
-            el[0].attrib["ANNOTATION_ID"]: annotation.Annotation(
-                el, self.timeslots, self.ref_annotations, self.alignable_annotations
-            )
-            for el in self.root.findall(".//ANNOTATION")
-        }
         self.glossed_sentences = {}
         logger.info({self.path})
 
@@ -131,6 +154,36 @@ class ElanFile:
     def __ge__(self, other):
         return self.path >= other.path
 
+    @property
+    def root(self):
+        """the XML tree, parsed again if it has been released"""
+
+        if self._root is None and self._xml_released:
+            logger.info(f"parsing {self.path} again")
+            self._root = self.xml()
+            self._xml_released = False
+        return self._root
+
+    @root.setter
+    def root(self, value):
+        self._root = value
+
+    def release_xml(self):
+        """
+        drop the XML tree and keep only the extracted structures.
+        The tree is parsed again when it is needed
+        """
+
+        if self._root is None:
+            return
+        self._root = None
+        self._tiers_by_type = None
+        self._xml_released = True
+
+    def _release_if_detached(self):
+        if self.detach:
+            self.release_xml()
+
     def xml(self):
         """return the XML representation"""
 
@@ -142,6 +195,188 @@ class ElanFile:
             ) from exc
         return root
 
+    @staticmethod
+    def stream(path):
+        """
+        return an EafStream, which yields the tiers of an ELAN file one at a
+        time, for files too large to be parsed as a whole
+        """
+
+        return EafStream(path)
+
+    def load(self, structure_only=False):
+        """
+        read the XML and fill timeslots, tier hierarchy and annotations
+        in a single traversal
+
+        With structure_only, only the header and the tier structure are
+        retained. No annotations are available in that case.
+        """
+
+        loaded = load_eaf(self.path, structure_only=structure_only)
+        self.root = loaded.tree
+        self.tier_hierarchy = loaded.tier_hierarchy
+        self.timeslots = loaded.timeslots
+        self.alignable_annotations = loaded.alignable_annotations
+        self.ref_annotations = loaded.ref_annotations
+        self._annotation_records = loaded.annotation_records
+        self._tiers_by_type = loaded.tiers_by_type
+
+    @property
+    def tiers_by_type(self):
+        """map LINGUISTIC_TYPE_REFs to the TIER elements of that type"""
+
+        if self._tiers_by_type is None:
+            self._tiers_by_type = defaultdict(list)
+            if self.root is not None:
+                for tier in self.root.iter("TIER"):
+                    self._tiers_by_type[tier.attrib["LINGUISTIC_TYPE_REF"]].append(tier)
+        return self._tiers_by_type
+
+    @property
+    def annotation_table(self):
+        """the columnar store of all annotations, computed on first access"""
+
+        if self._annotation_table is None:
+            self._annotation_table = self.get_annotation_table()
+        return self._annotation_table
+
+    @property
+    def duration_engine(self):
+        """the arrays to compute annotated durations with, computed on first access"""
+
+        if self._duration_engine is None:
+            self._duration_engine = DurationEngine(self.annotation_table)
+        return self._duration_engine
+
+    @property
+    def interval_index(self):
+        """the index of annotations by time, computed on first access"""
+
+        if self._interval_index is None:
+            self._interval_index = IntervalIndex(
+                self.annotation_table,
+                self.timeslots,
+                self.alignable_annotations,
+                self.timeslottedancestors,
+            )
+        return self._interval_index
+
+    def annotations_between(self, start_ms, end_ms, tiers=None):
+        """
+        return (tier ID, annotation ID, start, end) tuples for all annotations
+        overlapping the given stretch of time, optionally restricted to some tiers
+        """
+
+        return self.interval_index.between(start_ms, end_ms, tiers=tiers)
+
+    def annotations_at(self, points, tiers=None):
+        """
+        return the annotations found at each of a list of points in time
+        """
+
+        return self.interval_index.stab(points, tiers=tiers)
+
+    def get_overlap_statistics(self, tiers=None):
+        """
+        return the overlap in seconds of time-aligned annotations on different
+        tiers, the overlap in seconds per pair of tiers, and the maximal number
+        of tiers active at the same time.
+
+        By default, only the independent tiers (typically one per speaker) are
+        considered, as dependent tiers always overlap with their parents.
+        """
+
+        if tiers is None:
+            tiers = [d["id"] for d in self.tier_hierarchy[self.path]]
+        table = self.annotation_table
+        intervals = (
+            (tier_id, table.starts[row], table.ends[row])
+            for tier_id in tiers
+            for row in table.get_rows(tier_id)
+            if table.is_time_aligned(row)
+        )
+        total_overlap, pair_overlaps, max_concurrency = get_overlap_statistics(
+            intervals
+        )
+        return (
+            total_overlap / 1000,
+            {pair: ms / 1000 for pair, ms in pair_overlaps.items()},
+            max_concurrency,
+        )
+
+    @property
+    def annotationdic(self):
+        """map annotation IDs to annotations, computed on first access"""
+
+        if self._annotationdic is None:
+            table = self.annotation_table
+            self._annotationdic = {
+                id_: annotation.Annotation(table, row) for id_, row in table.rows.items()
+            }
+        return self._annotationdic
+
+    @property
+    def segment_counts(self):
+        """
+        map tier IDs to the number of annotations without text and the number
+        of all annotations, as counted when building the annotation table
+        """
+
+        return self.annotation_table.segment_counts
+
+    @property
+    def ref_annotation_texts(self):
+        """
+        map the IDs of REF_ANNOTATIONs to their texts, computed on first access
+        from the annotation table rather than from the XML
+        """
+
+        if self._ref_annotation_texts is None:
+            table = self.annotation_table
+            self._ref_annotation_texts = {
+                table.ids[row]: table.texts[row]
+                for row in range(len(table))
+                if not table.is_time_aligned(row)
+            }
+        return self._ref_annotation_texts
+
+    @property
+    def timeslottedancestors(self):
+        """map REF_ANNOTATION IDs to their time-aligned ancestors, computed on first access"""
+
+        if self._timeslottedancestors is None:
+            self._timeslottedancestors = self.get_timeslotted_parents()
+        return self._timeslottedancestors
+
+    @property
+    def timeslotted_reversedic(self):
+        """map time-aligned annotation IDs to their REF_ANNOTATION descendants"""
+
+        if self._timeslotted_reversedic is None:
+            self._timeslotted_reversedic = defaultdict(list)
+            for k, v in self.timeslottedancestors.items():
+                self._timeslotted_reversedic[v].append(k)
+        return self._timeslotted_reversedic
+
+    def get_annotation_table(self):
+        """
+        store all annotations of the file in an AnnotationTable
+        """
+
+        records = self._annotation_records
+        if records is None:
+            if self.root is None:
+                records = []
+            else:
+                records = get_annotation_records(self.root)
+        table = AnnotationTable.from_records(
+            records, self.timeslots, self.ref_annotations, self.alignable_annotations
+        )
+        # the records are not needed anymore once the table exists
+        self._annotation_records = None
+        return table
+
     def populate(
         self,
         transcriptioncandidates=constants.ACCEPTABLE_TRANSCRIPTION_TIER_TYPES,
@@ -152,17 +387,195 @@ class ElanFile:
     ):
         """
         fill all tiers which can be populated
+
+        Every tier is classified once, and transcriptions, translations,
+        glosses and comments are all filled from that classification.
         """
 
         # pylint: disable=too-many-arguments
-        self.populate_transcriptions(
-            candidates=transcriptioncandidates, major_languages=major_languages
-        )
-        self.populate_translations(
-            candidates=translationcandidates, major_languages=major_languages
+        if self.populated:
+            return
+        if self.root is None:
+            self.transcriptions = {}
+            self.transcriptions_with_ids = {}
+            self.translations = {}
+            self.translations_with_ids = {}
+            self.glossed_sentences = {}
+            self.comments = {}
+            self.comments_with_ids = {}
+            return
+        classification = self.classify_tiers(
+            transcriptioncandidates=transcriptioncandidates,
+            translationcandidates=translationcandidates,
+            glosscandidates=glosscandidates,
+            commentcandidates=commentcandidates,
+            major_languages=major_languages,
         )
-        self.populate_glosses(candidates=glosscandidates)
-        self.populate_comments(candidates=commentcandidates)
+        self.fill_transcriptions(classification, transcriptioncandidates)
+        self.fill_translations(classification, translationcandidates)
+        self.fill_glosses(classification, glosscandidates)
+        self.fill_comments(classification, commentcandidates)
+        self._release_if_detached()
+
+    def classify_tiers(
+        self,
+        transcriptioncandidates=(),
+        translationcandidates=(),
+        glosscandidates=(),
+        commentcandidates=(),
+        major_languages=("en",),
+    ):
+        """
+        assign a role to every tier whose type is among the candidates
+
+        Return a dictionary mapping LINGUISTIC_TYPE_REFs to lists of
+        (role, tier, wordlist with IDs) tuples in document order.
+        """
+
+        # pylint: disable=too-many-arguments
+        candidates = {
+            tierroles.TRANSCRIPTION: set(transcriptioncandidates),
+            tierroles.TRANSLATION: set(translationcandidates),
+            tierroles.GLOSS: set(glosscandidates),
+            tierroles.COMMENT: set(commentcandidates),
+        }
+        linguistic_types = set().union(*candidates.values())
+        classification = {}
+        for linguistic_type, tiers in self.tiers_by_type.items():
+            if linguistic_type not in linguistic_types:
+                continue
+            classification[linguistic_type] = []
+            for tier in tiers:
+                tier_id = tier.attrib["TIER_ID"]
+                wordlist_with_ids = tier_to_id_wordlist(tier)
+                wordlist = [el[1] for el in wordlist_with_ids]
+                role = tierroles.classify_tier(
+                    tier_id,
+                    linguistic_type,
+                    wordlist,
+                    candidates,
+                    partial(
+                        self.is_major_language_tier,
+                        tier_id,
+                        wordlist,
+                        tuple(major_languages),
+                    ),
+                )
+                if role == tierroles.ID:
+                    logger.info("skipping ID tier")
+                classification[linguistic_type].append((role, tier, wordlist_with_ids))
+        return classification
+
+    def is_major_language_tier(self, tier_id, wordlist, major_languages):
+        """
+        check whether a tier is in one of the major languages. The decision
+        is cached, so that a tier is language-detected only once
+        """
+
+        key = (tier_id, major_languages)
+        if key not in self._language_decisions:
+            self._language_decisions[key] = is_major_language(
+                wordlist, accepted_languages=major_languages, logger=logger
+            )
+        return self._language_decisions[key]
+
+    def get_classified_tiers(self, classification, candidates, role):
+        """
+        yield the linguistic type, tier and wordlist with IDs of all tiers of
+        the given role, ordered by candidates and then by document order
+        """
+
+        for candidate in dict.fromkeys(candidates):
+            for tier_role, tier, wordlist_with_ids in classification.get(candidate, []):
+                if tier_role == role:
+                    yield candidate, tier, wordlist_with_ids
+
+    def fill_transcriptions(self, classification, candidates):
+        """fill the attribute transcriptions from a tier classification"""
+
+        transcriptions = defaultdict(dict)
+        transcriptions_with_ids = defaultdict(dict)
+        time_in_seconds = []
+        for candidate, tier, wordlist_with_ids in self.get_classified_tiers(
+            classification, candidates, tierroles.TRANSCRIPTION
+        ):
+            tier_id = tier.attrib["TIER_ID"]
+            newseconds = get_seconds_from_tier(
+                self.annotation_table, tier_id, engine=self.duration_engine
+            )
+            time_in_seconds.append(newseconds)
+            transcriptions[candidate][tier_id] = [el[1] for el in wordlist_with_ids]
+            transcriptions_with_ids[candidate][tier_id] = wordlist_with_ids
+        self.secondstranscribed += sum(time_in_seconds)
+        if len(transcriptions) > 0:
+            self.transcriptions = transcriptions
+            self.transcriptions_with_ids = transcriptions_with_ids
+
+    def fill_translations(self, classification, candidates):
+        """fill the attribute translations from a tier classification"""
+
+        translations = defaultdict(dict)
+        translations_with_ids = defaultdict(dict)
+        time_in_seconds = []
+        for candidate, tier, wordlist_with_ids in self.get_classified_tiers(
+            classification, candidates, tierroles.TRANSLATION
+        ):
+            tier_id = tier.attrib["TIER_ID"]
+            wordlist = [el[1] for el in wordlist_with_ids]
+            newseconds = get_seconds_from_tier(
+                self.annotation_table, tier_id, engine=self.duration_engine
+            )
+            time_in_seconds.append(newseconds)
+            translations[candidate][tier_id] = wordlist
+            tmp = tier_to_annotation_id_list(tier)
+            translations_with_ids[candidate][tier_id] = {
+                x[1]: wordlist[i] for i, x in enumerate(tmp)
+            }
+        self.secondstranslated += sum(time_in_seconds)
+        if len(translations) > 0:
+            self.translations = translations
+            self.translations_with_ids = translations_with_ids
+
+    def fill_comments(self, classification, candidates, comment_tier_id_to_retain=None):
+        """fill the attribute comments from a tier classification"""
+
+        comments = defaultdict(dict)
+        comments_with_ids = defaultdict(dict)
+        for candidate, tier, wordlist_with_ids in self.get_classified_tiers(
+            classification, candidates, tierroles.COMMENT
+        ):
+            tier_id = tier.attrib["TIER_ID"]
+            if comment_tier_id_to_retain and comment_tier_id_to_retain != tier_id:
+                continue
+            wordlist = [el[1] for el in wordlist_with_ids]
+            comments[candidate][tier_id] = wordlist
+            tmp = tier_to_annotation_id_list(tier)
+            comments_with_ids[candidate][tier_id] = {
+                x[1]: wordlist[i] for i, x in enumerate(tmp)
+            }
+        if len(comments) > 0:
+            self.comments = comments
+            self.comments_with_ids = comments_with_ids
+
+    def fill_glosses(self, classification, candidates, candidate_tier_name=False):
+        """fill the attribute glossed_sentences from a tier classification"""
+
+        retrieved_glosstiers = {}
+        for candidate, tier, _ in self.get_classified_tiers(
+            classification, candidates, tierroles.GLOSS
+        ):
+            tier_id = tier.attrib["TIER_ID"]
+            if candidate_tier_name and tier_id != candidate_tier_name:
+                continue
+            retrieved_glosstiers.setdefault(candidate, {})
+            retrieved_glosstiers[candidate][tier_id] = get_glossed_sentences(
+                self.annotation_table,
+                self.annotation_table.get_rows(tier_id),
+                self.timeslottedancestors,
+                self.ref_annotation_texts,
+                logger=logger,
+            )
+        self.glossed_sentences = retrieved_glosstiers
 
     def populate_transcriptions(
         self,
@@ -171,48 +584,19 @@ class ElanFile:
     ):
         """fill the attribute transcriptions with translations from the ELAN file"""
 
-        transcriptions = defaultdict(dict)
-        transcriptions_with_ids = defaultdict(dict)
-        root = self.root
-        if root is None:
+        if self.populated:
+            return
+        if self.root is None:
             self.transcriptions = {}
             self.transcriptions_with_ids = {}
             return
         # we check the XML file which of the frequent names for transcription tiers it uses
         # there might be several transcription tiers with different names, hence we store them
         # in a dictionary
-        time_in_seconds = []
-        for candidate in candidates:
-            # try different LINGUISTIC_TYPE_REF's to identify the relevant tiers
-            querystring = f"TIER[@LINGUISTIC_TYPE_REF='{candidate}']"
-            vernaculartiers = root.findall(querystring)
-            for tier in vernaculartiers:
-                tier_id = tier.attrib["TIER_ID"]
-                wordlist_with_ids = tier_to_id_wordlist(tier)
-                wordlist = [el[1] for el in wordlist_with_ids]
-                if wordlist == []:
-                    continue
-                if is_id_tier(wordlist):
-                    logger.info("skipping ID tier")
-                    continue
-                if is_major_language(
-                    wordlist, accepted_languages=major_languages, logger=logger
-                ):
-                    continue
-                newseconds = get_seconds_from_tier(
-                    tier,
-                    self.timeslots,
-                    self.ref_annotations,
-                    self.alignable_annotations,
-                    self.root,
-                )
-                time_in_seconds.append(newseconds)
-                transcriptions[candidate][tier_id] = wordlist
-                transcriptions_with_ids[candidate][tier_id] = wordlist_with_ids
-        self.secondstranscribed += sum(time_in_seconds)
-        if len(transcriptions) > 0:
-            self.transcriptions = transcriptions
-            self.transcriptions_with_ids = transcriptions_with_ids
+        classification = self.classify_tiers(
+            transcriptioncandidates=candidates, major_languages=major_languages
+        )
+        self.fill_transcriptions(classification, candidates)
 
     def populate_translations(
         self,
@@ -221,59 +605,16 @@ class ElanFile:
     ):
         """fill the attribute translation with translations from the ELAN file"""
 
-        root = self.root
-        if root is None:
+        if self.populated:
+            return
+        if self.root is None:
             self.translations = {}
             self.translations_with_ids = {}
             return
-        # we check the XML file which of the frequent names for translation tiers it uses
-        # there might be several translation tiers with different names, hence we store them
-        # in a dictionary
-        translations = defaultdict(dict)
-        translations_with_ids = defaultdict(dict)
-        time_in_seconds = []
-        for candidate in candidates:
-            # try different LINGUISTIC_TYPE_REF's to identify the relevant tiers
-            querystring = f"TIER[@LINGUISTIC_TYPE_REF='{candidate}']"
-            translationtiers = root.findall(querystring)
-            if translationtiers != []:  # we found a tier of the linguistic type
-                for tier in translationtiers:
-                    tier_id = tier.attrib["TIER_ID"]
-                    wordlist = tier_to_wordlist(tier)
-                    if wordlist == []:
-                        continue
-                    # Sometimes, annotators put non-English contents in translation tiers
-                    # For our purposes, we want to discard such content
-                    if not is_major_language(
-                        wordlist,
-                        accepted_languages=major_languages,
-                        # spanish=spanish,
-                        # french=french,
-                        # portuguese=portuguese,
-                        # indonesian=indonesian,
-                        # russian=russian,
-                        logger=logger,
-                    ):
-                        continue
-                    if not has_minimal_translation_length(wordlist, tier_id):
-                        continue
-                    newseconds = get_seconds_from_tier(
-                        tier,
-                        self.timeslots,
-                        self.ref_annotations,
-                        self.alignable_annotations,
-                        self.root,
-                    )
-                    time_in_seconds.append(newseconds)
-                    translations[candidate][tier_id] = wordlist
-                    tmp = tier_to_annotation_id_list(tier)
-                    translations_with_ids[candidate][tier_id] = {
-                        x[1]: wordlist[i] for i, x in enumerate(tmp)
-                    }
-        self.secondstranslated += sum(time_in_seconds)
-        if len(translations) > 0:
-            self.translations = translations
-            self.translations_with_ids = translations_with_ids
+        classification = self.classify_tiers(
+            translationcandidates=candidates, major_languages=major_languages
+        )
+        self.fill_translations(classification, candidates)
 
     def populate_comments(
         self,
@@ -284,40 +625,18 @@ class ElanFile:
         fill the attribute comment with comments from the ELAN file
         """
 
-        commentcandidates = candidates
-        root = self.root
-        if root is None:
+        if self.populated:
+            return
+        if self.root is None:
             self.comments = {}
             self.comments_with_ids = {}
             return
-        # we check the XML file which of the frequent names for comment tiers it uses
-        # there might be several comment tiers with different names, hence we store them
-        # in a dictionary
-        comments = defaultdict(dict)
-        comments_with_ids = defaultdict(dict)
-        for candidate in commentcandidates:
-            # try different LINGUISTIC_TYPE_REF's to identify the relevant tiers
-            querystring = f"TIER[@LINGUISTIC_TYPE_REF='{candidate}']"
-            commenttiers = root.findall(querystring)
-            if commenttiers != []:  # we found a tier of the linguistic type
-                for tier in commenttiers:
-                    tier_id = tier.attrib["TIER_ID"]
-                    if (
-                        comment_tier_id_to_retain
-                        and comment_tier_id_to_retain != tier_id
-                    ):
-                        continue
-                    wordlist = tier_to_wordlist(tier)
-                    if wordlist == []:
-                        continue
-                    comments[candidate][tier_id] = wordlist
-                    tmp = tier_to_annotation_id_list(tier)
-                    comments_with_ids[candidate][tier_id] = {
-                        x[1]: wordlist[i] for i, x in enumerate(tmp)
-                    }
-        if len(comments) > 0:
-            self.comments = comments
-            self.comments_with_ids = comments_with_ids
+        classification = self.classify_tiers(commentcandidates=candidates)
+        self.fill_comments(
+            classification,
+            candidates,
+            comment_tier_id_to_retain=comment_tier_id_to_retain,
+        )
 
     def populate_glosses(
         self,
@@ -326,40 +645,16 @@ class ElanFile:
     ):
         """retrieve all glosses from an eaf file and map to text from parent annotation"""
 
-        root = self.root
-        if root is None:
+        if self.populated:
+            return
+        if self.root is None:
             self.glossed_sentences = {}
             logger.warning(f"No glossed sentences in {self.path}")
             return
-        mapping = get_annotation_text_mapping(root)
-        retrieved_glosstiers = {}
-        for candidate in candidates:
-            if candidate_tier_name:
-                querystring = f"TIER[@LINGUISTIC_TYPE_REF='{candidate}']"+"[@TIER_ID='{candidate_tier_name}]"
-            else:
-                querystring = f"TIER[@LINGUISTIC_TYPE_REF='{candidate}']"
-            glosstiers = root.findall(querystring)
-            if glosstiers != []:
-                # we found a tier of the linguistic type
-                retrieved_glosstiers[candidate] = {}
-                for tier in glosstiers:
-                    tier_id = tier.attrib["TIER_ID"]
-                    annotations = [
-                        annotation.Annotation(
-                            el,
-                            self.timeslots,
-                            self.ref_annotations,
-                            self.alignable_annotations,
-                        )
-                        for el in tier.findall(".//ANNOTATION")
-                    ]
-                    retrieved_glosstiers[candidate][tier_id] = get_glossed_sentences(
-                        annotations, self.timeslottedancestors, mapping, logger=logger
-                    )
-        if len(retrieved_glosstiers) > 0:
-            self.glossed_sentences = retrieved_glosstiers
-        else:
-            self.glossed_sentences = {}
+        classification = self.classify_tiers(glosscandidates=candidates)
+        self.fill_glosses(
+            classification, candidates, candidate_tier_name=candidate_tier_name
+        )
 
     def get_translations(self):
         """return a list of lists of translations per tier"""
@@ -379,20 +674,20 @@ class ElanFile:
             for tier_id in self.transcriptions[tier_type]
         ]
 
-    def get_cldfs(self, provided_gloss_tier_name=False, matrix=False):
+    def get_cldfs(self, provided_gloss_tier_name=False, matrix=False, out=None):
         """
         return a representation of the ELAN file in the
-        Cross-Linguistic Data Format"""
+        Cross-Linguistic Data Format
 
-        tmp_transcription_dic = copy.deepcopy(self.transcriptions_with_ids)
-        transcription_id_dict = get_transcription_id_dict(tmp_transcription_dic)
-        translation_id_dict = get_translation_id_dict(
-            copy.deepcopy(self.translations_with_ids)
-        )
-        comments_id_dict = get_comments_id_dict(copy.deepcopy(self.comments_with_ids))
+        If a file object is given as out, the rows are written to it
+        and nothing is returned."""
+
+        transcription_id_dict = get_transcription_id_dict(self.transcriptions_with_ids)
+        translation_id_dict = get_translation_id_dict(self.translations_with_ids)
+        comments_id_dict = get_comments_id_dict(self.comments_with_ids)
         try:
             glosses, glosstiername_to_retain = get_glosstier_to_retain(
-                copy.deepcopy(self.glossed_sentences), provided_gloss_tier_name
+                self.glossed_sentences, provided_gloss_tier_name
             )
         except AttributeError as exc:
             raise EldpyError(
@@ -405,7 +700,33 @@ class ElanFile:
                 f"Glosses could not be retrieved from {self.path} > {glosstiername_to_retain}",
                 logger,
             )
-        lines = []
+        lines = self.get_cldf_lines(
+            glosses, transcription_id_dict, translation_id_dict, comments_id_dict
+        )
+        if matrix:
+            return list(lines)
+        if out is None:
+            cldfstringbuffer = io.StringIO()
+        else:
+            cldfstringbuffer = out
+        csv_writer = csv.writer(
+            cldfstringbuffer, delimiter=",", quotechar='"', quoting=csv.QUOTE_ALL
+        )
+        csv_writer.writerow(
+            "ID Primary_Text Analyzed_Word Gloss Translated_Text Comment LGRConformance".split()
+        )
+        csv_writer.writerows(lines)
+        if out is None:
+            return cldfstringbuffer.getvalue()
+        return None
+
+    def get_cldf_lines(
+        self, glosses, transcription_id_dict, translation_id_dict, comments_id_dict
+    ):
+        """
+        yield one CLDF row per glossed sentence, skipping empty ones
+        """
+
         for g in glosses:
             line = get_line(
                 g,
@@ -419,19 +740,7 @@ class ElanFile:
             if "".join(line[1:4]).strip() == "":
                 # print(line)
                 continue
-            lines.append(line)
-        if matrix:
-            return lines
-        cldfstringbuffer = io.StringIO()
-        csv_writer = csv.writer(
-            cldfstringbuffer, delimiter=",", quotechar='"', quoting=csv.QUOTE_ALL
-        )
-        csv_writer.writerow(
-            "ID Primary_Text Analyzed_Word Gloss Translated_Text Comment LGRConformance".split()
-        )
-        for line in lines:
-            csv_writer.writerow(line)
-        return cldfstringbuffer.getvalue()
+            yield line
 
     def get_fingerprint(self):
         """
@@ -500,26 +809,44 @@ class ElanFile:
 
     def get_timeslotted_parents(self):
         """
-        return the ulimate ancestor of this annotation which has timing information
+        return the ulimate ancestor of each REF_ANNOTATION which has timing information
         """
 
-        def get_timeslotted_parent(child_id, d):
-            parent_id = self.ref_annotations[child_id]
-            if parent_id in self.alignable_annotations:
-                # parent is an alignable_annotation with timecodes
-                return parent_id
-            if parent_id in d:
-                # we had already established who the ultimate ancestor of the parent is
-                d[child_id] = d[
-                    parent_id
-                ]  # the ultimate ancestor or ego is the same as the ua of ego's father
-                return d[parent_id]
-            # this parent element is unknown
-            return get_timeslotted_parent(parent_id, d)
-
-        d = copy.copy(self.alignable_annotations)
-        a = {ra: get_timeslotted_parent(ra, d) for ra in self.ref_annotations}
-        return a
+        alignable_annotations = self.alignable_annotations
+        ref_annotations = self.ref_annotations
+        # ancestors of REF_ANNOTATIONs which have already been resolved
+        resolved = {}
+        for ra in ref_annotations:
+            if ra in resolved:
+                continue
+            # walk up the chain until we reach a time-aligned or an already resolved annotation
+            path = []
+            on_path = set()
+            current = ra
+            while True:
+                path.append(current)
+                on_path.add(current)
+                parent_id = ref_annotations[current]
+                if parent_id in alignable_annotations:
+                    ancestor = parent_id
+                    break
+                if parent_id in resolved:
+                    ancestor = resolved[parent_id]
+                    break
+                if parent_id not in ref_annotations or parent_id in on_path:
+                    # dangling or circular reference
+                    ancestor = None
+                    logger.warning(
+                        f"no time-aligned ancestor for {ra} in {self.path}"
+                    )
+                    break
+                current = parent_id
+            # all annotations on the path share the same ancestor
+            for id_ in path:
+                resolved[id_] = ancestor
+        return {
+            ra: resolved[ra] for ra in ref_annotations if resolved[ra] is not None
+        }
 
     def print_overview(
         self,
@@ -612,11 +939,16 @@ class ElanFile:
             transcribed_word_count = -1
         if distinct_glosses == {}:
             distinct_glosses = {None: True}
-        empty_segment_count, segment_count = get_segment_counts(self.root, self.path)
+        empty_segment_count, segment_count = self.annotation_table.get_segment_counts()
         try:
             empty_segment_ratio = empty_segment_count / segment_count
         except ZeroDivisionError:
             empty_segment_ratio = -1
+        overlap_seconds, pair_overlaps, max_concurrency = self.get_overlap_statistics()
+        pair_overlaps_string = ",".join(
+            f"{tier_a}+{tier_b}:{round(seconds, 2)}"
+            for (tier_a, tier_b), seconds in sorted(pair_overlaps.items())
+        )
         outputstring = "\t".join(
             [
                 filename,
@@ -650,6 +982,10 @@ class ElanFile:
                 str(empty_segment_count),
                 str(segment_count),
                 str(round(empty_segment_ratio * 100, 2)),
+                # #
+                str(round(overlap_seconds, 2)),
+                pair_overlaps_string,
+                str(max_concurrency),
             ]
         )
         # writer.write(f"{outputstring}\n")
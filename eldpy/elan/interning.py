@@ -0,0 +1,140 @@
+"""
+Share repeated strings between the ElanFiles of a corpus
+"""
+
+import sys
+
+# longer strings are typically sentences, which rarely repeat
+INTERN_MAX_LENGTH = 32
+
+
+def intern_text(s):
+    """intern a string if it is short enough to be likely to repeat"""
+
+    if isinstance(s, str) and len(s) <= INTERN_MAX_LENGTH:
+        return sys.intern(s)
+    return s
+
+
+def rebuild(d, items):
+    """
+    return a dictionary of the same type as d (keeping the default factory
+    of a defaultdict) with the given items, in their order
+    """
+
+    new = d.copy()
+    new.clear()
+    new.update(items)
+    return new
+
+
+def intern_keys(d, values=False):
+    """return a copy of a dictionary with interned keys, and optionally values"""
+
+    if values:
+        return rebuild(d, ((intern_text(k), intern_text(v)) for k, v in d.items()))
+    return rebuild(d, ((intern_text(k), v) for k, v in d.items()))
+
+
+def intern_tier_hierarchy(tier_hierarchy):
+    """return the tier hierarchy with interned tier IDs, constraints and types"""
+
+    for children in tier_hierarchy.values():
+        for child in children:
+            for key, value in child.items():
+                child[key] = intern_text(value)
+    return intern_keys(tier_hierarchy)
+
+
+def intern_structure(elanfile):
+    """
+    intern the tier structure, timeslot and annotation IDs and the short
+    annotation texts of an ElanFile
+    """
+
+    # pylint: disable=protected-access
+    elanfile.tier_hierarchy = intern_tier_hierarchy(elanfile.tier_hierarchy)
+    elanfile.child_parent_dic = intern_keys(elanfile.child_parent_dic, values=True)
+    elanfile.timeslots = intern_keys(elanfile.timeslots, values=True)
+    elanfile.alignable_annotations = rebuild(
+        elanfile.alignable_annotations,
+        (
+            (intern_text(k), (intern_text(v[0]), intern_text(v[1])))
+            for k, v in elanfile.alignable_annotations.items()
+        ),
+    )
+    elanfile.ref_annotations = intern_keys(elanfile.ref_annotations, values=True)
+    if elanfile._tiers_by_type is not None:
+        elanfile._tiers_by_type = intern_keys(elanfile._tiers_by_type)
+    for record in elanfile._annotation_records or []:
+        record[:] = [intern_text(x) for x in record]
+    if elanfile._annotation_table is not None:
+        texts = elanfile._annotation_table.texts
+        texts[:] = [intern_text(text) for text in texts]
+        # built from the texts before they were interned
+        elanfile._ref_annotation_texts = None
+
+
+def intern_populated(elanfile):
+    """
+    intern tier types, tier IDs, annotation IDs and short texts such as gloss
+    labels in the populated transcriptions, translations, comments and glosses
+    """
+
+    def per_tier(populated, intern_tier):
+        return rebuild(
+            populated,
+            (
+                (
+                    intern_text(tier_type),
+                    rebuild(
+                        tiers,
+                        (
+                            (intern_text(tier_id), intern_tier(content))
+                            for tier_id, content in tiers.items()
+                        ),
+                    ),
+                )
+                for tier_type, tiers in populated.items()
+            ),
+        )
+
+    def intern_list(texts):
+        return [intern_text(text) for text in texts]
+
+    def intern_pairs(pairs):
+        return [tuple(intern_text(x) for x in pair) for pair in pairs]
+
+    def intern_dict(texts):
+        return intern_keys(texts, values=True)
+
+    def intern_sentences(sentences):
+        return [
+            {
+                intern_text(sentence_id): [
+                    [intern_text(x) for x in word_gloss] for word_gloss in words
+                ]
+                for sentence_id, words in sentence.items()
+            }
+            for sentence in sentences
+        ]
+
+    for attribute, intern_tier in (
+        ("transcriptions", intern_list),
+        ("transcriptions_with_ids", intern_pairs),
+        ("translations", intern_list),
+        ("translations_with_ids", intern_dict),
+        ("comments", intern_list),
+        ("comments_with_ids", intern_dict),
+        ("glossed_sentences", intern_sentences),
+    ):
+        setattr(
+            elanfile, attribute, per_tier(getattr(elanfile, attribute), intern_tier)
+        )
+
+
+def intern_elanfile(elanfile):
+    """intern the structure and the populated results of an ElanFile"""
+
+    intern_structure(elanfile)
+    intern_populated(elanfile)
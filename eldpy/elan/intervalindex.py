@@ -0,0 +1,135 @@
+"""
+An index of annotations by time for range and point queries
+"""
+
+import numpy as np
+
+
+class IntervalIndex:
+    """
+    Find the annotations which overlap a stretch of time.
+
+    REF_ANNOTATIONs get the times of their time-aligned ancestor. Annotations
+    without valid times are not indexed. Annotations are put into buckets of
+    similar length, in which they are sorted by start time. In a bucket, only
+    annotations starting less than its maximal length before the query can
+    overlap it, so a long annotation does not widen the search among short
+    ones, and the rows scanned are about proportional to the hits.
+    Intervals are half-open, so an annotation from 1000 to 2000 ms does not
+    overlap a query starting at 2000 ms.
+    """
+
+    def __init__(self, table, timeslots, alignable_annotations, timeslottedancestors):
+        rows = []
+        starts = []
+        ends = []
+        for row, id_ in enumerate(table.ids):
+            if table.is_time_aligned(row):
+                slots = alignable_annotations.get(id_)
+            else:
+                slots = alignable_annotations.get(timeslottedancestors.get(id_))
+            try:
+                start = int(timeslots[slots[0]])
+                end = int(timeslots[slots[1]])
+            except (KeyError, TypeError, ValueError):
+                continue
+            rows.append(row)
+            starts.append(start)
+            ends.append(end)
+        order = np.argsort(np.array(starts, dtype=np.int64), kind="stable")
+        self.table = table
+        self.rows = np.array(rows, dtype=np.int64)[order]
+        self.starts = np.array(starts, dtype=np.int64)[order]
+        self.ends = np.array(ends, dtype=np.int64)[order]
+        self.tiers = np.frombuffer(table.tiers, dtype=np.int32)[self.rows]
+        # lengths from 2**(k-1) to 2**k - 1 go into bucket k. Each bucket holds
+        # positions in the arrays above, and thus is sorted by start time
+        lengths = np.maximum(self.ends - self.starts, 0)
+        bucket_numbers = np.zeros(len(lengths), dtype=np.int64)
+        nonzero = lengths > 0
+        bucket_numbers[nonzero] = np.floor(np.log2(lengths[nonzero])).astype(np.int64) + 1
+        self.buckets = []
+        for bucket_number in np.unique(bucket_numbers):
+            positions = np.flatnonzero(bucket_numbers == bucket_number)
+            self.buckets.append(
+                (positions, self.starts[positions], int(lengths[positions].max()))
+            )
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _get_tier_mask(self, tiers):
+        if tiers is None:
+            return None
+        tiers = set(tiers)
+        tier_indexes = [
+            i for i, tier_id in enumerate(self.table.tier_ids) if tier_id in tiers
+        ]
+        return np.isin(self.tiers, tier_indexes)
+
+    def _get_hits(self, candidates, query_start, tier_mask):
+        hits = np.sort(candidates)
+        hits = hits[self.ends[hits] > query_start]
+        if tier_mask is not None:
+            hits = hits[tier_mask[hits]]
+        table = self.table
+        return [
+            (
+                table.tier_ids[self.tiers[i]],
+                table.ids[self.rows[i]],
+                int(self.starts[i]),
+                int(self.ends[i]),
+            )
+            for i in hits
+        ]
+
+    def between(self, start_ms, end_ms, tiers=None):
+        """
+        return (tier ID, annotation ID, start, end) tuples for all annotations
+        overlapping the interval from start_ms to end_ms, ordered by start time
+        """
+
+        return self.between_many([(start_ms, end_ms)], tiers=tiers)[0]
+
+    def between_many(self, intervals, tiers=None):
+        """
+        return the overlapping annotations for each of a list of (start, end)
+        intervals, as between() would
+        """
+
+        intervals = np.asarray(intervals, dtype=np.int64).reshape(-1, 2)
+        query_starts = intervals[:, 0]
+        query_ends = intervals[:, 1]
+        # in each bucket, the annotations before lower end before the query
+        # starts, and those from upper on start after the query ends
+        bounds = [
+            (
+                positions,
+                np.searchsorted(starts, query_starts - max_length, side="right"),
+                np.searchsorted(starts, query_ends, side="left"),
+            )
+            for positions, starts, max_length in self.buckets
+        ]
+        tier_mask = self._get_tier_mask(tiers)
+        results = []
+        for i, query_start in enumerate(query_starts):
+            candidates = [
+                positions[lowers[i] : uppers[i]]
+                for positions, lowers, uppers in bounds
+                if lowers[i] < uppers[i]
+            ]
+            if not candidates:
+                results.append([])
+                continue
+            results.append(
+                self._get_hits(np.concatenate(candidates), query_start, tier_mask)
+            )
+        return results
+
+    def stab(self, points, tiers=None):
+        """
+        return the annotations which contain each of a list of points in time
+        """
+
+        points = np.asarray(points, dtype=np.int64)
+        return self.between_many(np.stack([points, points + 1], axis=1), tiers=tiers)
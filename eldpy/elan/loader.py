@@ -0,0 +1,236 @@
+"""
+Single-pass loading of ELAN files
+"""
+
+import logging
+from collections import defaultdict
+from lxml import etree
+
+from eldpy.elan.eldpyerror import EldpyError
+from eldpy.elan.xpaths import ANNOTATIONS_OF_TIER, TIERS, get_value
+
+logger = logging.getLogger("eldpy")
+
+
+class LoadedEaf:
+    """the indexes of an ELAN file as collected in one traversal of the XML"""
+
+    def __init__(self):
+        self.tree = None
+        self.timeslots = {}
+        self.tier_hierarchy = defaultdict(list)
+        self.alignable_annotations = {}
+        self.ref_annotations = {}
+        # LINGUISTIC_TYPE_REF -> TIER elements
+        self.tiers_by_type = defaultdict(list)
+        # (annotation_id, tier_id, text, parent_id, previous_annotation_id)
+        # in document order
+        self.annotation_records = []
+
+
+STRUCTURE_TAGS = ("TIME_SLOT", "TIME_ORDER", "TIER", "LINGUISTIC_TYPE")
+
+
+class EafReader:
+    """
+    Read an ELAN file with iterparse.
+
+    Iterating over the reader yields a (tag, element, data) tuple for every
+    ALIGNABLE_ANNOTATION, REF_ANNOTATION and TIER. For annotations, data is
+    an (annotation_id, text, parent_id, previous_annotation_id) tuple. Their
+    tier is only known once the TIER has been read, for which data is a
+    (tier_id, parent_ref, linguistic_type) tuple. Timeslots, the ID
+    references between annotations and the tier hierarchy are collected in
+    the attributes of the reader. The dictionaries are updated in place, so
+    they can be used while the file is being read. The tier hierarchy is
+    only complete once the file has been read, as LINGUISTIC_TYPEs follow
+    the tiers.
+
+    With discard_read, all elements except annotations and tiers are freed
+    as soon as they have been read. Annotations and tiers have to be freed by
+    the caller, e.g. with discard().
+    """
+
+    def __init__(self, path, tag=None, discard_read=False):
+        self.path = path
+        self.tag = tag
+        self.discard_read = discard_read
+        self.root = None
+        self.timeslots = {}
+        # annotation ID -> (TIME_SLOT_REF1, TIME_SLOT_REF2)
+        self.alignable_annotations = {}
+        # annotation ID -> ANNOTATION_REF
+        self.ref_annotations = {}
+        self.linguistic_types = {}
+        self.tiers = []
+        self.tier_hierarchy = defaultdict(list)
+
+    def __iter__(self):
+        # pylint: disable=too-many-branches
+        value_text = None
+        timeslots_complete = True
+        has_time_order = False
+        try:
+            context = etree.iterparse(self.path, events=("end",), tag=self.tag)
+            for _, el in context:
+                tag = el.tag
+                if tag == "ANNOTATION_VALUE":
+                    value_text = el.text
+                    continue
+                if tag == "ALIGNABLE_ANNOTATION":
+                    attrib = el.attrib
+                    annotation_id = attrib["ANNOTATION_ID"]
+                    self.alignable_annotations[annotation_id] = (
+                        attrib["TIME_SLOT_REF1"],
+                        attrib["TIME_SLOT_REF2"],
+                    )
+                    yield tag, el, (annotation_id, value_text, None, None)
+                    value_text = None
+                    continue
+                if tag == "REF_ANNOTATION":
+                    attrib = el.attrib
+                    annotation_id = attrib["ANNOTATION_ID"]
+                    parent_id = attrib["ANNOTATION_REF"]
+                    self.ref_annotations[annotation_id] = parent_id
+                    record = (
+                        annotation_id,
+                        value_text,
+                        parent_id,
+                        attrib.get("PREVIOUS_ANNOTATION"),
+                    )
+                    yield tag, el, record
+                    value_text = None
+                    continue
+                if tag == "TIER":
+                    attrib = el.attrib
+                    tier = (
+                        attrib["TIER_ID"],
+                        attrib.get("PARENT_REF", self.path),
+                        attrib["LINGUISTIC_TYPE_REF"],
+                    )
+                    self.tiers.append(tier)
+                    yield tag, el, tier
+                    continue
+                if tag == "TIME_SLOT":
+                    try:
+                        self.timeslots[el.attrib["TIME_SLOT_ID"]] = el.attrib[
+                            "TIME_VALUE"
+                        ]
+                    except KeyError:
+                        timeslots_complete = False
+                elif tag == "TIME_ORDER":
+                    has_time_order = True
+                    if not timeslots_complete:
+                        # mirror the DOM loader, which discards all timeslots
+                        # if one has no value
+                        self.timeslots.clear()
+                elif tag == "LINGUISTIC_TYPE":
+                    self.linguistic_types[el.attrib["LINGUISTIC_TYPE_ID"]] = (
+                        el.attrib.get("CONSTRAINTS")
+                    )
+                if self.discard_read:
+                    discard(el)
+        except etree.XMLSyntaxError as exc:
+            raise EldpyError(
+                f"the file {self.path} is not valid XML", logger=logger
+            ) from exc
+        self.root = context.root
+        if not has_time_order:
+            self.timeslots.clear()
+        self.tier_hierarchy.update(
+            build_tier_hierarchy(self.tiers, self.linguistic_types, self.path)
+        )
+
+
+def build_tier_hierarchy(tiers, linguistic_types, path):
+    """
+    map the IDs of parent tiers, or the path for top-level tiers, to the
+    ID, constraint and linguistic type of their children, given
+    (tier_id, parent_ref, linguistic_type) tuples and a dictionary of the
+    constraints of linguistic types
+    """
+
+    tier_hierarchy = defaultdict(list)
+    for tier_id, parent_ref, linguistic_type in tiers:
+        try:
+            constraint = linguistic_types[linguistic_type]
+        except KeyError as exc:
+            raise EldpyError(
+                f"reference to unknown LINGUISTIC_TYPE_ID {linguistic_type} when establishing constraints in {path}",
+                logger=logger,
+            ) from exc
+        tier_hierarchy[parent_ref].append(
+            {"id": tier_id, "constraint": constraint, "ltype": linguistic_type}
+        )
+    return tier_hierarchy
+
+
+def discard(el):
+    """free an element which has been read, together with its read siblings"""
+
+    el.clear()
+    parent = el.getparent()
+    if parent is not None:
+        while el.getprevious() is not None:
+            del parent[0]
+
+
+def load_eaf(path, structure_only=False):
+    """
+    parse an ELAN file with iterparse and collect timeslots, tier hierarchy
+    and annotations while the tree is being built
+
+    If structure_only is set, annotations are discarded as soon as their tier
+    has been read and no tree is retained.
+    """
+
+    loaded = LoadedEaf()
+    reader = EafReader(path, tag=STRUCTURE_TAGS if structure_only else None)
+    pending_records = []
+    for tag, el, data in reader:
+        if tag != "TIER":
+            pending_records.append(data)
+            continue
+        tier_id, _, linguistic_type = data
+        loaded.annotation_records += [
+            [annotation_id, tier_id, text, parent_id, previous_id]
+            for annotation_id, text, parent_id, previous_id in pending_records
+        ]
+        pending_records = []
+        if structure_only:
+            el.clear()
+        else:
+            loaded.tiers_by_type[linguistic_type].append(el)
+    if not structure_only:
+        loaded.tree = etree.ElementTree(reader.root)
+    loaded.timeslots = reader.timeslots
+    loaded.tier_hierarchy = reader.tier_hierarchy
+    loaded.alignable_annotations = reader.alignable_annotations
+    loaded.ref_annotations = reader.ref_annotations
+    return loaded
+
+
+def get_annotation_records(tree):
+    """
+    collect annotation records from an already parsed tree, in the same
+    format as load_eaf
+    """
+
+    records = []
+    for tier in TIERS(tree):
+        tier_id = tier.attrib["TIER_ID"]
+        for el in ANNOTATIONS_OF_TIER(tier):
+            text = get_value(el) or None
+            if el.tag == "ALIGNABLE_ANNOTATION":
+                records.append([el.attrib["ANNOTATION_ID"], tier_id, text, None, None])
+            elif el.tag == "REF_ANNOTATION":
+                records.append(
+                    [
+                        el.attrib["ANNOTATION_ID"],
+                        tier_id,
+                        text,
+                        el.attrib["ANNOTATION_REF"],
+                        el.attrib.get("PREVIOUS_ANNOTATION"),
+                    ]
+                )
+    return records
@@ -0,0 +1,48 @@
+"""
+Overlap and concurrency of annotations across tiers
+"""
+
+from collections import defaultdict
+from itertools import combinations
+
+
+def get_overlap_statistics(intervals):
+    """
+    compute how much time-aligned annotations on different tiers overlap
+
+    intervals is an iterable of (tier_id, start_ms, end_ms) tuples. A sweep
+    over the sorted start and end points returns a tuple of
+    - the time in ms during which at least two tiers are active
+    - a dictionary mapping sorted pairs of tier IDs to the time in ms
+      during which both are active
+    - the maximal number of tiers which are active at the same time
+    Overlaps of annotations on the same tier are not counted.
+    """
+
+    events = []
+    for tier_id, start, end in intervals:
+        if end > start:
+            # ends sort before starts at the same point in time
+            events.append((start, 1, tier_id))
+            events.append((end, 0, tier_id))
+    events.sort(key=lambda event: (event[0], event[1]))
+    active = defaultdict(int)  # tier ID -> number of open annotations
+    total_overlap = 0
+    pair_overlaps = defaultdict(int)
+    max_concurrency = 0
+    previous_time = None
+    for time, is_start, tier_id in events:
+        if previous_time is not None and time > previous_time and len(active) > 1:
+            elapsed = time - previous_time
+            total_overlap += elapsed
+            for pair in combinations(sorted(active), 2):
+                pair_overlaps[pair] += elapsed
+        previous_time = time
+        if is_start:
+            active[tier_id] += 1
+            max_concurrency = max(max_concurrency, len(active))
+        else:
+            active[tier_id] -= 1
+            if active[tier_id] == 0:
+                del active[tier_id]
+    return total_overlap, dict(pair_overlaps), max_concurrency
@@ -0,0 +1,194 @@
+"""
+Streaming access to the tiers of large ELAN files
+"""
+
+import numpy as np
+
+from eldpy.elan.annotationtable import get_times
+from eldpy.elan.durations import get_annotated_seconds
+from eldpy.elan.loader import EafReader, discard
+
+STREAM_TAGS = (
+    "ANNOTATION_VALUE",
+    "ALIGNABLE_ANNOTATION",
+    "REF_ANNOTATION",
+    "ANNOTATION",
+    "TIER",
+    "TIME_SLOT",
+    "TIME_ORDER",
+    "LINGUISTIC_TYPE",
+)
+
+
+class StreamedTier:
+    """
+    The annotations of one tier, as read by an EafStream.
+
+    Every annotation is an (annotation_id, tier_id, text, parent_id,
+    previous_annotation_id) tuple, as the records of loader.load_eaf. For
+    ALIGNABLE_ANNOTATIONs, parent and previous annotation are None.
+
+    The records carry no time slot references, as those of REF_ANNOTATIONs
+    are only known through their parents, which may be in other tiers.
+    Times are resolved by EafStream.get_seconds with the timeslots and ID
+    references the stream keeps for the whole file.
+    """
+
+    __slots__ = ("id_", "linguistic_type", "parent_ref", "annotations")
+
+    def __init__(self, id_, linguistic_type, parent_ref, annotations):
+        self.id_ = id_
+        self.linguistic_type = linguistic_type
+        self.parent_ref = parent_ref
+        self.annotations = annotations
+
+    def __len__(self):
+        return len(self.annotations)
+
+    def get_id_wordlist(self):
+        """
+        return (annotation ID, stripped text) tuples for all REF_ANNOTATIONs,
+        followed by all ALIGNABLE_ANNOTATIONs, like tier_to_id_wordlist
+        """
+
+        ref_annotations = []
+        alignable_annotations = []
+        for id_, _, text, parent_id, _ in self.annotations:
+            pair = (id_, text.strip() if text else "")
+            if parent_id is None:
+                alignable_annotations.append(pair)
+            else:
+                ref_annotations.append(pair)
+        return ref_annotations + alignable_annotations
+
+    def get_wordlist(self):
+        """return the stripped texts of the tier, like tier_to_wordlist"""
+
+        return [text for _, text in self.get_id_wordlist()]
+
+    def get_annotation_id_list(self):
+        """
+        return (annotation ID, parent ID) tuples for all REF_ANNOTATIONs,
+        like tier_to_annotation_id_list
+        """
+
+        return [
+            (annotation[0], annotation[3])
+            for annotation in self.annotations
+            if annotation[3] is not None
+        ]
+
+    def get_segment_counts(self):
+        """return the number of annotations without text and of all annotations"""
+
+        empty = sum(1 for annotation in self.annotations if not _has_text(annotation))
+        return [empty, len(self.annotations)]
+
+
+def _has_text(annotation):
+    text = annotation[2]
+    return bool(text and text.strip())
+
+
+class EafStream:
+    """
+    Read an ELAN file tier by tier with a loader.EafReader.
+
+    Elements are freed as soon as they have been read, so that the texts of
+    only the current tier are held in memory, together with the timeslots and
+    the ID references of all annotations read so far, which are needed for
+    durations. Memory thus still grows with the number of annotations, but
+    far more slowly than with the whole tree. Iterating over the stream
+    yields one StreamedTier per TIER element in document order. Tier
+    constraints are only known once the stream has been consumed, as
+    LINGUISTIC_TYPEs follow the tiers in ELAN files.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._reader = EafReader(path, tag=STREAM_TAGS, discard_read=True)
+
+    @property
+    def timeslots(self):
+        """timeslot IDs mapped to their values in ms"""
+
+        return self._reader.timeslots
+
+    @property
+    def alignable_annotations(self):
+        """annotation IDs mapped to (TIME_SLOT_REF1, TIME_SLOT_REF2)"""
+
+        return self._reader.alignable_annotations
+
+    @property
+    def ref_annotations(self):
+        """annotation IDs mapped to their ANNOTATION_REF"""
+
+        return self._reader.ref_annotations
+
+    @property
+    def linguistic_types(self):
+        """LINGUISTIC_TYPE_IDs mapped to their constraints"""
+
+        return self._reader.linguistic_types
+
+    @property
+    def tier_hierarchy(self):
+        """the tier hierarchy, as in ElanFile, once the stream has been consumed"""
+
+        return self._reader.tier_hierarchy
+
+    def __iter__(self):
+        records = []
+        for tag, el, data in self._reader:
+            if tag != "TIER":
+                records.append(data)
+                continue
+            tier_id, parent_ref, linguistic_type = data
+            annotations = [
+                (id_, tier_id, text, parent_id, previous_id)
+                for id_, text, parent_id, previous_id in records
+            ]
+            tier = StreamedTier(tier_id, linguistic_type, parent_ref, annotations)
+            records = []
+            discard(el)
+            yield tier
+
+    def get_seconds(self, tier):
+        """
+        return the duration of the annotations with text in a tier, computed
+        as get_seconds_from_tier does in DOM mode
+
+        The time-aligned annotations referenced by the tier must have been
+        streamed already, which is always the case after the stream has been
+        consumed.
+        """
+
+        timeslots = self.timeslots
+        ref_annotations = self.ref_annotations
+        alignable_annotations = self.alignable_annotations
+        times = np.array(
+            [
+                get_times(
+                    id_, parent_id, timeslots, ref_annotations, alignable_annotations
+                )
+                for id_, _, _, parent_id, _ in tier.annotations
+            ],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+
+        def get_parent_times():
+            parent_times = np.array(
+                [
+                    get_times(
+                        parent_id, None, timeslots, ref_annotations, alignable_annotations
+                    )
+                    for _, _, text, parent_id, _ in tier.annotations
+                    if text is not None and parent_id in alignable_annotations
+                ],
+                dtype=np.int64,
+            ).reshape(-1, 2)
+            return parent_times[:, 0], parent_times[:, 1]
+
+        has_text = np.array([bool(record[2]) for record in tier.annotations], dtype=bool)
+        return get_annotated_seconds(times[:, 0], times[:, 1], has_text, get_parent_times)
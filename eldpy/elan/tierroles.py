@@ -0,0 +1,52 @@
+"""
+Assign a role to every tier of an ELAN file
+"""
+
+from eldpy.helpers import is_id_tier
+from eldpy.elan.helpers import has_minimal_translation_length
+
+TRANSCRIPTION = "transcription"
+TRANSLATION = "translation"
+GLOSS = "gloss"
+COMMENT = "comment"
+ID = "id"
+IGNORE = "ignore"
+
+
+def classify_tier(tier_id, linguistic_type, wordlist, candidates, is_major):
+    """
+    return the role of a tier
+
+    candidates maps the roles TRANSCRIPTION, TRANSLATION, GLOSS and COMMENT
+    to the accepted LINGUISTIC_TYPE_REFs. is_major is called without
+    arguments to find out whether the tier is in a language of wider
+    communication. It is only called if the role depends on it, and at most
+    once per tier.
+    """
+
+    if linguistic_type in candidates[GLOSS]:
+        return GLOSS
+    if wordlist == []:
+        return IGNORE
+    if linguistic_type in candidates[COMMENT]:
+        return COMMENT
+    transcription = linguistic_type in candidates[TRANSCRIPTION]
+    if transcription and linguistic_type not in candidates[TRANSLATION]:
+        # ID tiers are recognized without language detection
+        if is_id_tier(wordlist):
+            return ID
+        if is_major():
+            return IGNORE
+        return TRANSCRIPTION
+    if linguistic_type in candidates[TRANSLATION]:
+        major = is_major()
+        # Sometimes, annotators put non-English contents in translation tiers
+        # For our purposes, we want to discard such content
+        if major and has_minimal_translation_length(wordlist, tier_id):
+            return TRANSLATION
+        if transcription:
+            if is_id_tier(wordlist):
+                return ID
+            if not major:
+                return TRANSCRIPTION
+    return IGNORE
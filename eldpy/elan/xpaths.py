@@ -0,0 +1,59 @@
+"""
+Precompiled XPath queries for ELAN files
+"""
+
+from lxml import etree
+
+TIERS = etree.XPath("descendant::TIER")
+LINGUISTIC_TYPES = etree.XPath("descendant::LINGUISTIC_TYPE")
+TIME_SLOTS = etree.XPath("(descendant::TIME_ORDER)[1]/TIME_SLOT")
+ALIGNABLE_ANNOTATIONS = etree.XPath("descendant::ALIGNABLE_ANNOTATION")
+REF_ANNOTATIONS = etree.XPath("descendant::REF_ANNOTATION")
+# REF_ANNOTATIONs first, then ALIGNABLE_ANNOTATIONs
+TIER_ANNOTATIONS = etree.XPath(
+    "descendant::REF_ANNOTATION | descendant::ALIGNABLE_ANNOTATION"
+)
+ANNOTATIONS_OF_TIER = etree.XPath("ANNOTATION/*")
+
+
+def get_value(annotation):
+    """
+    return the text of the ANNOTATION_VALUE of an annotation, or None
+
+    In valid ELAN files, the value is the only child of the annotation, so no
+    path needs to be evaluated for it.
+    """
+
+    if len(annotation) and annotation[0].tag == "ANNOTATION_VALUE":
+        return annotation[0].text
+    value = annotation.find("ANNOTATION_VALUE")
+    if value is None:
+        return None
+    return value.text
+
+
+def get_id_texts(tier):
+    """
+    return (annotation ID, stripped text) tuples for all REF_ANNOTATIONs of a
+    tier, followed by all ALIGNABLE_ANNOTATIONs
+    """
+
+    ref_annotations = []
+    alignable_annotations = []
+    for annotation in TIER_ANNOTATIONS(tier):
+        text = get_value(annotation)
+        pair = (annotation.attrib["ANNOTATION_ID"], text.strip() if text else "")
+        if annotation.tag == "REF_ANNOTATION":
+            ref_annotations.append(pair)
+        else:
+            alignable_annotations.append(pair)
+    return ref_annotations + alignable_annotations
+
+
+def get_ref_texts(root):
+    """map the IDs of all REF_ANNOTATIONs to their texts"""
+
+    return {
+        annotation.attrib.get("ANNOTATION_ID"): get_value(annotation)
+        for annotation in REF_ANNOTATIONS(root)
+    }
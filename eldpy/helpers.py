@@ -6,9 +6,15 @@ import re
 import time
 # from itertools import tee
 from collections import defaultdict
-from langdetect import detect_langs, lang_detect_exception
+from eldpy.langdetection import detect_top_language
 # from pyPreservica import logger
 from eldpy.elan.eldpyerror import EldpyError
+from eldpy.elan.xpaths import (
+    ALIGNABLE_ANNOTATIONS,
+    REF_ANNOTATIONS,
+    get_id_texts,
+    get_ref_texts,
+)
 # from eldpy.archives.elar_file import ElarFile
 
 
@@ -22,18 +28,7 @@ def tier_to_id_wordlist(t):
     and collating all annotation values of that tier
     """
 
-    result = []
-    for ref_ann in t.findall(".//REF_ANNOTATION") + t.findall(
-        ".//ALIGNABLE_ANNOTATION"
-    ):
-        ref_ann_id = ref_ann.attrib["ANNOTATION_ID"]
-        try:
-            annotation_text = ref_ann.find(".//ANNOTATION_VALUE").text.strip()
-        except AttributeError:
-            # there is no text
-            annotation_text = ""
-        result.append((ref_ann_id, annotation_text))
-    return result
+    return get_id_texts(t)
 
 
 def tier_to_wordlist(t):
@@ -53,7 +48,7 @@ def tier_to_annotation_id_list(t):
 
     return [
         (ra.attrib["ANNOTATION_ID"], ra.attrib["ANNOTATION_REF"])
-        for ra in t.findall(".//REF_ANNOTATION")
+        for ra in REF_ANNOTATIONS(t)
     ]
 
 
@@ -86,39 +81,35 @@ def is_major_language(
     which could possibly be used for a translation tier
     """
 
-    try:  # detect candidate languages and retrieve most likely one
-        toplanguages = detect_langs(" ".join(list_))
-        toplanguage = toplanguages[0]
-    except lang_detect_exception.LangDetectException:
-        # we are happy that this is an unknown language
-        toplanguage = None
+    # an unknown language is None, which we are happy with
+    toplanguage = detect_top_language(list_, LANGDETECT_THRESHOLD)
 
-    # print(toplanguage.lang,toplanguage.prob,accepted_languages)
+    # print(toplanguage,accepted_languages)
     if (
         toplanguage
-        and toplanguage.lang in accepted_languages
-        and toplanguage.prob > LANGDETECT_THRESHOLD
+        and toplanguage[0] in accepted_languages
+        and toplanguage[1] > LANGDETECT_THRESHOLD
     ):
         if logtype == "True":
-            probability_percentage = toplanguage.prob * 100
+            probability_percentage = toplanguage[1] * 100
             tier_start_words = " ".join(list_)[:100]
             if logger:
                 logger.info(
-                    f'ignored vernacular tier with {toplanguage.lang} language content at {probability_percentage:.2f}% probability ("{tier_start_words} ...")'
+                    f'ignored vernacular tier with {toplanguage[0]} language content at {probability_percentage:.2f}% probability ("{tier_start_words} ...")'
                 )
         return True
     if toplanguage is None:
         if logtype == "False" and logger:
             logger.warning(f"could not detect language for {list_}")
         return False
-    if toplanguage.prob < LANGDETECT_THRESHOLD:
+    if toplanguage[1] < LANGDETECT_THRESHOLD:
         # language is English or Spanish, but likelihood is too small
         if logtype == "False":
-            percentage_probablity = toplanguage.prob * 100
+            percentage_probablity = toplanguage[1] * 100
             tier_first_words = " ".join(list_)[:100]
             if logger:
                 logger.info(
-                    f'ignored {percentage_probablity:.2f}% probability {toplanguage.prob} for "{tier_first_words} ..."'
+                    f'ignored {percentage_probablity:.2f}% probability {toplanguage[1]} for "{tier_first_words} ..."'
                 )
         return False
     return False
@@ -129,7 +120,7 @@ def get_alignable_annotations(root):
     Create a dictionary with alignable annotations ID as keys and the elements themselves as values
     """
 
-    aas = root.findall(".//ALIGNABLE_ANNOTATION")
+    aas = ALIGNABLE_ANNOTATIONS(root)
     return {aa.attrib["ANNOTATION_ID"]: aa for aa in aas}
 
 
@@ -250,13 +241,7 @@ def get_annotation_text_mapping(root):
 
     if root is None:
         return {}
-    textdic = {
-        ref_annotation.attrib.get("ANNOTATION_ID"): ref_annotation.find(
-            "./ANNOTATION_VALUE"
-        ).text
-        for ref_annotation in root.findall(".//REF_ANNOTATION")
-    }
-    return textdic
+    return get_ref_texts(root)
 
 
 def increment_key(s, tier_type, logger=None):
@@ -399,7 +384,8 @@ def get_line(
         return ["", "", "", "", "", "", ""]
     vernacular_subcells = []
     gloss_subcells = []
-    id_, word_gloss_list = g.popitem()
+    # g maps a single sentence ID to its words and glosses
+    id_, word_gloss_list = list(g.items())[-1]
     # print(word_gloss_list)
     for tupl in word_gloss_list:
         vernacular = tupl[0]
@@ -501,29 +487,31 @@ def get_comments_id_dict(tmp_comments_dict, logger=None):
 
     comments_id_dict = {}
     try:
-        comments_id_dict = tmp_comments_dict.popitem()[1].popitem()[1]
-    except KeyError:
+        # use the last tier of the last tier type
+        comments_id_dict = list(list(tmp_comments_dict.values())[-1].values())[-1]
+    except IndexError:
         if logger:
             logger.info("no comments")
     return comments_id_dict
 
 
-def get_glossed_sentences(annos, timeslottedancestors, mapping, logger=None):
+def get_glossed_sentences(table, rows, timeslottedancestors, mapping, logger=None):
     """
     retrieve all glosses together with their transcriptions and map them
     to their timeslotted ancestor
+
+    The glosses are the given rows of an AnnotationTable.
     """
-    # print([a.text for a in annos])
-    ws = [mapping.get(annotation.parent_id, "") for annotation in annos]
-    ids = [timeslottedancestors.get(annotation.id_, None) for annotation in annos]
+
     current_sentence_id = None
     d = {}
     new_glossed_sentences = []
-    for i, current_annotation in enumerate(annos):
-        gloss = annos[i].text
-        sentence_id = ids[i]
-        if getattr(current_annotation, "previous_annotation_id", None) is None:
-            word = ws[i]
+    for row in rows:
+        gloss = table.texts[row]
+        id_ = table.ids[row]
+        sentence_id = timeslottedancestors.get(id_, None)
+        if table.get_previous_id(row) is None:
+            word = mapping.get(table.get_parent_id(row), "")
         else:
             try:
                 d[sentence_id][-1][1] += gloss
@@ -545,9 +533,7 @@ def get_glossed_sentences(annos, timeslottedancestors, mapping, logger=None):
                 d[sentence_id].append([word, gloss])
             except KeyError:
                 if logger:
-                    logger.warning(
-                        f"gloss with no parent {sentence_id} > {annos[i].id_}"
-                    )
+                    logger.warning(f"gloss with no parent {sentence_id} > {id_}")
     new_glossed_sentences.append(d)
     return new_glossed_sentences
 
@@ -0,0 +1,131 @@
+"""
+A persistent cache of crawled pages, stored in SQLite
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+CACHE_PATH = "cache/http.sqlite"
+
+CATALOGUE = "catalogue"
+COLLECTION = "collection"
+BUNDLE = "bundle"
+
+# seconds during which a page is used without asking the server
+DEFAULT_TTLS = {
+    CATALOGUE: 6 * 3600,
+    COLLECTION: 7 * 86400,
+    BUNDLE: 30 * 86400,
+    None: 86400,
+}
+
+CachedPage = namedtuple(
+    "CachedPage", ["url", "kind", "body", "content_type", "etag", "last_modified", "fetched"]
+)
+
+
+class ResponseCache:
+    """
+    Store the bodies of fetched pages, compressed and keyed by URL, together
+    with the validators needed to revalidate them.
+
+    Each page has a kind, which determines how long it is considered fresh.
+    Stale pages are kept, so that they can be revalidated with
+    If-None-Match/If-Modified-Since instead of being downloaded again. The
+    cache can be shared between threads.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttls=None):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                kind TEXT,
+                body BLOB,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                fetched REAL
+            )"""
+        )
+        self.connection.commit()
+
+    def get(self, url):
+        """return the CachedPage for a URL, or None"""
+
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT * FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        url, kind, body, content_type, etag, last_modified, fetched = row
+        return CachedPage(
+            url, kind, zlib.decompress(body), content_type, etag, last_modified, fetched
+        )
+
+    def put(self, url, kind, body, content_type=None, etag=None, last_modified=None):
+        """store the body of a page which has just been fetched"""
+
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?,?,?,?,?,?,?)",
+                (
+                    url,
+                    kind,
+                    zlib.compress(body),
+                    content_type,
+                    etag,
+                    last_modified,
+                    time.time(),
+                ),
+            )
+            self.connection.commit()
+
+    def touch(self, url):
+        """mark a page as fetched now, after the server confirmed it is unchanged"""
+
+        with self._lock:
+            self.connection.execute(
+                "UPDATE pages SET fetched = ? WHERE url = ?", (time.time(), url)
+            )
+            self.connection.commit()
+
+    def is_fresh(self, page, kind=None):
+        """return whether a cached page can be used without revalidation"""
+
+        ttl = self.ttls.get(kind, self.ttls[None])
+        return time.time() - page.fetched < ttl
+
+    def get_validators(self, page):
+        """return the headers for a conditional request for a cached page"""
+
+        headers = {}
+        if page.etag:
+            headers["If-None-Match"] = page.etag
+        if page.last_modified:
+            headers["If-Modified-Since"] = page.last_modified
+        return headers
+
+    def clear(self):
+        """remove all pages"""
+
+        with self._lock:
+            self.connection.execute("DELETE FROM pages")
+            self.connection.commit()
+
+    def close(self):
+        """close the database"""
+
+        self.connection.close()
@@ -0,0 +1,233 @@
+"""
+A shared HTTP client for the archive crawlers
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import namedtuple
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import get_encoding_from_headers
+
+from eldpy.httpcache import ResponseCache
+
+logger = logging.getLogger("eldpy")
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (10, 120)
+
+FetchFailure = namedtuple("FetchFailure", ["url", "status", "error", "attempts"])
+
+# errors of the connection, also while the body is read, which are worth a retry
+RETRYABLE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ContentDecodingError,
+)
+TOO_MANY_REQUESTS = 429
+
+
+class HttpClient:
+    """
+    Fetch pages over a pool of keep-alive connections.
+
+    Requests which fail with a connection error, a timeout, a connection
+    dropped while the body is read or a 5xx status are retried with
+    exponential backoff and full jitter. A 429 status is retried after the
+    time given in its Retry-After header, unless this is longer than
+    max_retry_after seconds. Pages which could not be fetched, because of
+    another 4xx status, another error of requests, a longer Retry-After or
+    after all retries, are recorded as FetchFailures in self.failures. Timeouts can be given per
+    host, as a number of seconds or a (connect, read) tuple. With a
+    ResponseCache, pages are stored on disk and only fetched again once they
+    have expired, with a conditional request. The client can be shared
+    between threads.
+    """
+
+    def __init__(
+        self,
+        retries=4,
+        backoff=1.0,
+        max_backoff=60.0,
+        max_retry_after=300.0,
+        timeouts=None,
+        default_timeout=DEFAULT_TIMEOUT,
+        pool_size=32,
+        cache=None,
+    ):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+        self.cache = cache
+        self.failures = []
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get_timeout(self, url):
+        """return the timeout for the host of a URL"""
+
+        return self.timeouts.get(urlsplit(url).netloc, self.default_timeout)
+
+    def get_delay(self, attempt):
+        """return the number of seconds to wait before a retry"""
+
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    def get(self, url, kind=None, **kwargs):
+        """
+        return the response for a URL, or None if it could not be fetched.
+        The kind of page (see httpcache) determines how long it is cached.
+        """
+
+        if self.cache is None:
+            return self.fetch(url, **kwargs)
+        page = self.cache.get(url)
+        if page is not None:
+            if self.cache.is_fresh(page, kind):
+                return _to_response(page)
+            kwargs["headers"] = dict(kwargs.get("headers") or {})
+            kwargs["headers"].update(self.cache.get_validators(page))
+        response = self.fetch(url, **kwargs)
+        if response is None:
+            return None
+        if response.status_code == 304 and page is not None:
+            self.cache.touch(url)
+            return _to_response(page)
+        self.cache.put(
+            url,
+            kind,
+            response.content,
+            content_type=response.headers.get("Content-Type"),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return response
+
+    def fetch(self, url, **kwargs):
+        """
+        return the response for a URL, bypassing the cache, or None if it
+        could not be fetched
+        """
+
+        kwargs.setdefault("timeout", self.get_timeout(url))
+        attempts = 0
+        delay = None
+        while True:
+            if attempts:
+                time.sleep(self.get_delay(attempts - 1) if delay is None else delay)
+            attempts += 1
+            delay = None
+            try:
+                response = self.session.get(url, **kwargs)
+            except RETRYABLE_ERRORS as exc:
+                status = None
+                error = str(exc)
+            except requests.exceptions.RequestException as exc:
+                status = None
+                error = str(exc)
+                break
+            else:
+                if response.status_code < 400:
+                    return response
+                status = response.status_code
+                error = response.reason
+                if status == TOO_MANY_REQUESTS:
+                    delay = get_retry_after(response)
+                    if delay is not None and delay > self.max_retry_after:
+                        # rather give up than stall the worker
+                        error = f"{error}, retry after {delay:.0f}s"
+                        break
+                elif status < 500:
+                    break
+            if attempts > self.retries:
+                break
+        self.record_failure(FetchFailure(url, status, error, attempts))
+        return None
+
+    def record_failure(self, failure):
+        """add a FetchFailure to self.failures and log it"""
+
+        with self._lock:
+            self.failures.append(failure)
+        logger.warning(
+            "could not fetch %s after %s attempts: %s",
+            failure.url,
+            failure.attempts,
+            failure.error,
+        )
+
+    def close(self):
+        """close all pooled connections"""
+
+        self.session.close()
+
+
+def get_retry_after(response):
+    """
+    return the number of seconds to wait according to the Retry-After header
+    of a response, or None if it has no valid one
+    """
+
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+def _to_response(page):
+    response = requests.Response()
+    response.status_code = 200
+    response.url = page.url
+    response._content = page.body  # pylint: disable=protected-access
+    if page.content_type:
+        response.headers["Content-Type"] = page.content_type
+    response.encoding = get_encoding_from_headers(response.headers)
+    return response
+
+
+_client = None
+
+
+def get_client():
+    """
+    return the HttpClient shared by all archive modules. Unless another
+    client has been set, it caches pages in httpcache.CACHE_PATH.
+    """
+
+    global _client  # pylint: disable=global-statement
+    if _client is None:
+        _client = HttpClient(cache=ResponseCache())
+    return _client
+
+
+def set_client(client):
+    """set the HttpClient shared by all archive modules, e.g. one without cache"""
+
+    global _client  # pylint: disable=global-statement
+    _client = client
+
+
+def get(url, kind=None, **kwargs):
+    """fetch a URL with the shared client, see HttpClient.get"""
+
+    return get_client().get(url, kind=kind, **kwargs)
@@ -0,0 +1,234 @@
+"""
+Cached and sampled language detection for tiers
+"""
+
+import hashlib
+import os
+import random
+import sqlite3
+import time
+
+from langdetect import DetectorFactory, detect_langs, lang_detect_exception
+
+# langdetect is non-deterministic unless it is seeded
+DetectorFactory.seed = 0
+
+SAMPLE_SIZE = 200  # maximal number of annotations to use for detection
+FIRST_CHUNK_SIZE = 25  # the sample is extended by doubling from this size
+SAMPLE_SEED = 0
+CACHE_MAX_ENTRIES = 100000
+# hits refresh the recency of an entry at most once per interval, in ns, so
+# that reads from a shared cache rarely turn into writes
+CACHE_TOUCH_INTERVAL = 3600 * 10**9
+# the directory of the default cache, which can be set with ELDPY_CACHE_DIR
+CACHE_DIR = os.environ.get(
+    "ELDPY_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "eldpy")
+)
+CACHE_NAME = "languages.sqlite"
+
+
+class LanguageCache:
+    """
+    An LRU cache of detection results, stored in a SQLite database.
+
+    Without a path, the cache only lives in memory. A cache on disk can be
+    shared by several processes. To keep writes rare, the recency of an entry
+    is only refreshed by hits once per CACHE_TOUCH_INTERVAL, and entries are
+    counted while they are added, so the table is only counted when it may be
+    full. Entries added by other processes are not counted, so the cache can
+    exceed max_entries by the entries they added since the last eviction.
+    """
+
+    def __init__(self, path=None, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        # the process which opened the connection, which cannot be used after a fork
+        self.pid = os.getpid()
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(
+            path or ":memory:", timeout=30, isolation_level=None
+        )
+        if path:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS detections "
+            "(key TEXT PRIMARY KEY, lang TEXT, prob REAL, last_used INTEGER)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS detections_last_used ON detections (last_used)"
+        )
+        self.entries = self.count()
+
+    def get(self, key):
+        """
+        return the cached (language, probability) tuple for a key,
+        None if the language could not be detected, and KeyError if the key is unknown
+        """
+
+        row = self.connection.execute(
+            "SELECT lang, prob, last_used FROM detections WHERE key=?", (key,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        now = time.time_ns()
+        if now - row[2] > CACHE_TOUCH_INTERVAL:
+            self.connection.execute(
+                "UPDATE detections SET last_used=? WHERE key=?", (now, key)
+            )
+        if row[0] is None:
+            return None
+        return row[0], row[1]
+
+    def put(self, key, result):
+        """store a detection result and evict the least recently used entries"""
+
+        lang, prob = result if result else (None, None)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO detections VALUES (?,?,?,?)",
+            (key, lang, prob, time.time_ns()),
+        )
+        # replaced entries are counted too, which only makes evict() run earlier
+        self.entries += 1
+        if self.entries > self.max_entries:
+            self.evict()
+
+    def count(self):
+        """return the number of entries"""
+
+        return self.connection.execute("SELECT COUNT(*) FROM detections").fetchone()[0]
+
+    def evict(self):
+        """
+        delete the least recently used entries if the cache is full, keeping
+        90% of max_entries, so that the next evictions are some entries away
+        """
+
+        self.entries = self.count()
+        if self.entries <= self.max_entries:
+            return
+        excess = self.entries - (self.max_entries - self.max_entries // 10)
+        self.connection.execute(
+            "DELETE FROM detections WHERE key IN "
+            "(SELECT key FROM detections ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        self.entries -= excess
+
+    def close(self):
+        """close the underlying database"""
+
+        self.connection.close()
+
+
+_cache = None
+
+
+def get_language_cache():
+    """
+    return the LanguageCache used by default. Unless another cache has been
+    set, detections are stored in CACHE_NAME in CACHE_DIR, so that they are
+    reused when files are processed again.
+    """
+
+    global _cache  # pylint: disable=global-statement
+    if _cache is None or _cache.pid != os.getpid():
+        path = _cache.path if _cache else os.path.join(CACHE_DIR, CACHE_NAME)
+        max_entries = _cache.max_entries if _cache else CACHE_MAX_ENTRIES
+        _cache = LanguageCache(path, max_entries=max_entries)
+    return _cache
+
+
+def set_language_cache(path, max_entries=CACHE_MAX_ENTRIES):
+    """
+    use the cache at path for all further detections. With None, the cache
+    only lives in memory.
+    """
+
+    global _cache  # pylint: disable=global-statement
+    if _cache is not None and _cache.pid == os.getpid():
+        _cache.close()
+    _cache = LanguageCache(path, max_entries=max_entries)
+    return _cache
+
+
+def get_sample(list_, sample_size=SAMPLE_SIZE, seed=SAMPLE_SEED):
+    """
+    return a reproducible random sample of the annotations, keeping their order
+    """
+
+    if len(list_) <= sample_size:
+        return list(list_)
+    indexes = sorted(random.Random(seed).sample(range(len(list_)), sample_size))
+    return [list_[i] for i in indexes]
+
+
+def get_content_hash(
+    list_,
+    threshold,
+    sample_size=SAMPLE_SIZE,
+    first_chunk_size=FIRST_CHUNK_SIZE,
+    seed=SAMPLE_SEED,
+):
+    """
+    hash the annotations together with the parameters which determine
+    where detection stops
+    """
+
+    hasher = hashlib.sha1(
+        f"{threshold}:{sample_size}:{first_chunk_size}:{seed}".encode("utf8")
+    )
+    for s in list_:
+        hasher.update(b"\x00")
+        hasher.update(s.encode("utf8", "surrogatepass"))
+    return hasher.hexdigest()
+
+
+def detect_top_language(
+    list_,
+    threshold,
+    sample_size=SAMPLE_SIZE,
+    first_chunk_size=FIRST_CHUNK_SIZE,
+    seed=SAMPLE_SEED,
+    cache=None,
+):
+    """
+    return the most likely language of a list of annotations as a
+    (language, probability) tuple, or None if no language could be detected.
+
+    Detection starts on a small part of a sample of the annotations and only
+    continues on a larger part if the probability stays below the threshold.
+    """
+
+    # pylint: disable=too-many-arguments
+    if cache is None:
+        cache = get_language_cache()
+    key = get_content_hash(
+        list_,
+        threshold,
+        sample_size=sample_size,
+        first_chunk_size=first_chunk_size,
+        seed=seed,
+    )
+    try:
+        return cache.get(key)
+    except KeyError:
+        pass
+    sample = get_sample(list_, sample_size=sample_size, seed=seed)
+    result = None
+    chunk_size = first_chunk_size
+    while True:
+        try:  # detect candidate languages and retrieve most likely one
+            toplanguage = detect_langs(" ".join(sample[:chunk_size]))[0]
+            result = (toplanguage.lang, toplanguage.prob)
+        except lang_detect_exception.LangDetectException:
+            result = None
+        if result and result[1] > threshold:
+            break
+        if chunk_size >= len(sample):
+            break
+        chunk_size *= 2
+    cache.put(key, result)
+    return result
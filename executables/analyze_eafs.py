@@ -1,5 +1,5 @@
 import glob
-from elanfile import ElanFile
+from batch import overview_many, OVERVIEW_COLUMNS
 import pandas as pd
 import sys
 # from collections import OrderedDict
@@ -9,76 +9,26 @@ if __name__ == "__main__":
         workingdir = sys.argv[1]
     except IndexError:
         workingdir = "."
+    try:
+        cachedir = sys.argv[2]
+    except IndexError:
+        cachedir = None
     eafs = glob.glob(f"{workingdir}/*eaf")
     eafs.sort()
+    try:
+        workers = int(sys.argv[3])
+    except IndexError:
+        workers = None
     # out = open("eaf_overview.csv", "w")
-    line1= """
-
-translation
-
-
-
-
-
-
-
-transcription
-
-
-
-
-
-
-
-
-gloss
-
-
-
-
-
-""".split("\n")
-    line2 = """filename
-duration_timeslots
-tiertype
-#sentences
-#words
-#chars
-words/stc
-chars/word
-duration
-%sec translated
-tiertype
-#sentences
-#words
-#chars
-words/stc
-chars/words
-duration
-%sec transcribed
-tiertype
-#sentences
-#items
-distinct
-repetition
-zipf1
-zipf2
-empty_segments
-total_segments
-%empty""".split("\n")
+    line1 = ["", "", "translation"] + [""] * 7 + ["transcription"] + [""] * 8 + ["gloss"]
+    line1 += [""] * 8 + ["overlap"]
+    line1 += [""] * (len(OVERVIEW_COLUMNS) - len(line1))
+    line2 = OVERVIEW_COLUMNS
     lines = [line1,line2]
     offset = 0
     # offset = 3649
-    for i, eaf in enumerate(eafs[offset:]):
-        print(i+offset,eaf)
-        ef = ElanFile(eaf, "www")
-        ef.populate_transcriptions()
-        transcriptions = ef.get_transcriptions()
-        ef.populate_translations()
-        translations = ef.get_translations()
-        ef.populate_glosses()
-        line = ef.print_overview()
-        lines.append(line)
+    print(f"analyzing {len(eafs[offset:])} files")
+    lines += overview_many(eafs[offset:], workers=workers, cache_dir=cachedir)
     # out.close()
     data = lines
     df = pd.DataFrame(data, columns=line2)
@@ -101,6 +51,7 @@ total_segments
     worksheet.set_column(10,17, cell_format=green_bg)
     worksheet.set_column(18,24, cell_format=blue_bg)
     worksheet.set_column(25,27, cell_format=grey_bg)
+    worksheet.set_column(28,30, cell_format=red_bg)
     writer._save()
     print(f"output written to {outfilename}")
 
@@ -0,0 +1,91 @@
+import sqlite3
+
+from eldpy.crawljournal import (
+    CrawlJournal,
+    BUNDLE,
+    COLLECTION,
+    FILE,
+    DONE,
+    FAILED,
+    PENDING,
+    SKIPPED,
+)
+from eldpy.download import download_files, record_page, save_file
+from test_httpclient import StubSession, make_response
+
+
+def test_crawl_journal(tmp_path):
+    database = str(tmp_path / "holdings.db")
+    connection = sqlite3.connect(database)
+    connection.execute("CREATE TABLE files (id TEXT)")
+    journal = CrawlJournal(connection, "TLA")
+    journal.add(["c1", "c2", "c3"], COLLECTION)
+    journal.mark_done("c2", COLLECTION)
+    journal.mark_failed("c3", COLLECTION, "Bad Gateway")
+    journal.commit()
+    # holdings and progress are committed or rolled back together
+    connection.execute("INSERT INTO files VALUES ('f1')")
+    journal.mark_done("c1", COLLECTION)
+    connection.rollback()
+    assert journal.get_status("c1") == PENDING
+    # the progress persists, and pages keep the order in which they were added
+    journal = CrawlJournal(database, "TLA")
+    assert journal.get_urls(DONE) == ["c2"]
+    assert journal.get_urls(PENDING, kind=COLLECTION) == ["c1"]
+    assert journal.is_done("c2") and not journal.is_done("c3")
+    journal.add(["c1", "c2", "c3"], COLLECTION)
+    assert journal.get_counts() == {"done": 1, "failed": 1, "pending": 1}
+    journal.mark_done("c3", BUNDLE)
+    assert journal.get_urls(DONE) == ["c2", "c3"]
+    # archives have separate journals
+    assert CrawlJournal(database, "ELAR").get_status("c2") is None
+    journal.reset()
+    assert journal.get_counts() == {}
+
+
+def test_save_file(tmp_path):
+    filepath = tmp_path / "a.eaf"
+    session = StubSession(make_response(200, b"<ANNOTATION_DOCUMENT/>"))
+    assert save_file(session, str(filepath), "https://a.org/a.eaf", {}) == DONE
+    assert filepath.read_bytes() == b"<ANNOTATION_DOCUMENT/>"
+    # error pages are not stored, and only server errors are worth a retry
+    filepath = tmp_path / "b.eaf"
+    session = StubSession(
+        make_response(403, b"<html>forbidden</html>"),
+        make_response(502, b"<html>bad gateway</html>"),
+    )
+    assert save_file(session, str(filepath), "https://a.org/b.eaf", {}) == SKIPPED
+    assert save_file(session, str(filepath), "https://a.org/b.eaf", {}) == FAILED
+    assert not filepath.exists()
+
+
+def test_failed_download_is_retried(tmp_path):
+    journal = CrawlJournal(str(tmp_path / "journal.sqlite"), "TLA eaf")
+    downloads = [
+        ("https://a.org/a.eaf", str(tmp_path / "c1" / "a.eaf")),
+        ("https://a.org/b.eaf", str(tmp_path / "c1" / "b.eaf")),
+        ("https://a.org/c.eaf", str(tmp_path / "c1" / "c.eaf")),
+    ]
+    session = StubSession(
+        make_response(200, b"a"), make_response(503), make_response(403)
+    )
+    status = download_files(session, journal, downloads, {})
+    record_page(journal, "https://a.org/c1", COLLECTION, status)
+    assert status == FAILED
+    assert journal.get_urls(DONE) == ["https://a.org/a.eaf"]
+    assert journal.get_urls(FAILED, kind=FILE) == ["https://a.org/b.eaf"]
+    assert journal.get_urls(SKIPPED) == ["https://a.org/c.eaf"]
+    assert journal.get_urls(FAILED, kind=COLLECTION) == ["https://a.org/c1"]
+    journal.close()
+    # the next run only downloads the failed file, and completes the
+    # collection, as the restricted file is not tried again
+    journal = CrawlJournal(str(tmp_path / "journal.sqlite"), "TLA eaf")
+    assert not journal.is_done("https://a.org/c1")
+    session = StubSession(make_response(200, b"b"))
+    status = download_files(session, journal, downloads, {})
+    record_page(journal, "https://a.org/c1", COLLECTION, status)
+    assert status == DONE
+    assert [url for url, _ in session.requests] == ["https://a.org/b.eaf"]
+    assert (tmp_path / "c1" / "b.eaf").read_bytes() == b"b"
+    assert journal.get_counts() == {"done": 3, "skipped": 1}
+    journal.close()
@@ -2,10 +2,19 @@
 
 # import lod
 import glob
+import io
 from elanfile import ElanFile
 from annotation import Annotation
 import pprint
 import pytest
+from eldpy.langdetection import set_language_cache
+
+
+@pytest.fixture(autouse=True)
+def language_cache():
+    """keep the detections of the tests out of the cache on disk"""
+
+    set_language_cache(None)
 
 #
 # def test_fuzz(capsys):
@@ -77,6 +86,9 @@ def test_overview(capsys):
         "357",
         "2572",
         "13.88",
+        "137.22",
+        "ref@A+ref@NOBODY:137.22",
+        "2",
     ]
 
 
@@ -115,6 +127,9 @@ def test_ref_tx_ft_wd_mb(capsys):
         "13",
         "296",
         "4.39",
+        "0.0",
+        "",
+        "1",
     ]
 
 
@@ -154,6 +169,9 @@ def test_ref_po_mb_ge_ps_ft_nt(capsys):
             "2",
             "550",
             "0.36",
+            "0.0",
+            "",
+            "1",
         ]
 
 
@@ -183,6 +201,9 @@ def test_minimal(capsys):
         "boe.etore",
         "son",
     ]  # regression test: make sure that get_cldfs does not affect the data itself.
+    out = io.StringIO()
+    assert ef.get_cldfs(out=out) is None
+    assert out.getvalue() == cldfstring
 
 
 # def test_duration(capsys):
@@ -202,6 +223,12 @@ def test_fingerprint():
     assert fp == "[R[x[aaas[s[aa]]]x[aaaaasa]]]"
 
 
+def test_fingerprint_structure_only():
+    ef = ElanFile("goemai_test.eaf", "www", structure_only=True)
+    assert ef.get_fingerprint() == "[R[x[aaas[s[aa]]]x[aaaaasa]]]"
+    assert ef.annotationdic == {}
+
+
 def test_translations():
     ef = ElanFile("goemai_test.eaf", "www")
     ef.populate_translations()
@@ -391,3 +418,383 @@ def test_cronhamn(capsys):
     assert (
         x[439:707] == '''"a1204","íkatsawatsa náani nokéñoakeena nokaíteka lináko","íkatsa	-watsa	náani	no-	kéñoa	-ka	-iina	no-	kaíte	-ka	li-	náko","here.EMPH	FUT	SUSP	1SG	to.begin	SUB	already	1SG	to.tell	SUB	3NFSG	LOC.on","'This is where I will begin to tell you about it.'","","WORD_ALIGNED"'''
     )
+
+
+def test_language_cache(tmp_path, monkeypatch):
+    from eldpy import langdetection
+    from eldpy.langdetection import (
+        detect_top_language,
+        get_content_hash,
+        get_language_cache,
+    )
+    from eldpy.helpers import LANGDETECT_THRESHOLD
+
+    cache_path = str(tmp_path / "languages.sqlite")
+    cache = set_language_cache(cache_path, max_entries=2)
+    ef = ElanFile("goemai_test.eaf", "www")
+    ef.populate_translations()
+    translation = ef.get_translations()[0]
+    # the result persists across cache instances
+    cache = set_language_cache(cache_path, max_entries=2)
+    key = get_content_hash(translation, LANGDETECT_THRESHOLD)
+    assert cache.get(key)[0] == "en"
+    # parameters which change where detection stops are part of the key
+    assert get_content_hash(translation, 0.5) != key
+    assert get_content_hash(translation, LANGDETECT_THRESHOLD, first_chunk_size=10) != key
+    # least recently used entries are evicted
+    detect_top_language(["eins zwei drei"], 0.95)
+    detect_top_language(["un deux trois"], 0.95)
+    count = cache.connection.execute("SELECT COUNT(*) FROM detections").fetchone()[0]
+    assert count == 2
+    # by default, detections are stored on disk
+    monkeypatch.setattr(langdetection, "_cache", None)
+    monkeypatch.setattr(langdetection, "CACHE_DIR", str(tmp_path / "default"))
+    assert get_language_cache().path == str(tmp_path / "default" / "languages.sqlite")
+    detect_top_language(["eins zwei drei"], 0.95)
+    assert (tmp_path / "default" / "languages.sqlite").exists()
+    get_language_cache().close()
+
+
+def test_language_cache_writes(tmp_path, monkeypatch):
+    import time
+    from eldpy import langdetection
+    from eldpy.langdetection import CACHE_TOUCH_INTERVAL, LanguageCache
+
+    cache = LanguageCache(str(tmp_path / "languages.sqlite"), max_entries=10)
+    statements = []
+    cache.connection.set_trace_callback(statements.append)
+    for i in range(10):
+        cache.put(f"k{i}", ("en", 0.9))
+    # entries are counted as they are added
+    assert not [s for s in statements if "COUNT" in s]
+    # recent hits are only read
+    statements.clear()
+    assert cache.get("k0") == ("en", 0.9)
+    assert not [s for s in statements if s.startswith("UPDATE")]
+    now = time.time_ns() + CACHE_TOUCH_INTERVAL + 1
+    monkeypatch.setattr(langdetection.time, "time_ns", lambda: now)
+    assert cache.get("k0") == ("en", 0.9)
+    assert [s for s in statements if s.startswith("UPDATE")]
+    # a full cache is evicted down to 90%, keeping the refreshed entry
+    cache.put("k10", ("de", 0.9))
+    assert cache.count() == cache.entries == 9
+    assert cache.get("k0") == ("en", 0.9)
+    with pytest.raises(KeyError):
+        cache.get("k1")
+    cache.close()
+
+
+def test_eafcache(tmp_path):
+    from eafcache import load_elanfile
+
+    ef = load_elanfile("goemai_test.eaf", "www", str(tmp_path))
+    assert not ef.loaded_from_cache
+    cached = load_elanfile("goemai_test.eaf", "www", str(tmp_path))
+    assert cached.loaded_from_cache
+    assert cached._root is None
+    cached.populate_transcriptions()
+    assert cached.transcriptions == ef.transcriptions
+    assert cached.glossed_sentences == ef.glossed_sentences
+    assert cached.get_fingerprint() == ef.get_fingerprint()
+    assert cached.annotationdic["a24"].text == ef.annotationdic["a24"].text
+    assert cached.get_cldfs() == ef.get_cldfs()
+
+
+def test_eafcache_durations(tmp_path):
+    from eafcache import load_elanfile
+
+    reference = ElanFile("ref_tx_ft_wd_mb.eaf", "www")
+    reference.populate()
+    loaded = []
+    for _ in range(2):
+        ef = load_elanfile("ref_tx_ft_wd_mb.eaf", "www", str(tmp_path), detach=True)
+        # populating again does not add the durations a second time
+        ef.populate_transcriptions()
+        ef.populate_translations()
+        ef.populate_glosses()
+        loaded.append(ef)
+    cold, warm = loaded
+    assert not cold.loaded_from_cache and warm.loaded_from_cache
+    assert cold._root is None
+    for ef in loaded:
+        assert ef.secondstranscribed == reference.secondstranscribed
+        assert ef.secondstranslated == reference.secondstranslated
+    assert cold.print_overview() == warm.print_overview() == reference.print_overview()
+
+
+def test_overview_many(tmp_path):
+    from batch import overview_many, OVERVIEW_COLUMNS
+
+    empty = tmp_path / "empty.eaf"
+    empty.write_text("")
+    rows = overview_many(["test.png", str(empty)], workers=2, chunksize=1)
+    assert [row[0] for row in rows] == ["test.png", "empty.eaf"]
+    assert all(len(row) == len(OVERVIEW_COLUMNS) for row in rows)
+    assert rows[0][-1] == "the file test.png is not valid XML"
+
+
+def test_overview_many_cache_dir(tmp_path):
+    from batch import overview_many
+
+    paths = ["ref_tx_ft_wd_mb.eaf", "goemai_test.eaf"]
+    uncached = overview_many(paths, workers=1)
+    cold = overview_many(paths, workers=1, cache_dir=str(tmp_path))
+    warm = overview_many(paths, workers=1, cache_dir=str(tmp_path))
+    assert uncached == cold == warm
+
+
+def test_deep_ref_chain():
+    ef = ElanFile("test_minimal.eaf", "www")
+    ef.ref_annotations = {"r0": "ann0", "dangling": "nowhere"}
+    ef.ref_annotations.update({f"r{i}": f"r{i-1}" for i in range(1, 5000)})
+    ancestors = ef.get_timeslotted_parents()
+    assert ancestors["r4999"] == "ann0"
+    assert "dangling" not in ancestors
+
+
+def test_detach(monkeypatch):
+    import elanfile
+
+    parses = []
+    xml = elanfile.ElanFile.xml
+    monkeypatch.setattr(
+        elanfile.ElanFile, "xml", lambda self: parses.append(self.path) or xml(self)
+    )
+    ef = ElanFile("goemai_test.eaf", "www", detach=True)
+    ef.populate()
+    assert ef._root is None
+    reference = ElanFile("goemai_test.eaf", "www")
+    reference.populate()
+    assert ef.transcriptions == reference.transcriptions
+    assert ef.get_cldfs() == reference.get_cldfs()
+    assert parses == []
+    # the tree is parsed again on access
+    assert ef.root.find(".//TIER") is not None
+    assert len(parses) == 1
+    # the tree is kept between populate_* calls until it is released
+    ef = ElanFile("goemai_test.eaf", "www", detach=True)
+    ef.populate_translations()
+    ef.populate_transcriptions()
+    ef.populate_glosses()
+    assert ef._root is not None
+    ef.release_xml()
+    assert ef._root is None
+    assert len(parses) == 1
+
+
+def test_seconds_from_tier():
+    from eldpy.elan.helpers import get_seconds_from_tier
+
+    ef = ElanFile("ref_tx_ft_wd_mb.eaf", "www")
+    ef.populate_transcriptions()
+    ef.populate_translations()
+    assert ef.secondstranscribed == ef.secondstranslated == 50.257
+    # reference tiers fall back to the durations of their time-aligned parents
+    assert get_seconds_from_tier(ef.annotation_table, "tx@S1") == 50.257
+    assert get_seconds_from_tier(ef.annotation_table, "nonexisting tier") == 0
+
+
+def test_annotations_between():
+    ef = ElanFile("test_minimal.eaf", "www")
+    hits = ef.annotations_between(30000, 31000)
+    assert ("ref@A", "ann0", 27080, 30870) in hits
+    assert ("tx@A", "ann1", 27080, 30870) in hits
+    assert all(start < 31000 and end > 30000 for _, _, start, end in hits)
+    assert ef.annotations_between(30870, 31305) == []
+    assert ef.annotations_between(30000, 32000, tiers=["tx@A"]) == [
+        ("tx@A", "ann1", 27080, 30870),
+        ("tx@A", "ann26", 31305, 35235),
+    ]
+    at_start, in_gap = ef.annotations_at([31305, 31000], tiers=["ref@A"])
+    assert at_start == [("ref@A", "ann25", 31305, 35235)]
+    assert in_gap == []
+
+
+def test_annotations_between_long_annotation():
+    ef = ElanFile("goemai_test.eaf", "www")
+    index = ef.interval_index
+    intervals = list(zip(index.starts.tolist(), index.ends.tolist()))
+    intervals += [(start - 500, start + 10) for start, _ in intervals[:100]]
+    everything = ef.annotations_between(0, 10**9)
+    for (start, end), hits in zip(intervals[::10], index.between_many(intervals[::10])):
+        assert hits == [hit for hit in everything if hit[2] < end and hit[3] > start]
+    # the long annotations are kept apart from the short ones
+    assert len(index.buckets) > 1
+
+
+def test_overlap_statistics():
+    ef = ElanFile("two_speakers.eaf", "www")
+    overlap_seconds, pair_overlaps, max_concurrency = ef.get_overlap_statistics()
+    assert overlap_seconds == 729.251
+    assert pair_overlaps == {("ref@BH", "ref@BP"): 729.251}
+    assert max_concurrency == 2
+    assert ef.get_overlap_statistics(tiers=["ref@BH"]) == (0.0, {}, 1)
+
+
+def test_tier_to_id_wordlist():
+    from lxml import etree
+    from eldpy.helpers import tier_to_id_wordlist
+
+    tier = etree.fromstring(
+        '<TIER TIER_ID="nt@A"><ANNOTATION><REF_ANNOTATION ANNOTATION_ID="a2" '
+        'ANNOTATION_REF="a1"><ANNOTATION_VALUE> note </ANNOTATION_VALUE>'
+        '</REF_ANNOTATION></ANNOTATION><ANNOTATION><REF_ANNOTATION ANNOTATION_ID="a3" '
+        'ANNOTATION_REF="a1"><ANNOTATION_VALUE></ANNOTATION_VALUE></REF_ANNOTATION>'
+        '</ANNOTATION><ANNOTATION><REF_ANNOTATION ANNOTATION_ID="a4" ANNOTATION_REF="a1"/>'
+        "</ANNOTATION></TIER>"
+    )
+    assert tier_to_id_wordlist(tier) == [("a2", "note"), ("a3", ""), ("a4", "")]
+
+
+def test_ref_annotation_texts():
+    from eldpy.helpers import get_annotation_text_mapping
+
+    ef = ElanFile("goemai_test.eaf", "www")
+    ef.populate_glosses()
+    assert ef._annotationdic is None
+    assert ef.ref_annotation_texts == get_annotation_text_mapping(ef.xml())
+
+
+@pytest.mark.parametrize(
+    "eaf,counts",
+    [
+        ("goemai_test.eaf", (357, 2572)),
+        ("gorwaa_test.eaf", (0, 2934)),
+        ("gorwaa_test_all_tiers.eaf", (17, 7295)),
+        ("komnzo_test.eaf", (6, 87)),
+        ("muyu_test.eaf", (1530, 5888)),
+        ("ref_po_mb_ge_ps_ft_nt.eaf", (2, 550)),
+        ("ref_tx_ft_wd_mb.eaf", (13, 296)),
+        ("saek_test.eaf", (50, 2490)),
+        ("test_minimal.eaf", (2, 20)),
+        ("totoli_test.eaf", (6, 2214)),
+        ("two_speakers.eaf", (1992, 7833)),
+        ("wan_test.eaf", (13, 6214)),
+        ("yaminawa_test.eaf", (13, 5041)),
+    ],
+)
+def test_segment_counts(eaf, counts):
+    ef = ElanFile(eaf, "www")
+    assert ef.annotation_table.get_segment_counts() == counts
+    assert ElanFile(eaf, "www", single_pass=False).segment_counts == ef.segment_counts
+
+
+def test_segment_counts_per_tier():
+    ef = ElanFile("test_minimal.eaf", "www")
+    assert ef.segment_counts["nt@A"] == [2, 2]
+    assert ef.segment_counts["tx@A"] == [0, 2]
+
+
+def test_interning():
+    from eldpy.elan.interning import intern_elanfile
+
+    plain = ElanFile("test_minimal.eaf", "www")
+    plain.populate()
+    interned = []
+    for _ in range(2):
+        ef = ElanFile("test_minimal.eaf", "www")
+        intern_elanfile(ef)
+        ef.populate()
+        intern_elanfile(ef)
+        assert ef.glossed_sentences == plain.glossed_sentences
+        assert ef.translations_with_ids == plain.translations_with_ids
+        assert ef.get_cldfs() == plain.get_cldfs()
+        interned.append(ef)
+    first, second = interned
+    assert list(first.tier_hierarchy)[1] is list(second.tier_hierarchy)[1]
+    gloss = first.glossed_sentences["ge"]["ge@A"][1]["ann25"][2][1]
+    assert gloss is second.glossed_sentences["ge"]["ge@A"][1]["ann25"][2][1]
+
+
+@pytest.mark.parametrize("eaf", ["goemai_test.eaf", "test_minimal.eaf", "muyu_test.eaf"])
+def test_stream(eaf):
+    from eldpy.helpers import tier_to_id_wordlist, tier_to_annotation_id_list
+    from eldpy.elan.helpers import get_seconds_from_tier
+
+    ef = ElanFile(eaf, "www")
+    stream = ElanFile.stream(eaf)
+    streamed = list(stream)
+    tiers = list(ef.root.iter("TIER"))
+    assert [tier.id_ for tier in streamed] == [t.attrib["TIER_ID"] for t in tiers]
+    for tier, t in zip(streamed, tiers):
+        assert tier.get_id_wordlist() == tier_to_id_wordlist(t)
+        assert tier.get_annotation_id_list() == tier_to_annotation_id_list(t)
+        assert tier.get_segment_counts() == ef.segment_counts[tier.id_]
+        assert stream.get_seconds(tier) == get_seconds_from_tier(
+            ef.annotation_table, tier.id_
+        )
+    assert stream.tier_hierarchy == ef.tier_hierarchy
+    assert stream.timeslots == ef.timeslots
+
+
+def test_classify_tiers(monkeypatch):
+    import elanfile
+
+    detected = []
+
+    def is_major_language(wordlist, **kwargs):
+        detected.append(wordlist[0])
+        return original(wordlist, **kwargs)
+
+    original = elanfile.is_major_language
+    monkeypatch.setattr(elanfile, "is_major_language", is_major_language)
+    ef = ElanFile("gorwaa_test.eaf", "www")
+    ef.populate()
+    assert len(detected) == 2
+    assert list(ef.transcriptions["phrase"]) == ["A_phrase-txt-gow-Qaaa-x-Roma"]
+    assert list(ef.translations["phrase-item"]) == ["A_phrase-gls-en"]
+    # the language decisions are cached per tier
+    ef.populate_transcriptions()
+    ef.populate_translations()
+    assert len(detected) == 2
+
+
+def test_classify_tier():
+    from eldpy.elan import tierroles
+
+    candidates = {
+        tierroles.TRANSCRIPTION: {"tx", "tl"},
+        tierroles.TRANSLATION: {"ft", "tl"},
+        tierroles.GLOSS: {"ge"},
+        tierroles.COMMENT: {"nt"},
+    }
+    calls = []
+
+    def is_major(result):
+        return lambda: calls.append(result) or result
+
+    english = ["she went back to her house", "they were hungry"]
+    vernacular = ["oino irore", "ire awu boe etore"]
+    assert tierroles.classify_tier("tl@A", "tl", english, candidates, is_major(True)) == "translation"
+    assert tierroles.classify_tier("tl@B", "tl", vernacular, candidates, is_major(False)) == "transcription"
+    assert len(calls) == 2
+    assert tierroles.classify_tier("id@A", "tx", ["001", "002"], candidates, is_major(False)) == "id"
+    assert tierroles.classify_tier("ge@A", "ge", [], candidates, is_major(False)) == "gloss"
+    assert tierroles.classify_tier("nt@A", "nt", [], candidates, is_major(False)) == "ignore"
+    assert len(calls) == 2
+
+
+def test_stream_ref_tiers():
+    from eldpy.helpers import tier_to_id_wordlist, tier_to_annotation_id_list
+    from eldpy.elan.helpers import get_seconds_from_tier
+
+    eaf = "ref_tx_ft_wd_mb.eaf"
+    ef = ElanFile(eaf, "www")
+    stream = ElanFile.stream(eaf)
+    tiers = {t.attrib["TIER_ID"]: t for t in ef.root.iter("TIER")}
+    # the times of REF_ANNOTATIONs are resolved through their parents, over
+    # two levels for the morphemes
+    ref_tiers = [
+        tier
+        for tier in stream
+        if tier.annotations and all(record[3] is not None for record in tier.annotations)
+    ]
+    assert [tier.id_ for tier in ref_tiers] == ["ft@S1", "wd@S1", "mb@S1"]
+    for tier in ref_tiers:
+        t = tiers[tier.id_]
+        assert tier.get_id_wordlist() == tier_to_id_wordlist(t)
+        assert tier.get_annotation_id_list() == tier_to_annotation_id_list(t)
+        assert tier.get_segment_counts() == ef.segment_counts[tier.id_]
+        seconds = stream.get_seconds(tier)
+        assert seconds > 0
+        assert seconds == get_seconds_from_tier(ef.annotation_table, tier.id_)
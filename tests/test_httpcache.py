@@ -0,0 +1,139 @@
+import pytest
+
+from eldpy import httpcache
+from eldpy.httpcache import ResponseCache, CATALOGUE, COLLECTION, BUNDLE
+from eldpy.httpclient import HttpClient
+from test_httpclient import StubSession, make_response
+
+
+class Clock:
+    """a time.time which only moves when told to"""
+
+    def __init__(self, now=1000000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(httpcache.time, "time", clock)
+    return clock
+
+
+def make_client(cache, *outcomes):
+    client = HttpClient(cache=cache)
+    client.session = StubSession(*outcomes)
+    return client
+
+
+def test_response_cache(tmp_path):
+    cache_path = str(tmp_path / "http.sqlite")
+    cache = ResponseCache(cache_path, ttls={CATALOGUE: 0})
+    cache.put("https://a.org/list", CATALOGUE, b"<html>list</html>", etag='"v1"')
+    cache.put("https://a.org/item", BUNDLE, b"<html>item</html>" * 100)
+    cache.close()
+    # pages persist across cache instances
+    cache = ResponseCache(cache_path, ttls={CATALOGUE: 0})
+    catalogue = cache.get("https://a.org/list")
+    assert catalogue.body == b"<html>list</html>"
+    assert not cache.is_fresh(catalogue, CATALOGUE)
+    assert cache.get_validators(catalogue) == {"If-None-Match": '"v1"'}
+    bundle = cache.get("https://a.org/item")
+    assert cache.is_fresh(bundle, BUNDLE)
+    assert cache.get_validators(bundle) == {}
+    assert cache.get("https://a.org/other") is None
+    # bodies are stored compressed
+    size = cache.connection.execute(
+        "SELECT LENGTH(body) FROM pages WHERE url = ?", ("https://a.org/item",)
+    ).fetchone()[0]
+    assert size < len(bundle.body) / 10
+    cache.close()
+
+
+def test_ttl_per_kind(tmp_path, clock):
+    cache = ResponseCache(
+        str(tmp_path / "http.sqlite"), ttls={COLLECTION: 100, BUNDLE: 1000}
+    )
+    client = make_client(
+        cache,
+        make_response(200, b"collection"),
+        make_response(200, b"bundle"),
+        make_response(200, b"collection, fetched again"),
+    )
+    client.get("https://a.org/collection", kind=COLLECTION)
+    client.get("https://a.org/bundle", kind=BUNDLE)
+    clock.now += 99
+    # both pages are fresh, so the server is not asked
+    assert client.get("https://a.org/collection", kind=COLLECTION).content == b"collection"
+    assert client.get("https://a.org/bundle", kind=BUNDLE).content == b"bundle"
+    assert len(client.session.requests) == 2
+    clock.now += 1
+    # only the collection page has expired
+    assert client.get("https://a.org/bundle", kind=BUNDLE).content == b"bundle"
+    response = client.get("https://a.org/collection", kind=COLLECTION)
+    assert response.content == b"collection, fetched again"
+    assert len(client.session.requests) == 3
+    assert cache.get("https://a.org/collection").body == b"collection, fetched again"
+    cache.close()
+
+
+def test_revalidation_not_modified(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "http.sqlite"), ttls={CATALOGUE: 100})
+    client = make_client(
+        cache,
+        make_response(
+            200,
+            b"list",
+            headers={"ETag": '"v1"', "Content-Type": "text/html; charset=utf-8"},
+        ),
+        make_response(304),
+    )
+    client.get("https://a.org/list", kind=CATALOGUE)
+    clock.now += 150
+    response = client.get("https://a.org/list", kind=CATALOGUE)
+    # the ETag is sent, and the cached page is used after a 304
+    _, kwargs = client.session.requests[1]
+    assert kwargs["headers"] == {"If-None-Match": '"v1"'}
+    assert response.status_code == 200
+    assert response.content == b"list"
+    assert response.encoding == "utf-8"
+    # the 304 refreshes the page, so it is fresh for another TTL
+    page = cache.get("https://a.org/list")
+    assert page.fetched == clock.now
+    assert cache.is_fresh(page, CATALOGUE)
+    clock.now += 99
+    client.get("https://a.org/list", kind=CATALOGUE)
+    assert len(client.session.requests) == 2
+    cache.close()
+
+
+def test_revalidation_modified(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "http.sqlite"), ttls={CATALOGUE: 0})
+    last_modified = "Sun, 06 Nov 1994 08:49:37 GMT"
+    client = make_client(
+        cache,
+        make_response(200, b"old list", headers={"Last-Modified": last_modified}),
+        make_response(200, b"new list", headers={"ETag": '"v2"'}),
+    )
+    client.get("https://a.org/list", kind=CATALOGUE)
+    response = client.get("https://a.org/list", kind=CATALOGUE)
+    _, kwargs = client.session.requests[1]
+    assert kwargs["headers"] == {"If-Modified-Since": last_modified}
+    assert response.content == b"new list"
+    page = cache.get("https://a.org/list")
+    assert page.body == b"new list"
+    assert page.etag == '"v2"'
+    cache.close()
+
+
+def test_failed_revalidation_is_not_cached(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr("eldpy.httpclient.time.sleep", lambda delay: None)
+    cache = ResponseCache(str(tmp_path / "http.sqlite"), ttls={CATALOGUE: 0})
+    client = make_client(cache, make_response(200, b"list"), make_response(404))
+    client.get("https://a.org/list", kind=CATALOGUE)
+    assert client.get("https://a.org/list", kind=CATALOGUE) is None
+    assert cache.get("https://a.org/list").body == b"list"
+    cache.close()
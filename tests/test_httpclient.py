@@ -0,0 +1,141 @@
+import pytest
+import requests
+
+from eldpy import httpclient
+from eldpy.httpclient import HttpClient, get_retry_after
+
+
+class StubSession:
+    """return or raise the given outcomes in turn, recording the requests"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        self.requests.append((url, kwargs))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def make_response(status_code, content=b"", headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = f"status {status_code}"
+    response._content = content
+    response.headers.update(headers or {})
+    return response
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """record the delays instead of sleeping"""
+
+    delays = []
+    monkeypatch.setattr(httpclient.time, "sleep", delays.append)
+    return delays
+
+
+def make_client(*outcomes, **kwargs):
+    client = HttpClient(**kwargs)
+    client.session = StubSession(*outcomes)
+    return client
+
+
+def test_success(sleeps):
+    client = make_client(make_response(200, b"page"))
+    assert client.fetch("https://example.org/a").content == b"page"
+    assert client.failures == []
+    assert sleeps == []
+
+
+def test_retry_with_backoff(sleeps):
+    client = make_client(
+        requests.exceptions.ConnectionError("refused"),
+        requests.exceptions.ChunkedEncodingError("connection dropped"),
+        make_response(503),
+        make_response(200, b"page"),
+        retries=4,
+        backoff=1.0,
+        max_backoff=3.0,
+    )
+    assert client.fetch("https://example.org/a").content == b"page"
+    assert len(client.session.requests) == 4
+    assert client.failures == []
+    # full jitter up to backoff * 2**attempt, capped at max_backoff
+    assert len(sleeps) == 3
+    for attempt, delay in enumerate(sleeps):
+        assert 0 <= delay <= min(3.0, 2**attempt)
+
+
+def test_failure_after_retries(sleeps):
+    client = make_client(
+        *[requests.exceptions.Timeout("timed out")] * 3, retries=2
+    )
+    assert client.fetch("https://example.org/a") is None
+    assert len(client.session.requests) == 3
+    assert len(sleeps) == 2
+    [failure] = client.failures
+    assert failure.url == "https://example.org/a"
+    assert failure.status is None
+    assert failure.error == "timed out"
+    assert failure.attempts == 3
+
+
+def test_no_retry_on_client_error(sleeps):
+    client = make_client(make_response(404))
+    assert client.fetch("https://example.org/a") is None
+    assert sleeps == []
+    assert client.failures == [
+        httpclient.FetchFailure("https://example.org/a", 404, "status 404", 1)
+    ]
+
+
+def test_no_retry_on_other_request_errors(sleeps):
+    client = make_client(requests.exceptions.TooManyRedirects("redirect loop"))
+    assert client.fetch("https://example.org/a") is None
+    assert sleeps == []
+    assert client.failures[0].error == "redirect loop"
+
+
+def test_too_many_requests(sleeps):
+    client = make_client(
+        make_response(429, headers={"Retry-After": "7"}),
+        make_response(429),
+        make_response(200, b"page"),
+        backoff=1.0,
+    )
+    assert client.fetch("https://example.org/a").content == b"page"
+    assert sleeps[0] == 7
+    # without Retry-After, the usual backoff is used
+    assert 0 <= sleeps[1] <= 2
+
+
+def test_too_many_requests_long_retry_after(sleeps):
+    client = make_client(
+        make_response(429, headers={"Retry-After": "86400"}), max_retry_after=300
+    )
+    assert client.fetch("https://example.org/a") is None
+    assert sleeps == []
+    [failure] = client.failures
+    assert failure.status == 429
+    assert failure.attempts == 1
+    assert "retry after 86400s" in failure.error
+
+
+def test_retry_after_date(monkeypatch):
+    monkeypatch.setattr(httpclient.time, "time", lambda: 784111767.0)
+    response = make_response(429, headers={"Retry-After": "Sun, 06 Nov 1994 08:49:37 GMT"})
+    assert get_retry_after(response) == 10
+    assert get_retry_after(make_response(429, headers={"Retry-After": "soon"})) is None
+    assert get_retry_after(make_response(429)) is None
+
+
+def test_timeouts_per_host():
+    client = HttpClient(timeouts={"slow.example.org": 300}, default_timeout=(5, 30))
+    client.session = StubSession(make_response(200), make_response(200))
+    client.fetch("https://slow.example.org/a")
+    client.fetch("https://example.org/a")
+    assert [kwargs["timeout"] for _, kwargs in client.session.requests] == [300, (5, 30)]
@@ -0,0 +1,94 @@
+import sqlite3
+
+from eldpy import httpclient
+from eldpy.archives.crawler import AsyncCrawler
+from eldpy.archives.paradisec_archive import ParadisecArchive
+from eldpy.archives.paradisec_collection import ParadisecCollection
+from eldpy.crawljournal import BUNDLE
+from test_tla_collection import PageClient
+
+CATALOGUE = "https://catalog.paradisec.org.au"
+
+
+def make_collection_page(*items):
+    rows = "<tr><td></td></tr>" * 8
+    languages = '<tr><td><a href="/languages/tpi">Tok Pisin</a></td></tr>'
+    item_rows = "".join(
+        f'<tr><td></td><td>{item}</td><td><a href="/collections/C/items/{item}">{item}</a></td></tr>'
+        for item in items
+    )
+    return (
+        f"<table>{rows}{languages}</table><table></table>"
+        f"<table><tr><th>Item</th></tr>{item_rows}</table>"
+    ).encode()
+
+
+def make_item_page(*files):
+    file_rows = "".join(
+        f"<tr><td>{name}</td><td>text/x-eaf+xml</td><td>1 KB</td><td></td></tr>"
+        for name in files
+    )
+    return (
+        "<table><tr><th>Subject language(s)</th>\n"
+        '<td><a href="/languages/eng">English</a></td></tr></table>'
+        f"<table>{file_rows}</table>"
+    ).encode()
+
+
+def test_crawl_malformed_pages():
+    client = PageClient(
+        {
+            "broken": b"<html>maintenance</html>",
+            "C": make_collection_page("001", "002"),
+            # the subject languages cannot be read from this page
+            "001": b"<table><tr><th>Subject language(s)</th></tr></table>",
+            "002": make_item_page("C-002-A.eaf"),
+        }
+    )
+    archive = ParadisecArchive()
+    archive.collections = [
+        ParadisecCollection("broken", f"{CATALOGUE}/collections/broken"),
+        ParadisecCollection("C", f"{CATALOGUE}/collections/C"),
+    ]
+    crawler = AsyncCrawler(concurrency=2, workers=1, client=client)
+    crawler.run(archive.crawl(crawler))
+    assert sorted(failure.url for failure in client.failures) == [
+        f"{CATALOGUE}/collections/C/items/001",
+        f"{CATALOGUE}/collections/broken",
+    ]
+    collection = archive.collections[1]
+    assert [bundle.files for bundle in collection.bundles][0] == []
+    [file_] = collection.bundles[1].files
+    assert file_.name == "C-002-A.eaf"
+    assert file_.languages == ["eng"]
+
+
+def test_populate_skips_done_bundles(monkeypatch):
+    client = PageClient(
+        {
+            "C": make_collection_page("001", "002"),
+            "002": make_item_page("C-002-A.eaf"),
+        }
+    )
+    monkeypatch.setattr(httpclient, "_client", client)
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE files (a, b, c, d, e, f, g, h)")
+    connection.execute("CREATE TABLE languagesfiles (a, b, c)")
+    archive = ParadisecArchive()
+    journal = archive.open_journal(connection)
+    # an earlier crawl was interrupted after the first item of the collection
+    journal.mark_done(f"{CATALOGUE}/collections/C/items/001", BUNDLE)
+
+    def populate_collections(limit):
+        archive.collections = [ParadisecCollection("C", f"{CATALOGUE}/collections/C")]
+
+    monkeypatch.setattr(archive, "populate_collections", populate_collections)
+    archive.populate(database=connection, concurrency=2, workers=1)
+    assert client.requests == [
+        f"{CATALOGUE}/collections/C",
+        f"{CATALOGUE}/collections/C/items/002",
+    ]
+    assert journal.is_done(f"{CATALOGUE}/collections/C")
+    assert connection.execute("SELECT d FROM files").fetchall() == [
+        (f"{CATALOGUE}/collections/C/items/002",)
+    ]
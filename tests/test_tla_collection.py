@@ -0,0 +1,59 @@
+import asyncio
+
+from eldpy.archives.crawler import AsyncCrawler
+from eldpy.archives.tla_collection import TLACollection
+from eldpy.httpclient import HttpClient
+from test_httpclient import make_response
+
+ROOT = "https://archive.mpi.nl/tla/islandora/object/root"
+
+
+def make_node_page(*names):
+    links = "".join(
+        f'<a title="{name}" href="/tla/islandora/object/{name}">{name}</a>'
+        for name in names
+    )
+    return (
+        '<h2 class="block-title">Subnodes</h2>'
+        f'<div class="view-content">{links}</div>'
+    ).encode()
+
+
+class PageClient(HttpClient):
+    """serve pages from a dictionary, raising the exceptions in it"""
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages
+        self.requests = []
+
+    def get(self, url, kind=None, **kwargs):
+        self.requests.append(url)
+        page = self.pages[url.split("/")[-1]]
+        if isinstance(page, Exception):
+            raise page
+        return make_response(200, page)
+
+
+def test_crawl_nodes_failing_node():
+    client = PageClient(
+        {
+            "root": make_node_page("a", "b", "c"),
+            "a": RuntimeError("unexpected page"),
+            "b": b"<h1>Bundle B</h1>",
+            "c": make_node_page("d"),
+            "d": b"<h1>Bundle D</h1>",
+        }
+    )
+    collection = TLACollection("root", ROOT)
+    crawler = AsyncCrawler(concurrency=1, workers=1, client=client)
+    # with one worker, a worker stopped by the failing node would never
+    # finish the frontier
+    names, subnodes = crawler.run(
+        asyncio.wait_for(collection.crawl_nodes(crawler, ROOT, 1), timeout=10)
+    )
+    assert sorted(names.values()) == ["Bundle B", "Bundle D"]
+    assert set(subnodes) == {ROOT, "https://archive.mpi.nl/tla/islandora/object/c"}
+    [failure] = client.failures
+    assert failure.url == "https://archive.mpi.nl/tla/islandora/object/a"
+    assert "unexpected page" in failure.error